@@ -1,240 +1,859 @@
-import sys
-from PyQt5 import QtWidgets, QtCore, QtGui
-from gurobipy import Model, GRB, GurobiError
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-
-class AdvertisingGUI(QtWidgets.QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Advertising Budget Allocator")
-        self.setGeometry(100, 100, 900, 700)
-
-        # Apply modern stylesheet
-        self.setStyleSheet("""
-            QMainWindow { background-color: #f5f7fa; }
-            QLabel { font-family: 'Segoe UI', sans-serif; color: #2c3e50; }
-            QLineEdit { 
-                padding: 10px; 
-                border: 1px solid #d1d9e6; 
-                border-radius: 8px; 
-                background-color: #ffffff; 
-                font-size: 16px; 
-            }
-            QCheckBox { 
-                font-family: 'Segoe UI', sans-serif; 
-                font-size: 14px; 
-                color: #2c3e50; 
-                padding: 5px; 
-            }
-            QPushButton { 
-                background-color: #2c3e50; 
-                color: white; 
-                padding: 16px 32px; 
-                border: none; 
-                border-radius: 8px; 
-                font-family: 'Segoe UI', sans-serif; 
-                font-size: 18px; 
-                font-weight: bold; 
-            }
-            QPushButton:hover { background-color: #1f2a44; }
-            QPushButton:pressed { background-color: #17202a; }
-        """)
-
-        # Central widget and main layout
-        central_widget = QtWidgets.QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QtWidgets.QVBoxLayout(central_widget)
-        main_layout.setSpacing(30)
-        main_layout.setContentsMargins(30, 30, 30, 30)
-        main_layout.setAlignment(QtCore.Qt.AlignCenter)
-
-        # Title
-        title_label = QtWidgets.QLabel("Advertising Budget Allocator")
-        title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #2c3e50;")
-        title_label.setAlignment(QtCore.Qt.AlignCenter)
-        main_layout.addWidget(title_label)
-
-        # Input panel
-        input_widget = QtWidgets.QWidget()
-        input_widget.setStyleSheet("background-color: #ffffff; border-radius: 10px; padding: 15px;")
-        input_layout = QtWidgets.QVBoxLayout(input_widget)
-        input_layout.setSpacing(20)
-        input_layout.setAlignment(QtCore.Qt.AlignCenter)
-        main_layout.addWidget(input_widget)
-
-        # Budget input
-        budget_container = QtWidgets.QWidget()
-        budget_container_layout = QtWidgets.QHBoxLayout(budget_container)
-        budget_container_layout.setAlignment(QtCore.Qt.AlignCenter)
-        budget_container_layout.setContentsMargins(0, 0, 0, 0)
-        budget_container_layout.setSpacing(10)
-        budget_label = QtWidgets.QLabel("Budget:")
-        budget_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        budget_container_layout.addWidget(budget_label)
-        self.budget_input = QtWidgets.QLineEdit()
-        self.budget_input.setText("10000")
-        self.budget_input.setFixedWidth(200)
-        self.budget_input.setPlaceholderText("$ Enter budget")
-        validator = QtGui.QDoubleValidator(0.0, 1000000.0, 2)
-        validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
-        self.budget_input.setValidator(validator)
-        budget_container_layout.addWidget(self.budget_input)
-        input_layout.addWidget(budget_container, alignment=QtCore.Qt.AlignCenter)
-
-        # Desired reach input
-        reach_container = QtWidgets.QWidget()
-        reach_container_layout = QtWidgets.QHBoxLayout(reach_container)
-        reach_container_layout.setAlignment(QtCore.Qt.AlignCenter)
-        reach_container_layout.setContentsMargins(0, 0, 0, 0)
-        reach_container_layout.setSpacing(10)
-        reach_label = QtWidgets.QLabel("Desired Reach:")
-        reach_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        reach_container_layout.addWidget(reach_label)
-        self.reach_input = QtWidgets.QLineEdit()
-        self.reach_input.setText("50000")
-        self.reach_input.setFixedWidth(200)
-        self.reach_input.setPlaceholderText("Enter desired reach")
-        reach_validator = QtGui.QDoubleValidator(0.0, 10000000.0, 2)
-        reach_validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
-        self.reach_input.setValidator(reach_validator)
-        reach_container_layout.addWidget(self.reach_input)
-        input_layout.addWidget(reach_container, alignment=QtCore.Qt.AlignCenter)
-
-        # Checkboxes for channels
-        checkbox_layout = QtWidgets.QHBoxLayout()
-        checkbox_layout.setSpacing(15)
-        self.channel_checkboxes = []
-        for channel in ["Facebook", "Instagram", "TikTok", "Online Ads"]:
-            checkbox = QtWidgets.QCheckBox(channel)
-            checkbox.setChecked(True)  # Checked by default
-            self.channel_checkboxes.append(checkbox)
-            checkbox_layout.addWidget(checkbox)
-        input_layout.addLayout(checkbox_layout)
-
-        solve_button = QtWidgets.QPushButton("Solve")
-        solve_button.setIcon(QtGui.QIcon.fromTheme("media-playback-start"))
-        solve_button.clicked.connect(self.solve_problem)
-        solve_button.setFixedWidth(160)
-        solve_button.setMinimumHeight(50)
-        solve_button.setStyleSheet("background-color: #2c3e50;")
-        input_layout.addWidget(solve_button, alignment=QtCore.Qt.AlignCenter)
-
-        # Results panel
-        self.result_widget = QtWidgets.QWidget()
-        self.result_widget.setStyleSheet("background-color: #ffffff; border-radius: 10px; padding: 15px;")
-        result_layout = QtWidgets.QVBoxLayout(self.result_widget)
-        result_layout.setSpacing(15)
-        main_layout.addWidget(self.result_widget)
-
-        # Result text
-        self.result_label = QtWidgets.QLabel("Enter budget and reach, select at least two channels, and click 'Solve' to see results.")
-        self.result_label.setStyleSheet("font-size: 14px; color: #2c3e50; background-color: #f5f7fa; padding: 10px; border-radius: 5px;")
-        self.result_label.setWordWrap(True)
-        result_layout.addWidget(self.result_label)
-
-        # Matplotlib canvas for bar chart
-        try:
-            plt.style.use('seaborn-v0_8')
-        except:
-            plt.style.use('default')
-        self.figure, self.ax = plt.subplots(figsize=(6, 5.5))  # Increased height
-        self.canvas = FigureCanvas(self.figure)
-        result_layout.addWidget(self.canvas)
-
-        main_layout.addStretch()
-
-        # channel data
-        self.channels = ["Facebook", "Instagram", "TikTok", "Online Ads"]
-        self.costs = [1000, 800, 500, 300]
-        self.reaches = [20000, 15000, 10000, 5000]
-        self.conv_rates = [0.02, 0.03, 0.04, 0.01]
-        self.min_ads = [1, 0, 2, 0]  # Renamed for clarity
-        self.max_ads = [5, 6, 8, 20]  # Renamed for clarity
-
-    def solve_problem(self):
-        """Solve the optimization problem using Gurobi."""
-        try:
-            # Retrieve and validate budget
-            budget_text = self.budget_input.text()
-            if not budget_text:
-                QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter a valid budget.")
-                return
-            budget = float(budget_text)
-
-            # retrieve and validate desired reach
-            reach_text = self.reach_input.text()
-            if not reach_text:
-                QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter a valid desired reach.")
-                return
-            desired_reach = float(reach_text)
-
-            #get selected channels
-            selected_indices = [i for i, checkbox in enumerate(self.channel_checkboxes) if checkbox.isChecked()]
-            if len(selected_indices) < 2:
-                QtWidgets.QMessageBox.critical(self, "Input Error", "Please select at least two channels.")
-                return
-
-            # Gurobi model
-            model = Model("Advertising_Allocation")
-            model.setParam('OutputFlag', 0)
-            x = [model.addVar(lb=self.min_ads[i], ub=self.max_ads[i], vtype=GRB.CONTINUOUS, name=f"Channel_{i}")
-                 for i in selected_indices]
-
-            # objective: maximize conversions for selected channels
-            model.setObjective(sum(self.reaches[i] * self.conv_rates[i] * x[j] for j, i in enumerate(selected_indices)), GRB.MAXIMIZE)
-
-            # constraint: budget for selected channels
-            model.addConstr(sum(self.costs[i] * x[j] for j, i in enumerate(selected_indices)) <= budget, "Budget")
-
-            # Constraint: desired reach for selected channels
-            model.addConstr(sum(self.reaches[i] * x[j] for j, i in enumerate(selected_indices)) >= desired_reach, "Reach")
-
-            # Optimize
-            model.optimize()
-
-            # Display results
-            if model.status == GRB.OPTIMAL:
-                allocations = [0] * 4 
-                for j, i in enumerate(selected_indices):
-                    allocations[i] = x[j].x
-                total_conversions = model.objVal
-                total_cost = sum(self.costs[i] * allocations[i] for i in range(4))
-                total_reach = sum(self.reaches[i] * allocations[i] for i in range(4))
-                result = (f"<b>Optimal Conversions:</b> {total_conversions:.2f}<br>"
-                          f"<b>Total Cost:</b> ${total_cost:.2f}<br>"
-                          f"<b>Total Reach:</b> {total_reach:.2f}<br>"
-                          f"<b>Allocation:</b><br>")
-                for i, channel in enumerate(self.channels):
-                    result += f"  {channel}: ${self.costs[i] * allocations[i]:.2f}<br>"  # Show budget allocated
-                self.result_label.setText(result)
-
-                # Plot bar chart for selected channels
-                self.ax.clear()
-                selected_channels = [self.channels[i] for i in selected_indices]
-                selected_budgets = [self.costs[i] * allocations[i] for i in selected_indices]  # Budget instead of ads
-                sns.barplot(x=selected_budgets, y=selected_channels, ax=self.ax, color='#2c3e50')
-                self.ax.set_title("Advertising Allocation", fontsize=14, pad=10)
-                self.ax.grid(True, axis='x', linestyle='--', alpha=0.7)
-                self.ax.set_xlim(0, max(selected_budgets) * 1.2 if selected_budgets else 1)
-                self.ax.tick_params(axis='y', labelsize=12) 
-                self.figure.tight_layout()
-                self.canvas.draw()
-            else:
-                self.result_label.setText("No optimal solution found. Check budget, reach, or channel selection.")
-                self.ax.clear()
-                self.canvas.draw()
-
-        except ValueError:
-            QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter valid numeric values for budget and reach.")
-        except GurobiError as e:
-            QtWidgets.QMessageBox.critical(self, "Gurobi Error", f"Gurobi error: {e.message}")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
-
-if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    window = AdvertisingGUI()
-    window.show()
+import sys
+import time
+from PyQt5 import QtWidgets, QtCore, QtGui
+import numpy as np
+from advertising_model import DEFAULT_CATALOG, AdvertisingModel, FrontierSolve, load_catalog
+from robust_allocation import DEFAULT_CV, DEFAULT_SCENARIOS, RobustAllocation
+from solve_worker import SolveWorker
+from solver_backends import BackendSolve, GurobiBackend, available_backends, default_backend_name, get_backend
+from telemetry import Telemetry
+
+# Catalogs with more channels than this are solved over all channels, without checkboxes
+MAX_CHECKBOX_CHANNELS = 8
+
+# Channels listed and plotted in the results (largest budgets first)
+MAX_SHOWN_CHANNELS = 20
+
+# Positions of the live budget and reach sliders, and the shortest time between two live solves
+SLIDER_STEPS = 1000
+LIVE_INTERVAL_MS = 30
+
+class AdvertisingGUI(QtWidgets.QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Advertising Budget Allocator")
+        self.setGeometry(100, 100, 900, 700)
+
+        # Apply modern stylesheet
+        self.setStyleSheet("""
+            QMainWindow { background-color: #f5f7fa; }
+            QLabel { font-family: 'Segoe UI', sans-serif; color: #2c3e50; }
+            QLineEdit { 
+                padding: 10px; 
+                border: 1px solid #d1d9e6; 
+                border-radius: 8px; 
+                background-color: #ffffff; 
+                font-size: 16px; 
+            }
+            QCheckBox { 
+                font-family: 'Segoe UI', sans-serif; 
+                font-size: 14px; 
+                color: #2c3e50; 
+                padding: 5px; 
+            }
+            QPushButton { 
+                background-color: #2c3e50; 
+                color: white; 
+                padding: 16px 32px; 
+                border: none; 
+                border-radius: 8px; 
+                font-family: 'Segoe UI', sans-serif; 
+                font-size: 18px; 
+                font-weight: bold; 
+            }
+            QPushButton:hover { background-color: #1f2a44; }
+            QPushButton:pressed { background-color: #17202a; }
+        """)
+
+        # Central widget and main layout
+        central_widget = QtWidgets.QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QtWidgets.QVBoxLayout(central_widget)
+        main_layout.setSpacing(30)
+        main_layout.setContentsMargins(30, 30, 30, 30)
+        main_layout.setAlignment(QtCore.Qt.AlignCenter)
+
+        # Title
+        title_label = QtWidgets.QLabel("Advertising Budget Allocator")
+        title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #2c3e50;")
+        title_label.setAlignment(QtCore.Qt.AlignCenter)
+        main_layout.addWidget(title_label)
+
+        # Input panel
+        input_widget = QtWidgets.QWidget()
+        input_widget.setStyleSheet("background-color: #ffffff; border-radius: 10px; padding: 15px;")
+        input_layout = QtWidgets.QVBoxLayout(input_widget)
+        input_layout.setSpacing(20)
+        input_layout.setAlignment(QtCore.Qt.AlignCenter)
+        main_layout.addWidget(input_widget)
+
+        # Budget input
+        budget_container = QtWidgets.QWidget()
+        budget_container_layout = QtWidgets.QHBoxLayout(budget_container)
+        budget_container_layout.setAlignment(QtCore.Qt.AlignCenter)
+        budget_container_layout.setContentsMargins(0, 0, 0, 0)
+        budget_container_layout.setSpacing(10)
+        budget_label = QtWidgets.QLabel("Budget:")
+        budget_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        budget_container_layout.addWidget(budget_label)
+        self.budget_input = QtWidgets.QLineEdit()
+        self.budget_input.setText("10000")
+        self.budget_input.setFixedWidth(200)
+        self.budget_input.setPlaceholderText("$ Enter budget")
+        validator = QtGui.QDoubleValidator(0.0, 1000000.0, 2)
+        validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
+        self.budget_input.setValidator(validator)
+        budget_container_layout.addWidget(self.budget_input)
+        self.budget_slider = self.add_slider(budget_container_layout, self.budget_input)
+        input_layout.addWidget(budget_container, alignment=QtCore.Qt.AlignCenter)
+
+        # Desired reach input
+        reach_container = QtWidgets.QWidget()
+        reach_container_layout = QtWidgets.QHBoxLayout(reach_container)
+        reach_container_layout.setAlignment(QtCore.Qt.AlignCenter)
+        reach_container_layout.setContentsMargins(0, 0, 0, 0)
+        reach_container_layout.setSpacing(10)
+        reach_label = QtWidgets.QLabel("Desired Reach:")
+        reach_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        reach_container_layout.addWidget(reach_label)
+        self.reach_input = QtWidgets.QLineEdit()
+        self.reach_input.setText("50000")
+        self.reach_input.setFixedWidth(200)
+        self.reach_input.setPlaceholderText("Enter desired reach")
+        reach_validator = QtGui.QDoubleValidator(0.0, 10000000.0, 2)
+        reach_validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
+        self.reach_input.setValidator(reach_validator)
+        reach_container_layout.addWidget(self.reach_input)
+        self.reach_slider = self.add_slider(reach_container_layout, self.reach_input)
+        input_layout.addWidget(reach_container, alignment=QtCore.Qt.AlignCenter)
+
+        # Checkboxes for channels
+        self.checkbox_layout = QtWidgets.QHBoxLayout()
+        self.checkbox_layout.setSpacing(15)
+        self.channel_checkboxes = []
+        input_layout.addLayout(self.checkbox_layout)
+
+        # Channel catalog
+        catalog_layout = QtWidgets.QHBoxLayout()
+        catalog_layout.setAlignment(QtCore.Qt.AlignCenter)
+        self.catalog_label = QtWidgets.QLabel()
+        self.catalog_label.setStyleSheet("font-size: 14px;")
+        catalog_layout.addWidget(self.catalog_label)
+        catalog_button = QtWidgets.QPushButton("Load Catalog...")
+        catalog_button.setToolTip("Load channels from a CSV or JSON catalog file.")
+        catalog_button.clicked.connect(self.load_catalog)
+        catalog_button.setStyleSheet("background-color: #34495e; font-size: 14px; padding: 10px 20px;")
+        catalog_layout.addWidget(catalog_button)
+        input_layout.addLayout(catalog_layout)
+
+        # Robust allocation under uncertain reaches and conversion rates
+        robust_layout = QtWidgets.QHBoxLayout()
+        robust_layout.setAlignment(QtCore.Qt.AlignCenter)
+        robust_layout.setSpacing(10)
+        self.robust_checkbox = QtWidgets.QCheckBox("Robust")
+        self.robust_checkbox.setToolTip(
+            f"Plan for uncertain reaches and conversion rates over {DEFAULT_SCENARIOS:,} sampled scenarios, "
+            "meeting the desired reach with the given probability."
+        )
+        robust_layout.addWidget(self.robust_checkbox)
+        robust_validator = QtGui.QDoubleValidator(0.0, 1.0, 3)
+        robust_validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
+        self.probability_input = QtWidgets.QLineEdit("0.9")
+        self.probability_input.setFixedWidth(100)
+        self.probability_input.setValidator(robust_validator)
+        self.probability_input.setToolTip("Probability of meeting the desired reach, between 0 and 1.")
+        self.uncertainty_input = QtWidgets.QLineEdit(str(DEFAULT_CV))
+        self.uncertainty_input.setFixedWidth(100)
+        self.uncertainty_input.setValidator(QtGui.QDoubleValidator(0.0, 10.0, 3))
+        self.uncertainty_input.setToolTip("Relative standard deviation of the reaches and conversion rates.")
+        for text, line_edit in (("Reach probability:", self.probability_input), ("Uncertainty:", self.uncertainty_input)):
+            label = QtWidgets.QLabel(text)
+            label.setStyleSheet("font-size: 14px;")
+            robust_layout.addWidget(label)
+            robust_layout.addWidget(line_edit)
+            line_edit.setEnabled(False)
+            self.robust_checkbox.toggled.connect(line_edit.setEnabled)
+        input_layout.addLayout(robust_layout)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        button_layout.setAlignment(QtCore.Qt.AlignCenter)
+        solver_label = QtWidgets.QLabel("Solver:")
+        solver_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        button_layout.addWidget(solver_label)
+        self.solver_combo = QtWidgets.QComboBox()
+        self.solver_combo.addItems(["fast"] + available_backends())
+        self.solver_combo.setToolTip("'fast' uses the NumPy allocation solver and falls back to the default backend.")
+        self.solver_combo.setStyleSheet("font-size: 14px; padding: 8px;")
+        button_layout.addWidget(self.solver_combo)
+        self.live_checkbox = QtWidgets.QCheckBox("Live")
+        self.live_checkbox.setToolTip(
+            "Re-solve as the budget and reach sliders move or channels are toggled, updating one model in place."
+        )
+        self.live_checkbox.toggled.connect(self.toggle_live)
+        button_layout.addWidget(self.live_checkbox)
+        self.solve_button = QtWidgets.QPushButton("Solve")
+        self.solve_button.setIcon(QtGui.QIcon.fromTheme("media-playback-start"))
+        self.solve_button.clicked.connect(self.solve_problem)
+        self.solve_button.setFixedWidth(160)
+        self.solve_button.setMinimumHeight(50)
+        self.solve_button.setStyleSheet("background-color: #2c3e50;")
+        button_layout.addWidget(self.solve_button)
+        self.cancel_button = QtWidgets.QPushButton("Cancel")
+        self.cancel_button.setIcon(QtGui.QIcon.fromTheme("process-stop"))
+        self.cancel_button.clicked.connect(self.cancel_solve)
+        self.cancel_button.setFixedWidth(160)
+        self.cancel_button.setMinimumHeight(50)
+        self.cancel_button.setStyleSheet("background-color: #e74c3c;")
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+        input_layout.addLayout(button_layout)
+
+        # Sensitivity sweeps
+        sweep_layout = QtWidgets.QHBoxLayout()
+        sweep_layout.setAlignment(QtCore.Qt.AlignCenter)
+        self.sweep_buttons = {}
+        for constr_name, text in (("Budget", "Budget Sweep"), ("Reach", "Reach Sweep")):
+            sweep_button = QtWidgets.QPushButton(text)
+            sweep_button.clicked.connect(lambda _, name=constr_name: self.sweep(name))
+            sweep_button.setFixedWidth(200)
+            sweep_button.setStyleSheet("background-color: #34495e; font-size: 14px; padding: 10px 20px;")
+            sweep_layout.addWidget(sweep_button)
+            self.sweep_buttons[constr_name] = sweep_button
+        self.solver_combo.currentTextChanged.connect(self.update_sweep_buttons)
+        self.update_sweep_buttons(self.solver_combo.currentText())
+        self.diagnostics_button = QtWidgets.QPushButton("Diagnostics")
+        self.diagnostics_button.setCheckable(True)
+        self.diagnostics_button.setToolTip("Show phase timings, model statistics and the solver log of the last solve.")
+        self.diagnostics_button.setFixedWidth(200)
+        self.diagnostics_button.setStyleSheet("background-color: #34495e; font-size: 14px; padding: 10px 20px;")
+        sweep_layout.addWidget(self.diagnostics_button)
+        input_layout.addLayout(sweep_layout)
+        self.worker = None
+        self.telemetry = None
+
+        # Results panel
+        self.result_widget = QtWidgets.QWidget()
+        self.result_widget.setStyleSheet("background-color: #ffffff; border-radius: 10px; padding: 15px;")
+        result_layout = QtWidgets.QVBoxLayout(self.result_widget)
+        result_layout.setSpacing(15)
+        main_layout.addWidget(self.result_widget)
+
+        # Result text
+        self.result_label = QtWidgets.QLabel("Enter budget and reach, select at least two channels, and click 'Solve' to see results.")
+        self.result_label.setStyleSheet("font-size: 14px; color: #2c3e50; background-color: #f5f7fa; padding: 10px; border-radius: 5px;")
+        self.result_label.setWordWrap(True)
+        result_layout.addWidget(self.result_label)
+
+        # Diagnostics of the last solve, hidden until requested
+        self.diagnostics_area = QtWidgets.QPlainTextEdit()
+        self.diagnostics_area.setReadOnly(True)
+        self.diagnostics_area.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.diagnostics_area.setMinimumHeight(200)
+        self.diagnostics_area.setVisible(False)
+        self.diagnostics_button.toggled.connect(self.diagnostics_area.setVisible)
+        result_layout.addWidget(self.diagnostics_area)
+
+        # Matplotlib canvas for bar chart, created by ensure_canvas on the first plot
+        self.result_layout = result_layout
+        self.figure = self.ax = self.canvas = None
+        self.bars = self.bar_names = self.bar_background = None
+
+        # Live mode: one model kept between solves, which are coalesced while the inputs change
+        self.live_model = self.live_plotted = None
+        # Incremented by every input change, so that results of solves started before it are dropped
+        self.live_generation = 0
+        self.live_worker = None
+        self.live_pending = False
+        self.live_timer = QtCore.QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_INTERVAL_MS)
+        self.live_timer.timeout.connect(self.live_solve)
+
+        main_layout.addStretch()
+
+        # channel data
+        self.set_catalog(DEFAULT_CATALOG)
+
+    def add_slider(self, layout, line_edit):
+        """Add a hidden live-mode slider that writes its value into line_edit and follows edits to it."""
+        slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        slider.setRange(0, SLIDER_STEPS)
+        slider.setFixedWidth(300)
+        slider.setVisible(False)
+        slider.valueChanged.connect(lambda position: self.slider_moved(slider, line_edit, position))
+        line_edit.textEdited.connect(lambda: self.input_edited(slider, line_edit))
+        layout.addWidget(slider)
+        return slider
+
+    def slider_limit(self, slider):
+        """Value at the right end of a slider: the cost or the reach of every channel at its maximum."""
+        values = self.costs if slider is self.budget_slider else self.reaches
+        return max(float(values @ self.max_ads), 1.0)
+
+    def slider_moved(self, slider, line_edit, position):
+        line_edit.setText(f"{position / SLIDER_STEPS * self.slider_limit(slider):.2f}")
+        self.schedule_live_solve()
+
+    def input_edited(self, slider, line_edit):
+        if not self.live_checkbox.isChecked():
+            return
+        self.sync_slider(slider, line_edit)
+        self.schedule_live_solve()
+
+    def sync_slider(self, slider, line_edit):
+        """Move a slider to the value of its line edit without triggering it."""
+        try:
+            value = float(line_edit.text())
+        except ValueError:
+            return
+        slider.blockSignals(True)
+        slider.setValue(round(min(max(value / self.slider_limit(slider), 0.0), 1.0) * SLIDER_STEPS))
+        slider.blockSignals(False)
+
+    def toggle_live(self, checked):
+        """Show the sliders and solve live, or go back to solving with the Solve button."""
+        self.live_plotted = None
+        for slider, line_edit in ((self.budget_slider, self.budget_input), (self.reach_slider, self.reach_input)):
+            slider.setVisible(checked)
+            self.sync_slider(slider, line_edit)
+        # Robust solves take seconds, too long to follow a slider
+        if checked:
+            self.robust_checkbox.setChecked(False)
+        self.robust_checkbox.setEnabled(not checked)
+        if checked:
+            self.schedule_live_solve()
+        else:
+            self.release_live_model()
+
+    def selection_changed(self):
+        self.live_plotted = None
+        self.schedule_live_solve()
+
+    def schedule_live_solve(self):
+        """Solve at most once per LIVE_INTERVAL_MS while the inputs change; the last change is always solved."""
+        # Results of solves started before this change are stale
+        self.live_generation += 1
+        if self.live_checkbox.isChecked() and not self.live_timer.isActive():
+            self.live_timer.start()
+
+    def live_solve(self):
+        """Re-solve the live model for the current inputs and update the results in place.
+
+        The live model covers every channel, and unselected channels are fixed at
+        zero ads through their bounds. The fast solver runs on the GUI thread;
+        other solvers run on a worker thread, and a result whose inputs changed
+        while it was solved is dropped for a solve of the current inputs. With the
+        Gurobi backend the model is built once and only its right-hand sides and
+        bounds change between solves. The chart keeps the order of its bars while
+        the same channels are plotted; the text lists the current largest budgets.
+        """
+        if not self.live_checkbox.isChecked():
+            return
+        if self.worker is not None:
+            # Solve again for the latest inputs once the running solve ends
+            self.live_pending = True
+            return
+        try:
+            budget = float(self.budget_input.text())
+            desired_reach = float(self.reach_input.text())
+        except ValueError:
+            return
+        selected_indices = self.selected_indices()
+        if len(selected_indices) < 2:
+            self.result_label.setText("Select at least two channels.")
+            self.clear_plot()
+            return
+
+        start = time.perf_counter()
+        selected = np.zeros(len(self.channels), dtype=bool)
+        selected[selected_indices] = True
+        min_ads = np.where(selected, self.min_ads, 0.0)
+        max_ads = np.where(selected, self.max_ads, 0.0)
+        if self.live_model is None:
+            self.live_model = AdvertisingModel(self.costs, self.reaches, self.conv_rates, min_ads, max_ads)
+        model = self.live_model
+        method = self.solver_combo.currentText()
+        if method == "fast":
+            model.update(budget, desired_reach, min_ads, max_ads)
+            result = model.solve_fast(budget, desired_reach)
+            if result is not None:
+                self.show_live_result(result, selected_indices, start)
+                return
+            method = default_backend_name()
+
+        if method == GurobiBackend.name:
+            def build():
+                model.update(budget, desired_reach, min_ads, max_ads)
+                if model.model is None:
+                    model.build(budget, desired_reach)
+                return model.model
+
+            self.worker = SolveWorker(build, lambda _: model.result())
+        else:
+            backend = get_backend(method)
+
+            def build():
+                model.update(budget, desired_reach, min_ads, max_ads)
+                return BackendSolve(backend, model.to_problem(budget, desired_reach))
+
+            self.worker = SolveWorker(build, lambda job: model.result_from(job.result))
+        generation = self.live_generation
+
+        def show(result):
+            if generation == self.live_generation:
+                self.show_live_result(result, selected_indices, start)
+
+        self.live_worker = self.worker
+        self.worker.solved.connect(show)
+        self.worker.failed.connect(self.show_live_failure)
+        self.worker.finished.connect(self.solve_finished)
+        self.worker.start()
+
+    def show_live_result(self, result, selected_indices, start):
+        if result["allocation"] is not None:
+            result = dict(result, allocation=np.asarray(result["allocation"])[selected_indices])
+        self.display_results(result, selected_indices, live_time=time.perf_counter() - start)
+
+    def show_live_failure(self, message):
+        self.live_checkbox.setChecked(False)
+        QtWidgets.QMessageBox.critical(self, "Error", f"An error occurred: {message}")
+
+    def release_live_model(self):
+        self.live_timer.stop()
+        # Results of a running live solve are dropped; wait for it before disposing of its model
+        self.live_generation += 1
+        self.live_plotted = None
+        if self.worker is not None and self.worker is self.live_worker:
+            self.worker.cancel()
+            self.worker.wait()
+        if self.live_model is not None and self.live_model.model is not None:
+            self.live_model.model.dispose()
+        self.live_model = None
+
+    def set_catalog(self, catalog):
+        """Use the channels of a catalog dict (see advertising_model.load_catalog)."""
+        self.release_live_model()
+        self.channels = list(catalog["names"])
+        self.costs = np.asarray(catalog["costs"], dtype=float)
+        self.reaches = np.asarray(catalog["reaches"], dtype=float)
+        self.conv_rates = np.asarray(catalog["conv_rates"], dtype=float)
+        self.min_ads = np.asarray(catalog["min_ads"], dtype=float)
+        self.max_ads = np.asarray(catalog["max_ads"], dtype=float)
+
+        for checkbox in self.channel_checkboxes:
+            self.checkbox_layout.removeWidget(checkbox)
+            checkbox.deleteLater()
+        self.channel_checkboxes = []
+        if len(self.channels) <= MAX_CHECKBOX_CHANNELS:
+            for channel in self.channels:
+                checkbox = QtWidgets.QCheckBox(channel)
+                checkbox.setChecked(True)  # Checked by default
+                checkbox.toggled.connect(self.selection_changed)
+                self.channel_checkboxes.append(checkbox)
+                self.checkbox_layout.addWidget(checkbox)
+            self.catalog_label.setText("")
+        else:
+            self.catalog_label.setText(f"{len(self.channels):,} channels loaded (all included)")
+        if self.live_checkbox.isChecked():
+            self.toggle_live(True)
+
+    def load_catalog(self):
+        """Load the channels from a CSV or JSON catalog file."""
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Load Channel Catalog", "", "Catalog files (*.csv *.json);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            catalog = load_catalog(path)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Catalog Error", f"Could not load {path}:\n{e}")
+            return
+        self.set_catalog(catalog)
+        self.clear_plot()
+        self.result_label.setText(f"Loaded {len(self.channels):,} channels. Click 'Solve' to see results.")
+
+    def read_inputs(self):
+        """Return (budget, desired_reach, selected_indices), or None after reporting invalid input."""
+        # Retrieve and validate budget
+        budget_text = self.budget_input.text()
+        if not budget_text:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter a valid budget.")
+            return None
+        budget = float(budget_text)
+
+        # retrieve and validate desired reach
+        reach_text = self.reach_input.text()
+        if not reach_text:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter a valid desired reach.")
+            return None
+        desired_reach = float(reach_text)
+
+        selected_indices = self.selected_indices()
+        if len(selected_indices) < 2:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "Please select at least two channels.")
+            return None
+        return budget, desired_reach, selected_indices
+
+    def selected_indices(self):
+        """Indices of the checked channels, or of all channels when there are no checkboxes."""
+        if self.channel_checkboxes:
+            return np.array([i for i, checkbox in enumerate(self.channel_checkboxes) if checkbox.isChecked()], dtype=int)
+        return np.arange(len(self.channels))
+
+    def solve_problem(self):
+        """Solve the optimization problem with the selected solver."""
+        if self.worker is not None:
+            return
+        method = self.solver_combo.currentText()
+        self.telemetry = telemetry = Telemetry("advertising", method=method)
+        try:
+            with telemetry.phase("parse"):
+                inputs = self.read_inputs()
+                if inputs is None:
+                    return
+                budget, desired_reach, selected_indices = inputs
+                allocation = self.allocation_model(selected_indices)
+            telemetry.context["channels"] = len(selected_indices)
+
+            if self.robust_checkbox.isChecked():
+                self.start_robust_solve(allocation, budget, desired_reach, selected_indices)
+                return
+
+            if method == "fast":
+                with telemetry.phase("solve"):
+                    result = allocation.solve_fast(budget, desired_reach)
+                if result is not None:
+                    telemetry.stats.update(rows=2, columns=len(selected_indices))
+                    self.show_results(result, selected_indices)
+                    return
+                method = telemetry.context["method"] = default_backend_name()
+
+            # Build and solve the model in the background
+            if method == GurobiBackend.name:
+                def collect(model):
+                    telemetry.record_gurobi(model)
+                    return allocation.result()
+
+                self.worker = SolveWorker(lambda: allocation.build(budget, desired_reach), collect, telemetry)
+            else:
+                backend = get_backend(method)
+
+                def collect(job):
+                    telemetry.record_result(job.result)
+                    return allocation.result_from(job.result)
+
+                self.worker = SolveWorker(
+                    lambda: BackendSolve(backend, allocation.to_problem(budget, desired_reach)), collect, telemetry
+                )
+            self.start_worker(lambda result: self.show_results(result, selected_indices))
+
+        except ValueError:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter valid numeric values for budget and reach.")
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
+
+    def start_robust_solve(self, allocation, budget, desired_reach, selected_indices):
+        """Solve the robust scenario LP in the background (see robust_allocation)."""
+        probability = float(self.probability_input.text())
+        uncertainty = float(self.uncertainty_input.text())
+        if not 0 < probability < 1:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "The reach probability must be between 0 and 1.")
+            return
+        method = self.solver_combo.currentText()
+        if method == "fast":
+            method = default_backend_name()
+        backend = get_backend(method)
+        robust = RobustAllocation(
+            allocation, budget, desired_reach, probability, reach_cv=uncertainty, rate_cv=uncertainty
+        )
+        telemetry = self.telemetry
+        telemetry.context.update(method=method, robust=True, probability=probability, uncertainty=uncertainty)
+
+        def collect(job):
+            telemetry.record_result(job.result)
+            result = robust.result_from(job.result, backend)
+            # Sampling is part of the build phase and evaluation of the collect phase
+            telemetry.stats.update(scenarios=robust.num_scenarios, **{
+                f"{name}_time": seconds for name, seconds in robust.timings.items() if name in ("sample", "evaluate")
+            })
+            return result
+
+        self.worker = SolveWorker(lambda: BackendSolve(backend, robust.to_problem()), collect, telemetry)
+        self.start_worker(lambda result: self.show_results(result, selected_indices))
+
+    def start_worker(self, show):
+        """Start self.worker; show is called with the result of a successful solve."""
+        self.worker.solved.connect(show)
+        self.worker.failed.connect(self.show_failure)
+        self.worker.finished.connect(self.solve_finished)
+        self.solve_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.result_label.setText("Solving...")
+        self.worker.start()
+
+    def allocation_model(self, selected_indices):
+        """Allocation LP over the selected channels."""
+        return AdvertisingModel(
+            self.costs[selected_indices],
+            self.reaches[selected_indices],
+            self.conv_rates[selected_indices],
+            self.min_ads[selected_indices],
+            self.max_ads[selected_indices],
+            names=[f"Channel_{i}" for i in selected_indices],
+        )
+
+    def update_sweep_buttons(self, method):
+        """Sweeps read Gurobi's dual values and RHS ranging, so they are only offered when Gurobi solves."""
+        if method == "fast":
+            method = default_backend_name()
+        enabled = method == GurobiBackend.name
+        for constr_name, sweep_button in self.sweep_buttons.items():
+            sweep_button.setEnabled(enabled)
+            sweep_button.setToolTip(
+                f"Plot optimal conversions as the {constr_name.lower()} varies." if enabled
+                else "Sweeps need the dual values and ranging of the Gurobi solver."
+            )
+
+    def sweep(self, constr_name):
+        """Plot optimal conversions against the budget or the desired reach.
+
+        The budget is swept up to the cost of running every channel at its maximum,
+        and the reach up to the largest reach the entered budget can buy. The sweep
+        runs in the background and can be cancelled.
+        """
+        if self.worker is not None:
+            return
+        self.telemetry = telemetry = Telemetry("advertising", method=GurobiBackend.name, sweep=constr_name)
+        try:
+            with telemetry.phase("parse"):
+                inputs = self.read_inputs()
+                if inputs is None:
+                    return
+                budget, desired_reach, selected_indices = inputs
+                allocation = self.allocation_model(selected_indices)
+            telemetry.context["channels"] = len(selected_indices)
+            if constr_name == "Budget":
+                current, high = budget, float(allocation.costs @ allocation.max_ads)
+            else:
+                current, high = desired_reach, float("inf")
+            job = FrontierSolve(allocation, budget, desired_reach, constr_name, 0.0, high)
+            self.worker = SolveWorker(lambda: job, lambda job: job.result, telemetry)
+            self.start_worker(lambda frontier: self.show_sweep(frontier, constr_name, current))
+        except ValueError:
+            QtWidgets.QMessageBox.critical(self, "Input Error", "Please enter valid numeric values for budget and reach.")
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
+
+    def show_sweep(self, frontier, constr_name, current):
+        """Plot the frontier of a finished sweep (see AdvertisingModel.frontier); None if it was cancelled."""
+        if frontier is None:
+            self.telemetry.status = "interrupted"
+            self.result_label.setText("Sweep cancelled.")
+            self.finish_telemetry()
+            return
+        self.telemetry.status = "optimal"
+        self.telemetry.stats.update(solves=frontier["solves"])
+        with self.telemetry.phase("display"):
+            self.plot_sweep(frontier, constr_name, current)
+        self.finish_telemetry()
+
+    def plot_sweep(self, frontier, constr_name, current):
+        points = frontier["points"]
+        label = "Budget ($)" if constr_name == "Budget" else "Desired Reach"
+        self.ensure_canvas()
+        self.ax.clear()
+        self.bars = self.bar_names = self.bar_background = None
+        if len(points) == 0:
+            self.result_label.setText("No feasible allocation in the sweep range.")
+        else:
+            self.result_label.setText(
+                f"<b>Conversions vs {label}:</b> {len(points) - 1} linear piece(s) from {frontier['solves']} solves.<br>"
+                + "<br>".join(f"  {rhs:,.2f}: {conversions:,.2f} conversions" for rhs, conversions in points)
+            )
+            self.ax.plot(points[:, 0], points[:, 1], marker='o', color='#2c3e50')
+            self.ax.axvline(current, linestyle='--', color='#e74c3c', alpha=0.7)
+            self.ax.set_xlabel(label)
+            self.ax.set_ylabel("Optimal Conversions")
+            self.ax.set_title(f"Conversions vs {label}", fontsize=14, pad=10)
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+    def cancel_solve(self):
+        """Stop the running solve."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+
+    def solve_finished(self):
+        self.worker.deleteLater()
+        self.worker = self.live_worker = None
+        self.solve_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if self.live_pending:
+            self.live_pending = False
+            self.live_solve()
+
+    def show_failure(self, message):
+        self.result_label.setText("")
+        self.telemetry.status = "error"
+        self.telemetry.context["error"] = message
+        self.finish_telemetry()
+        QtWidgets.QMessageBox.critical(self, "Error", message)
+
+    def show_results(self, result, selected_indices):
+        """Display the result dict of a finished solve (see AdvertisingModel.solve)."""
+        self.telemetry.status = result["status"]
+        with self.telemetry.phase("display"):
+            self.display_results(result, selected_indices)
+        self.finish_telemetry()
+
+    def finish_telemetry(self):
+        """Show the diagnostics of the finished solve and append them to the telemetry file, if any."""
+        self.diagnostics_area.setPlainText(self.telemetry.format())
+        try:
+            self.telemetry.write()
+        except OSError as e:
+            self.diagnostics_area.appendPlainText(f"\nCould not write telemetry: {e}")
+
+    def display_results(self, result, selected_indices, live_time=None):
+        """Show a result; live_time is the time of a live solve, shown with its result."""
+        if result["status"] == "optimal":
+            allocations = np.zeros(len(self.channels))
+            allocations[selected_indices] = result["allocation"]
+            budgets = self.costs * allocations  # Budget instead of ads
+            total_conversions = result["objective"]
+            total_cost = budgets.sum()
+            total_reach = self.reaches @ allocations
+            result_text = ""
+            if live_time is not None:
+                result_text += f"<b>Live:</b> solved in {live_time * 1000:.1f} ms<br>"
+            result_text += (f"<b>Optimal Conversions:</b> {total_conversions:.2f}<br>"
+                            f"<b>Total Cost:</b> ${total_cost:.2f}<br>"
+                            f"<b>Total Reach:</b> {total_reach:.2f}<br>")
+            if "distribution" in result:
+                result_text += self.robust_text(result)
+            result_text += "<b>Allocation:</b><br>"
+            # Largest budgets first when the catalog is too long to list
+            shown = np.arange(len(self.channels))
+            if len(shown) > MAX_SHOWN_CHANNELS:
+                shown = np.argsort(-budgets, kind="stable")[:MAX_SHOWN_CHANNELS]
+                result_text += f"  (top {MAX_SHOWN_CHANNELS} of {np.count_nonzero(budgets):,} funded channels)<br>"
+            for i in shown:
+                result_text += f"  {self.channels[i]}: ${budgets[i]:.2f}<br>"  # Show budget allocated
+            self.result_label.setText(result_text)
+
+            # Plot bar chart for selected channels
+            selected = set(selected_indices.tolist())
+            plotted = [i for i in shown if i in selected]
+            if live_time is not None:
+                # Live solves keep the bar order while the same channels are plotted, so that the bars can be blitted
+                if self.live_plotted is None or set(plotted) != set(self.live_plotted):
+                    self.live_plotted = plotted
+                plotted = self.live_plotted
+            self.plot_allocation(budgets, plotted)
+        elif result["status"] == "interrupted":
+            self.result_label.setText("Solve cancelled.")
+        else:
+            self.result_label.setText("No optimal solution found. Check budget, reach, or channel selection.")
+            # A live solve keeps the last bars, so that the chart does not flicker while the slider moves
+            if live_time is None:
+                self.clear_plot()
+
+    def plot_allocation(self, budgets, plotted):
+        """Draw the budgets of the plotted channels as horizontal bars.
+
+        The bars are created once per number of plotted channels; later results
+        change their widths and, when other channels are plotted, the tick labels.
+        The bars are animated artists: the rest of the axes
+        is kept as a background bitmap after each full draw, and the bars are
+        blitted onto it. The x-axis limit only changes (with a full redraw) when
+        the largest budget no longer fits or fills less than a third of it.
+        """
+        self.ensure_canvas()
+        names = [self.channels[i] for i in plotted]
+        widths = budgets[plotted]
+        positions = np.arange(len(names))
+        redraw = names != self.bar_names
+        if self.bars is None or len(self.bars) != len(names):
+            self.ax.clear()
+            self.bars = self.ax.barh(positions, widths, color='#2c3e50', animated=True)
+            self.ax.set_yticks(positions, names)
+            self.ax.invert_yaxis()
+            self.ax.set_title("Advertising Allocation", fontsize=14, pad=10)
+            self.ax.grid(True, axis='x', linestyle='--', alpha=0.7)
+            self.ax.tick_params(axis='y', labelsize=12)
+            self.ax.set_xlim(0, 1)
+            self.figure.tight_layout()
+        else:
+            for bar, width in zip(self.bars, widths):
+                bar.set_width(width)
+            if redraw:
+                # Other channels in the same number of bars: relabel them
+                self.ax.set_yticks(positions, names)
+        self.bar_names = names
+        largest = widths.max() if len(widths) else 0.0
+        high = self.ax.get_xlim()[1]
+        if largest > high or (largest > 0 and largest * 3 < high):
+            self.ax.set_xlim(0, largest * 1.2)
+            redraw = True
+        if redraw or self.bar_background is None:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self.bar_background)
+            self.draw_bars()
+
+    def draw_bars(self):
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+        self.canvas.blit(self.ax.bbox)
+
+    def capture_background(self, event):
+        """After a full draw, keep the axes without the bars as background and draw the bars on it."""
+        if self.bars is None:
+            return
+        self.bar_background = self.canvas.copy_from_bbox(self.ax.bbox)
+        # Inside a draw the canvas is painted afterwards, so the bars need no blit
+        for bar in self.bars:
+            self.ax.draw_artist(bar)
+
+    @staticmethod
+    def robust_text(result):
+        """Conversions range and reach probability of a robust result, compared with the nominal plan."""
+        dist = result["distribution"]
+        low, _, high = dist["conversion_quantiles"].values()
+        text = (f"<b>Conversions (5-95%):</b> {low:,.2f} to {high:,.2f}, expected {dist['expected_conversions']:,.2f}<br>"
+                f"<b>Reach met in:</b> {dist['reach_probability']:.1%} of scenarios "
+                f"(target {result['probability']:.0%})<br>")
+        nominal = result.get("nominal_distribution")
+        if nominal is not None:
+            text += (f"<b>Nominal plan:</b> reach met in {nominal['reach_probability']:.1%} of scenarios, "
+                     f"expected {nominal['expected_conversions']:,.2f} conversions<br>")
+        return text
+
+    def ensure_canvas(self):
+        """Create the Matplotlib figure and canvas, importing the plotting stack on first use."""
+        if self.canvas is not None:
+            return
+        from matplotlib import style
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        try:
+            style.use('seaborn-v0_8')
+        except OSError:
+            style.use('default')
+        self.figure = Figure(figsize=(6, 5.5))  # Increased height
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect("draw_event", self.capture_background)
+        self.result_layout.addWidget(self.canvas)
+
+    def clear_plot(self):
+        if self.canvas is not None:
+            self.ax.clear()
+            self.bars = self.bar_names = self.bar_background = None
+            self.canvas.draw()
+
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
+if __name__ == "__main__":
+    app = QtWidgets.QApplication(sys.argv)
+    window = AdvertisingGUI()
+    window.show()
     sys.exit(app.exec_())
\ No newline at end of file
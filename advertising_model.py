@@ -0,0 +1,416 @@
+"""Headless advertising budget allocation LP.
+
+This module does not depend on PyQt5 and is used by the AdvertisingGUI.
+Channel data can be loaded from a CSV or JSON catalog with load_catalog.
+"""
+import json
+import os
+
+import numpy as np
+
+from solver_backends import GurobiBackend, LinearProblem
+from telemetry import log_to_callback_only
+
+# Catalog file columns and the AdvertisingModel arguments they are loaded into
+CATALOG_COLUMNS = {
+    "cost": "costs",
+    "reach": "reaches",
+    "conv_rate": "conv_rates",
+    "min_ads": "min_ads",
+    "max_ads": "max_ads",
+}
+
+# Channels used when no catalog has been loaded
+DEFAULT_CATALOG = {
+    "names": ["Facebook", "Instagram", "TikTok", "Online Ads"],
+    "costs": np.array([1000.0, 800.0, 500.0, 300.0]),
+    "reaches": np.array([20000.0, 15000.0, 10000.0, 5000.0]),
+    "conv_rates": np.array([0.02, 0.03, 0.04, 0.01]),
+    "min_ads": np.array([1.0, 0.0, 2.0, 0.0]),
+    "max_ads": np.array([5.0, 6.0, 8.0, 20.0]),
+}
+
+# Iterations of the multiplier search in AdvertisingModel.solve_fast before giving up
+FAST_MAX_ITERATIONS = 100
+
+
+def load_catalog(path):
+    """Load a channel catalog from a .csv or .json file.
+
+    The file has one record per channel with the columns of CATALOG_COLUMNS and an
+    optional "name" column. JSON files hold a list of records, or an object with
+    a "channels" list. Returns a dict of AdvertisingModel arguments, so that
+    AdvertisingModel(**catalog) builds the model over the whole catalog.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".csv", ".txt"):
+        table = pd.read_csv(path, skipinitialspace=True)
+    elif extension == ".json":
+        with open(path) as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records.get("channels", records)
+        table = pd.DataFrame(records)
+    else:
+        raise ValueError(f"Unsupported catalog file type '{extension}'. Use .csv or .json.")
+
+    table.columns = [str(column).strip().lower() for column in table.columns]
+    missing = [column for column in CATALOG_COLUMNS if column not in table.columns]
+    if missing:
+        raise ValueError(f"The catalog is missing the column(s): {', '.join(missing)}.")
+    if table.empty:
+        raise ValueError("The catalog contains no channels.")
+
+    catalog = {}
+    for column, key in CATALOG_COLUMNS.items():
+        values = pd.to_numeric(table[column], errors="coerce").to_numpy(dtype=float)
+        _check_catalog_column(~np.isfinite(values), column, "is missing or not a number")
+        catalog[key] = values
+    _check_catalog_column(catalog["costs"] <= 0, "cost", "must be positive")
+    _check_catalog_column(catalog["reaches"] < 0, "reach", "must not be negative")
+    _check_catalog_column(
+        (catalog["conv_rates"] < 0) | (catalog["conv_rates"] > 1), "conv_rate", "must be between 0 and 1"
+    )
+    _check_catalog_column(catalog["min_ads"] < 0, "min_ads", "must not be negative")
+    _check_catalog_column(catalog["max_ads"] < catalog["min_ads"], "max_ads", "must not be below min_ads")
+
+    if "name" in table.columns:
+        catalog["names"] = table["name"].fillna("").astype(str).str.strip().tolist()
+    else:
+        catalog["names"] = [f"Channel_{i}" for i in range(len(table))]
+    return catalog
+
+
+def _check_catalog_column(mask, column, reason):
+    """Raise a ValueError for the first catalog row where mask is True, if any."""
+    rows = np.flatnonzero(mask)
+    if rows.size == 0:
+        return
+    message = f"The catalog column '{column}' {reason} at row {rows[0] + 1}"
+    if rows.size > 1:
+        message += f" ({rows.size - 1} more rows have the same problem)"
+    raise ValueError(message + ".")
+
+
+def _greedy(ratio, costs, capacity, budget):
+    """Fill channels by decreasing ratio up to their capacity until the budget runs out.
+
+    Returns the number of ads per channel, with the last channel that fits filled
+    fractionally; channels with ratio <= 0 are left empty. With ratio = v / costs
+    this solves max v @ x s.t. costs @ x <= budget, 0 <= x <= capacity.
+    """
+    x = np.zeros(len(costs))
+    positive = np.flatnonzero(ratio > 0)
+    order = positive[np.argsort(-ratio[positive])]
+    spend = np.cumsum(costs[order] * capacity[order])
+    full = int(np.searchsorted(spend, budget, side="right"))
+    x[order[:full]] = capacity[order[:full]]
+    if full < len(order):
+        remaining = budget - (spend[full - 1] if full else 0.0)
+        x[order[full]] = remaining / costs[order[full]]
+    return x
+
+
+class AdvertisingModel:
+    """Allocation LP: maximize conversions subject to a budget and a desired reach.
+
+    Channel data are sequences with one entry per channel: cost per ad, reach
+    per ad, conversion rate and minimum/maximum number of ads.
+    """
+
+    def __init__(self, costs, reaches, conv_rates, min_ads, max_ads, names=None):
+        self.costs = np.asarray(costs, dtype=float)
+        self.reaches = np.asarray(reaches, dtype=float)
+        self.conv_rates = np.asarray(conv_rates, dtype=float)
+        self.min_ads = np.asarray(min_ads, dtype=float)
+        self.max_ads = np.asarray(max_ads, dtype=float)
+        self.names = list(names) if names is not None else [f"Channel_{i}" for i in range(len(self.costs))]
+
+        self.model = None
+        self.x = None
+        self.constrs = {}
+
+    def conversions(self):
+        """Expected conversions per ad of each channel (the objective coefficients)."""
+        return self.reaches * self.conv_rates
+
+    def to_problem(self, budget, desired_reach):
+        """Describe the LP as a LinearProblem for any solver backend (rows: Budget, Reach)."""
+        return LinearProblem(
+            self.conversions(),
+            np.vstack([self.costs, self.reaches]),
+            np.array(["<", ">"]),
+            np.array([budget, desired_reach], dtype=float),
+            lb=self.min_ads,
+            ub=self.max_ads,
+            maximize=True,
+            var_names=self.names,
+            constr_names=["Budget", "Reach"],
+        )
+
+    def build(self, budget, desired_reach):
+        """Build the Gurobi model and return it."""
+        problem = self.to_problem(budget, desired_reach)
+        model, x, constrs = GurobiBackend().build_model(problem, "Advertising_Allocation")
+        log_to_callback_only(model)
+
+        self.model = model
+        self.x = x
+        self.constrs = {"Budget": constrs[0].item(), "Reach": constrs[1].item()}
+        return model
+
+    def update(self, budget, desired_reach, min_ads=None, max_ads=None):
+        """Change the budget, the desired reach and optionally the ad limits in place.
+
+        The channel arrays are replaced and, after build(), the Budget and Reach
+        right-hand sides and the variable bounds of the Gurobi model are set
+        without rebuilding it. The model keeps its basis, so the next optimize()
+        starts from the previous solution.
+        """
+        if min_ads is not None:
+            self.min_ads = np.asarray(min_ads, dtype=float)
+        if max_ads is not None:
+            self.max_ads = np.asarray(max_ads, dtype=float)
+        if self.model is None:
+            return
+        self.constrs["Budget"].RHS = budget
+        self.constrs["Reach"].RHS = desired_reach
+        if min_ads is not None:
+            self.x.LB = self.min_ads
+        if max_ads is not None:
+            self.x.UB = self.max_ads
+
+    def reoptimize(self, budget, desired_reach, min_ads=None, max_ads=None):
+        """Update the model in place (see update), building it on the first call, optimize and return the result dict."""
+        self.update(budget, desired_reach, min_ads, max_ads)
+        if self.model is None:
+            self.build(budget, desired_reach)
+        self.model.optimize()
+        return self.result()
+
+    def allocation(self):
+        """Number of ads per channel in the current solution."""
+        return self.x.X
+
+    def result(self):
+        """Result dict (as returned by solve) for the solved Gurobi model."""
+        from gurobipy import GRB
+
+        status = self.model.Status
+        if status != GRB.OPTIMAL:
+            name = {GRB.INFEASIBLE: "infeasible", GRB.INTERRUPTED: "interrupted"}.get(status, "not_solved")
+            return {"status": name, "allocation": None, "objective": None, "method": "gurobi"}
+        return {"status": "optimal", "allocation": self.allocation(), "objective": self.model.ObjVal,
+                "method": "gurobi"}
+
+    def result_from(self, result):
+        """Result dict (as returned by solve) from a solver backend result."""
+        if result["x"] is None or result["status"] != "optimal":
+            return {"status": result["status"], "allocation": None, "objective": None, "method": result["backend"]}
+        return {"status": "optimal", "allocation": result["x"], "objective": result["objective"],
+                "method": result["backend"]}
+
+    def solve_with(self, backend, budget, desired_reach):
+        """Solve with a solver backend (see solver_backends) and return the result dict."""
+        return self.result_from(backend.solve(self.to_problem(budget, desired_reach)))
+
+    def solve_gurobi(self, budget, desired_reach):
+        """Build and optimize the Gurobi model and return its result dict."""
+        self.build(budget, desired_reach).optimize()
+        return self.result()
+
+    def solve_fast(self, budget, desired_reach):
+        """Solve the LP without Gurobi, in linear time per multiplier step.
+
+        With only the budget and reach constraints the LP is a continuous knapsack
+        once the reach constraint is moved into the objective with a multiplier mu:
+        the greedy fill by (conversions + mu * reach) / cost is optimal. The reach
+        achieved grows with mu, so mu is searched between a solution that misses
+        the reach and one that meets it, each time at the mu where both solutions
+        have the same Lagrangian value. Once no other solution beats them there,
+        both are optimal for that mu and the blend that meets the reach exactly is
+        optimal for the LP. Returns a result dict, or None if the search does not
+        converge (the caller then falls back to solve_gurobi).
+        """
+        value = self.conversions()
+        capacity = self.max_ads - self.min_ads
+        spare_budget = budget - self.costs @ self.min_ads
+        missing_reach = desired_reach - self.reaches @ self.min_ads
+        infeasible = {"status": "infeasible", "allocation": None, "objective": None, "method": "fast"}
+        if spare_budget < -1e-9 * max(1.0, abs(budget)):
+            return infeasible
+        spare_budget = max(spare_budget, 0.0)
+
+        def greedy(mu):
+            return _greedy((value + mu * self.reaches) / self.costs, self.costs, capacity, spare_budget)
+
+        def finish(extra):
+            allocation = self.min_ads + extra
+            return {"status": "optimal", "allocation": allocation, "objective": float(value @ allocation),
+                    "method": "fast"}
+
+        low = greedy(0.0)
+        low_reach = self.reaches @ low
+        if low_reach >= missing_reach:
+            return finish(low)
+
+        # Most reach the budget can buy, breaking ties by conversions
+        order = np.lexsort((value / self.costs, self.reaches / self.costs))
+        rank = np.empty(len(order))
+        rank[order] = np.arange(1, len(order) + 1)
+        high = _greedy(np.where(self.reaches > 0, rank, 0.0), self.costs, capacity, spare_budget)
+        high_reach = self.reaches @ high
+        if high_reach < missing_reach - 1e-9 * max(1.0, abs(desired_reach)):
+            return infeasible
+
+        low_value, high_value = value @ low, value @ high
+        for _ in range(FAST_MAX_ITERATIONS):
+            if high_reach <= low_reach:
+                return None
+            # Multiplier at which low and high have the same Lagrangian value
+            mu = max((low_value - high_value) / (high_reach - low_reach), 0.0)
+            candidate = greedy(mu)
+            candidate_reach = self.reaches @ candidate
+            candidate_value = value @ candidate
+            line = low_value + mu * low_reach
+            if candidate_value + mu * candidate_reach <= line + 1e-9 * max(1.0, abs(line)):
+                theta = (missing_reach - low_reach) / (high_reach - low_reach)
+                return finish((1 - theta) * low + theta * high)
+            if candidate_reach >= missing_reach:
+                high, high_reach, high_value = candidate, candidate_reach, candidate_value
+            else:
+                low, low_reach, low_value = candidate, candidate_reach, candidate_value
+        return None
+
+    def solve(self, budget, desired_reach, verify=False, backend=None):
+        """Solve with solve_fast, falling back to a solver backend if it does not converge.
+
+        backend defaults to the Gurobi model of build(). With verify=True the
+        backend solves the LP as well and its result is returned (with the fast
+        result under "fast") if the two disagree.
+        """
+        def reference_solve():
+            if backend is None:
+                return self.solve_gurobi(budget, desired_reach)
+            return self.solve_with(backend, budget, desired_reach)
+
+        result = self.solve_fast(budget, desired_reach)
+        if result is None:
+            return reference_solve()
+        if verify:
+            reference = reference_solve()
+            if not results_agree(result, reference):
+                reference["fast"] = result
+                return reference
+        return result
+
+    def lhs_limit(self, constr_name):
+        """Smallest (Budget) or largest (Reach) left-hand side allowed by the other constraints.
+
+        This is where the frontier over that constraint's right-hand side stops
+        being feasible. Returns None if the other constraints are infeasible.
+        """
+        from gurobipy import GRB
+
+        constr = self.constrs[constr_name]
+        probe = self.model.copy()
+        row = probe.getRow(probe.getConstrByName(constr_name))
+        probe.remove(probe.getConstrByName(constr_name))
+        probe.setObjective(row, GRB.MINIMIZE if constr.Sense == GRB.LESS_EQUAL else GRB.MAXIMIZE)
+        probe.optimize()
+        limit = probe.ObjVal if probe.Status == GRB.OPTIMAL else None
+        probe.dispose()
+        return limit
+
+    def frontier(self, constr_name, low, high, stop=None):
+        """Piecewise-linear optimal conversions as a function of one constraint's right-hand side.
+
+        Solves at one point of each linear piece only: the dual value (Pi) gives the
+        slope and RHS ranging (SARHSLow/SARHSUp) gives where the piece ends, so the
+        number of solves equals the number of pieces. Returns a dict with the
+        breakpoints as an (n, 2) array of (rhs, conversions) and the number of
+        solves. The right-hand side is restored afterwards. stop is an optional
+        function checked before each solve; the sweep ends early once it returns
+        True.
+        """
+        from gurobipy import GRB
+
+        constr = self.constrs[constr_name]
+        self.model.update()
+        original_rhs = constr.RHS
+        limit = self.lhs_limit(constr_name)
+        if limit is None:
+            return {"points": np.empty((0, 2)), "solves": 1}
+        if constr.Sense == GRB.LESS_EQUAL:
+            low = max(low, limit)
+        else:
+            high = min(high, limit)
+
+        points = []
+        solves = 1
+        rhs = low
+        while rhs <= high and not (stop is not None and stop()):
+            constr.RHS = rhs
+            self.model.optimize()
+            solves += 1
+            if self.model.Status != GRB.OPTIMAL:
+                break
+            objective = self.model.ObjVal
+            slope = constr.Pi
+            piece_low = max(constr.SARHSLow, low)
+            piece_high = min(constr.SARHSUp, high)
+            if not points:
+                points.append((piece_low, objective + slope * (piece_low - rhs)))
+            points.append((piece_high, objective + slope * (piece_high - rhs)))
+            if piece_high >= high:
+                break
+            # Step just past the breakpoint, so that the next solve lands inside the next piece
+            rhs = piece_high + 1e-7 * max(1.0, abs(piece_high))
+
+        constr.RHS = original_rhs
+        self.model.update()
+        return {"points": np.array(points), "solves": solves}
+
+
+class FrontierSolve:
+    """Builds an AdvertisingModel and computes its frontier behind the optimize()/terminate() interface of SolveWorker.
+
+    The frontier dict is stored in self.result, or None if terminate() was called
+    before the sweep ended. The Gurobi model is disposed of afterwards.
+    """
+
+    def __init__(self, allocation, budget, desired_reach, constr_name, low, high):
+        self.allocation = allocation
+        self.budget = budget
+        self.desired_reach = desired_reach
+        self.constr_name = constr_name
+        self.low = low
+        self.high = high
+        self.result = None
+        self.terminated = False
+
+    def optimize(self, callback=None):
+        if self.terminated:
+            return
+        try:
+            self.allocation.build(self.budget, self.desired_reach)
+            frontier = self.allocation.frontier(self.constr_name, self.low, self.high, stop=lambda: self.terminated)
+        finally:
+            if self.allocation.model is not None:
+                self.allocation.model.dispose()
+                self.allocation.model = None
+        self.result = None if self.terminated else frontier
+
+    def terminate(self):
+        self.terminated = True
+
+
+def results_agree(first, second, tolerance=1e-6):
+    """True if two result dicts have the same status and objective (relative to tolerance)."""
+    if first["status"] != second["status"]:
+        return False
+    if first["objective"] is None or second["objective"] is None:
+        return first["objective"] is second["objective"]
+    return abs(first["objective"] - second["objective"]) <= tolerance * max(1.0, abs(second["objective"]))
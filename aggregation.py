@@ -0,0 +1,142 @@
+"""Aggregation of interchangeable employees.
+
+Employees with identical costs, availability and max shifts (the same contract
+type and skills) are interchangeable, and the binary model has one symmetric
+copy of every schedule per permutation of them, which makes branch-and-bound
+crawl. AggregatedSchedulingModel groups such employees into classes and solves
+for y[k, d, s], the number of employees of class k working shift s on day d:
+
+    sum_k y[k, d, s] == requirements[d, s]
+    sum_{d, s} y[k, d, s] <= size[k] * floor(max_shifts[k])
+    0 <= y[k, d, s] <= size[k], integer, only for available cells
+
+Any such y is disaggregated into a per-employee assignment of the same cost by
+dealing the cells of each class round-robin over its employees, so the
+aggregated model is exact, not a relaxation.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from scheduling_model import StaffSchedulingModel
+from solver_backends import INTEGER, LinearProblem
+
+
+def employee_classes(costs, availability, max_shifts):
+    """Group employees with identical cost, availability and max-shift data.
+
+    Returns (representatives, classes, sizes): the first employee of each class,
+    the class of every employee and the number of employees per class. Classes
+    are numbered in the order of their first employee.
+    """
+    costs = np.asarray(costs, dtype=float)
+    num_employees = costs.shape[0]
+    rows = np.hstack([
+        costs.reshape(num_employees, -1),
+        (np.asarray(availability) != 0).reshape(num_employees, -1),
+        np.broadcast_to(np.asarray(max_shifts, dtype=float), (num_employees,))[:, None],
+    ])
+    _, first, inverse, sizes = np.unique(rows, axis=0, return_index=True, return_inverse=True, return_counts=True)
+    # np.unique sorts the rows; renumber the classes by first employee
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return first[order], rank[inverse.ravel()], sizes[order]
+
+
+class AggregatedSchedulingModel(StaffSchedulingModel):
+    """Staff-scheduling model over classes of interchangeable employees.
+
+    Takes the same inputs as StaffSchedulingModel and can be used in its place:
+    to_problem, build, solve_with, assignment_from and size_report work on the
+    aggregated variables, and assignments are returned per employee. The rows of
+    the problem are Requirements_{d}_{s} followed by ClassShifts_{k}, so
+    max_shift_constrs holds the class capacity constraints after build().
+    """
+
+    def __init__(self, costs, availability, requirements, max_shifts):
+        super().__init__(costs, availability, requirements, max_shifts)
+        self.representatives, self.classes, self.class_sizes = employee_classes(
+            self.costs, self.availability, self.max_shifts
+        )
+
+    @property
+    def num_classes(self):
+        return self.class_sizes.size
+
+    def to_problem(self):
+        """Describe the aggregated model as a LinearProblem with one integer variable per available class cell."""
+        num_days, num_shifts = self.num_days, self.num_shifts
+        num_cells = num_days * num_shifts
+        representatives = self.representatives
+
+        # Flat (k, d, s) indices of the available class cells
+        cells = np.flatnonzero(self.availability[representatives].ravel())
+        num_vars = cells.size
+        columns = np.arange(num_vars)
+        ones = np.ones(num_vars)
+        classes = cells // num_cells
+
+        coverage = sp.csr_matrix((ones, (cells % num_cells, columns)), shape=(num_cells, num_vars))
+        capacity = sp.csr_matrix((ones, (classes, columns)), shape=(self.num_classes, num_vars))
+
+        self.cells = cells
+        return LinearProblem(
+            self.costs[representatives].ravel()[cells],
+            sp.vstack([coverage, capacity], format="csr"),
+            np.repeat(np.array(["=", "<"]), [num_cells, self.num_classes]),
+            np.concatenate([
+                self.requirements.ravel(),
+                self.class_sizes * np.floor(self.max_shifts[representatives] + 1e-9),
+            ]),
+            ub=self.class_sizes[classes].astype(float),
+            vtypes=INTEGER,
+            constr_names=[f"Requirements_{d}_{s}" for d in range(num_days) for s in range(num_shifts)]
+            + [f"ClassShifts_{k}" for k in range(self.num_classes)],
+        )
+
+    def class_assignment_from(self, x):
+        """Integer (K, T, S) array of employees per class and cell from a solution vector."""
+        counts = np.zeros(self.num_classes * self.num_days * self.num_shifts, dtype=int)
+        counts[self.cells] = np.rint(x).astype(int)
+        return counts.reshape(self.num_classes, self.num_days, self.num_shifts)
+
+    def assignment_from(self, x):
+        """Disaggregate a solution vector into a boolean (E, T, S) assignment.
+
+        The cells of a class, each repeated by its count, are dealt to the class's
+        employees in turn: the copies of a cell go to distinct employees (a count
+        never exceeds the class size) and the employees' shift totals differ by at
+        most one, so none exceeds the max shifts.
+        """
+        counts = self.class_assignment_from(x).reshape(self.num_classes, -1)
+        assigned = np.zeros((self.num_employees, self.num_days * self.num_shifts), dtype=bool)
+        for k in range(self.num_classes):
+            members = np.flatnonzero(self.classes == k)
+            dealt = np.repeat(np.arange(counts.shape[1]), counts[k])
+            assigned[members[np.arange(dealt.size) % members.size], dealt] = True
+        return assigned.reshape(self.costs.shape)
+
+    def start_from(self, assignment):
+        """MIP start from an (E, T, S) assignment: the number of assigned employees per class cell."""
+        assignment = np.asarray(assignment, dtype=float).reshape(self.num_employees, -1)
+        counts = np.zeros((self.num_classes, assignment.shape[1]))
+        np.add.at(counts, self.classes, assignment)
+        return counts.ravel()[self.cells]
+
+    def size_report(self):
+        """Size of the aggregated model compared with the dense per-employee formulation."""
+        dense_vars = self.costs.size
+        dense_constrs = self.num_days * self.num_shifts + self.num_employees + (
+            dense_vars - int(np.count_nonzero(self.availability))
+        )
+        num_vars = int(np.count_nonzero(self.availability[self.representatives]))
+        num_constrs = self.num_days * self.num_shifts + self.num_classes
+        return {
+            "dense_vars": dense_vars,
+            "dense_constrs": dense_constrs,
+            "vars": num_vars,
+            "constrs": num_constrs,
+            "vars_saved": dense_vars - num_vars,
+            "constrs_saved": dense_constrs - num_constrs,
+            "classes": self.num_classes,
+        }
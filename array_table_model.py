@@ -0,0 +1,155 @@
+"""Qt table model backed by a NumPy array.
+
+Only the cells and header sections that a view asks for are formatted, so
+tables with millions of rows stay responsive.
+"""
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """Editable table model over a 2-D float array, where NaN marks an empty cell.
+
+    row_label(row) and col_label(col) return header texts and are only called for
+    the header sections being painted.
+    """
+
+    def __init__(self, row_label=None, col_label=None, parent=None):
+        super().__init__(parent)
+        self.values = np.full((0, 0), np.nan)
+        self.row_label = row_label
+        self.col_label = col_label
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.values.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        value = self.values[index.row(), index.column()]
+        return "" if np.isnan(value) else f"{value:g}"
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Store an edited cell; text that is not a number is rejected."""
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        text = str(value).strip()
+        try:
+            number = float(text) if text else np.nan
+        except ValueError:
+            return False
+        if not self.values.flags.writeable or self.values.dtype != np.float64:
+            # Copy read-only arrays and widen float32 ones, which cannot hold every typed value exactly
+            self.values = self.values.astype(np.float64)
+        self.values[index.row(), index.column()] = number
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        label = self.row_label if orientation == Qt.Vertical else self.col_label
+        return label(section) if label is not None else str(section + 1)
+
+    def set_labels(self, row_label, col_label):
+        """Replace the header label functions."""
+        self.row_label = row_label
+        self.col_label = col_label
+        if self.values.shape[0]:
+            self.headerDataChanged.emit(Qt.Vertical, 0, self.values.shape[0] - 1)
+        if self.values.shape[1]:
+            self.headerDataChanged.emit(Qt.Horizontal, 0, self.values.shape[1] - 1)
+
+    def resize(self, rows, cols):
+        """Resize the table, keeping the values of the overlapping block."""
+        if (rows, cols) == self.values.shape:
+            return
+        resized = np.full((rows, cols), np.nan)
+        keep_rows = min(rows, self.values.shape[0])
+        keep_cols = min(cols, self.values.shape[1])
+        resized[:keep_rows, :keep_cols] = self.values[:keep_rows, :keep_cols]
+        self.set_array(resized)
+
+    def set_array(self, values):
+        """Replace the whole table content with a 2-D array.
+
+        Float arrays are kept as they are, including read-only and memory-mapped
+        ones; other arrays become float32 when that is exact (booleans, small
+        integers) and float64 otherwise. The first edit copies the array to
+        float64, so edited values are stored exactly.
+        """
+        values = np.asarray(values)
+        values = values.astype(np.result_type(values.dtype, np.float32), copy=False)
+        if values.ndim != 2:
+            raise ValueError(f"Table data must be 2-D, got shape {values.shape}.")
+        self.beginResetModel()
+        self.values = values
+        self.endResetModel()
+
+    def array(self):
+        """Return the table content as a float array (NaN for empty cells)."""
+        return self.values
+
+
+class AssignmentTableModel(QAbstractTableModel):
+    """Read-only view of an (E, T, S) boolean assignment array.
+
+    In list mode there is one row per assignment (Employee, Day, Shift). In pivot
+    mode rows are employees, columns are days and each cell lists the shifts
+    worked. Texts are only built for the cells being painted.
+    """
+
+    HEADERS = ["Employee", "Day", "Shift"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.assignment = np.zeros((0, 0, 0), dtype=bool)
+        self.rows = np.empty((0, 3), dtype=np.int64)
+        self.pivot = False
+
+    def set_assignment(self, assignment):
+        """Show a new assignment array (or clear the view with None)."""
+        self.beginResetModel()
+        self.assignment = np.zeros((0, 0, 0), dtype=bool) if assignment is None else assignment
+        self.rows = np.argwhere(self.assignment)
+        self.endResetModel()
+
+    def set_pivot(self, pivot):
+        """Switch between the assignment list and the employee x day grid."""
+        self.beginResetModel()
+        self.pivot = pivot
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.assignment.shape[0] if self.pivot else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.assignment.shape[1] if self.pivot else 3
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        if self.pivot:
+            shifts = np.flatnonzero(self.assignment[index.row(), index.column()])
+            return ", ".join(f"Shift {s + 1}" for s in shifts)
+        label = self.HEADERS[index.column()]
+        return f"{label} {self.rows[index.row(), index.column()] + 1}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if self.pivot:
+            return f"Employee {section + 1}" if orientation == Qt.Vertical else f"Day {section + 1}"
+        return self.HEADERS[section] if orientation == Qt.Horizontal else str(section + 1)
@@ -0,0 +1,298 @@
+"""Solve a directory of staff-scheduling instances in parallel, without the GUI.
+
+Usage:
+    python batch_solve.py INSTANCE_DIR OUTPUT_DIR [--workers N] [--format json|csv]
+                          [--rolling WINDOW STEP] [--backend gurobi|highs] [--cache-dir DIR]
+                          [--telemetry FILE] [--aggregate] [--no-flow] [--decompose]
+                          [--one-shift-per-day] [--max-consecutive-days N] [--rest A B ...]
+                          [--enumerate-rules]
+
+Each instance file (.ssi, .npz or .json, see instance_io.load_instance) is solved in
+a separate worker process. One result file is written per instance, plus
+summary.csv and summary.json with the status, objective, build time and solve
+time of every instance. Instances that fail the feasibility pre-checks are
+reported infeasible without solving; the diagnosis column explains why, or
+lists the conflicting constraints of an infeasible solve (see feasibility).
+With --cache-dir, instances solved before (same data and solver parameters)
+are answered from the solution cache, and instances close to a cached one
+start from its solution (see solution_cache). With --telemetry, the phase
+timings, model statistics and solver log of every instance are appended to
+FILE as JSON lines (see telemetry). With --aggregate, employees with identical
+costs, availability and max shifts are solved as classes (see aggregation).
+Models with only the availability, requirement and max-shift constraints are
+solved as min-cost flows unless --no-flow is given (see min_cost_flow); the
+backend column names the solver used. With --decompose, every instance is split
+into independent sub-rosters, by the partition stored with it or else by the
+connected components of its availability, which are solved one after the other
+in the instance's worker (see decomposition). --one-shift-per-day,
+--max-consecutive-days and --rest add work rules, which are added to the model
+only where a solution violates them, or all up front with --enumerate-rules
+(see work_rules).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from aggregation import AggregatedSchedulingModel
+from feasibility import diagnose_infeasible, precheck
+from decomposition import solve_decomposed
+from instance_io import INSTANCE_EXTENSIONS, export_assignment, load_instance, load_partition
+from min_cost_flow import FlowBackend
+from rolling_horizon import solve_rolling_horizon
+from scheduling_model import StaffSchedulingModel
+from solution_cache import SolutionCache, instance_key, row_digests
+from solver_backends import BACKENDS, default_backend_name, get_backend, solve_result, thread_budget
+from telemetry import Telemetry
+from work_rules import RuleSchedulingModel, WorkRules
+
+SUMMARY_FIELDS = [
+    "instance", "backend", "status", "objective", "build_time", "solve_time", "assignments", "cache", "diagnosis",
+    "error",
+]
+
+
+def find_instances(instance_dir):
+    """Return the sorted paths of the instance files in a directory."""
+    return sorted(
+        os.path.join(instance_dir, name)
+        for name in os.listdir(instance_dir)
+        if os.path.splitext(name)[1].lower() in INSTANCE_EXTENSIONS
+    )
+
+
+def solve_instance(path, output_dir, threads, time_limit=None, output_format="json", rolling=None, backend=None,
+                   cache_dir=None, telemetry=False, aggregate=False, flow=True, decompose=False, rules=None,
+                   lazy_rules=True):
+    """Solve one instance file and write its result; returns a summary row.
+
+    rolling is an optional (window, step) pair selecting the rolling-horizon solver,
+    backend the name of the solver backend (default: get_backend()) and cache_dir
+    the directory of a SolutionCache for monolithic solves. With telemetry=True the
+    row has a "telemetry" entry with the telemetry record of the instance,
+    aggregate=True solves monolithic instances with AggregatedSchedulingModel,
+    flow=False turns off the min-cost-flow solver and decompose=True solves the
+    sub-rosters of the instance separately. rules are optional WorkRules, added
+    lazily unless lazy_rules=False (not with rolling or aggregate).
+    """
+    instance_name = os.path.splitext(os.path.basename(path))[0]
+    summary = {field: None for field in SUMMARY_FIELDS}
+    summary["instance"] = instance_name
+    record = Telemetry("batch_solve", instance=instance_name)
+    try:
+        with record.phase("load"):
+            instance = load_instance(path)
+        solver = get_backend(backend)
+        if flow:
+            solver = FlowBackend(solver)
+        summary["backend"] = record.context["backend"] = solver.name
+        record.context["size"] = "x".join(str(n) for n in instance["costs"].shape)
+        model_class = AggregatedSchedulingModel if aggregate else StaffSchedulingModel
+        if rules:
+            record.context["rules"] = rules.to_dict()
+            model_class = partial(RuleSchedulingModel, rules=rules, lazy=lazy_rules)
+        with record.phase("precheck"):
+            problems = precheck(instance["availability"], instance["requirements"], instance["max_shifts"], rules)
+        if problems:
+            result, assignment = solve_result(solver.name, "infeasible"), None
+            summary["diagnosis"] = " | ".join(problems)
+        else:
+            partition = load_partition(path) if decompose else None
+            with record.phase("solve"):
+                result, assignment, summary["cache"] = solve_loaded(
+                    instance, solver, threads, time_limit, rolling, cache_dir, model_class, decompose, partition,
+                    rules,
+                )
+            if result["status"] == "infeasible":
+                with record.phase("diagnose"):
+                    reasons, note = diagnose_infeasible(model_class(**instance), solver)
+                summary["diagnosis"] = " | ".join(reasons) or note
+            elif result.get("fallback"):
+                summary["diagnosis"] = "a rolling-horizon window was infeasible; solved the whole horizon instead"
+        record.context["diagnosis"] = summary["diagnosis"]
+        record.record_result(result)
+        # The solve phase includes building the model; keep the split reported by the solver
+        record.stats.update(build_time=result["build_time"], solve_time=result["solve_time"])
+        summary["backend"] = record.context["backend"] = result.get("backend", solver.name)
+        summary.update(
+            status=result["status"], objective=result["objective"],
+            build_time=result["build_time"], solve_time=result["solve_time"],
+        )
+
+        if assignment is not None:
+            summary["assignments"] = int(assignment.sum())
+        with record.phase("write"):
+            export_assignment(
+                os.path.join(output_dir, f"{instance_name}.{output_format}"),
+                assignment, instance_name, summary["status"], summary["objective"],
+            )
+    except Exception as e:
+        summary["status"] = record.status = "error"
+        summary["error"] = record.context["error"] = str(e)
+    if telemetry:
+        summary["telemetry"] = record.to_dict()
+    return summary
+
+
+def solve_loaded(instance, solver, threads, time_limit, rolling, cache_dir, model_class=StaffSchedulingModel,
+                 decompose=False, partition=None, rules=None):
+    """Solve a loaded instance; returns (result, assignment, cache outcome or None)."""
+    if decompose:
+        result = solve_decomposed(
+            **instance, partition=partition, workers=1, time_limit=time_limit, threads=threads, backend=solver,
+            model_class=model_class,
+        )
+        return result, result["assignment"], None
+    if rolling is not None:
+        result = solve_rolling_horizon(
+            **instance, window=rolling[0], step=rolling[1], time_limit=time_limit, threads=threads, backend=solver,
+        )
+        return result, result["assignment"], None
+    if cache_dir is not None:
+        return solve_cached(instance, solver, time_limit, threads, cache_dir, model_class, rules)
+    scheduler = model_class(**instance)
+    result = scheduler.solve_with(solver, time_limit, threads)
+    return result, None if result["x"] is None else scheduler.assignment_from(result["x"]), None
+
+
+def solve_cached(instance, solver, time_limit, threads, cache_dir, model_class=StaffSchedulingModel, rules=None):
+    """Solve through a SolutionCache; returns (result, assignment, "hit", "near" or "miss")."""
+    cache = SolutionCache(cache_dir)
+    params = {"backend": solver.name, "time_limit": time_limit}
+    if rules:
+        params["rules"] = rules.to_dict()
+    key = instance_key(**instance, params=params)
+    entry = cache.get(key)
+    if entry is not None:
+        result = {"status": entry["status"], "objective": entry["objective"], "build_time": 0.0, "solve_time": 0.0}
+        return result, entry["assignment"], "hit"
+
+    rows = row_digests(instance["costs"], instance["availability"], instance["max_shifts"])
+    scheduler = model_class(**instance)
+    near = cache.nearest(rows, instance["requirements"], params)
+    start = None if near is None else near[0]["assignment"]
+    result = scheduler.solve_with(solver, time_limit, threads, start=start)
+    assignment = None if result["x"] is None else scheduler.assignment_from(result["x"])
+    if result["status"] == "optimal":
+        cache.put(key, assignment, result["objective"], result["status"], rows, instance["requirements"], params)
+    return result, assignment, "miss" if near is None else "near"
+
+
+def write_summary(output_dir, rows):
+    with open(os.path.join(output_dir, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("instance_dir", help="Directory containing .npz or .json instance files.")
+    parser.add_argument("output_dir", help="Directory where results and the summary are written.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument(
+        "--threads-per-worker", type=int, default=None,
+        help="Solver threads per worker (default: cores divided by workers).",
+    )
+    parser.add_argument("--time-limit", type=float, default=None, help="Time limit per instance in seconds.")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Format of the result files.")
+    parser.add_argument(
+        "--rolling", nargs=2, type=int, metavar=("WINDOW", "STEP"), default=None,
+        help="Solve with a rolling horizon of WINDOW days, committing STEP days at a time.",
+    )
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS), default=default_backend_name(),
+        help="Solver backend (default: the SOLVER_BACKEND environment variable, else Gurobi if installed).",
+    )
+    parser.add_argument(
+        "--cache-dir", default=None,
+        help="Reuse and store optimal solutions in this solution cache directory (not with --rolling).",
+    )
+    parser.add_argument("--telemetry", default=None, help="Append one JSON telemetry record per instance to this file.")
+    parser.add_argument(
+        "--aggregate", action="store_true",
+        help="Solve employees with identical costs, availability and max shifts as classes (not with --rolling).",
+    )
+    parser.add_argument(
+        "--no-flow", dest="flow", action="store_false",
+        help="Solve every model with the solver backend, not as a min-cost flow.",
+    )
+    parser.add_argument(
+        "--decompose", action="store_true",
+        help="Solve the independent sub-rosters of every instance separately (not with --rolling or --cache-dir).",
+    )
+    parser.add_argument(
+        "--one-shift-per-day", action="store_true", help="Work rule: at most one shift per employee and day.",
+    )
+    parser.add_argument(
+        "--max-consecutive-days", type=int, default=None, metavar="N",
+        help="Work rule: no employee works more than N days in a row.",
+    )
+    parser.add_argument(
+        "--rest", nargs=2, type=int, action="append", default=[], metavar=("A", "B"),
+        help="Work rule: shift A on a day is not followed by shift B on the next day (shifts from 1; repeatable).",
+    )
+    parser.add_argument(
+        "--enumerate-rules", action="store_true",
+        help="Add every work-rule constraint up front instead of only the violated ones.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        rules = WorkRules(
+            args.one_shift_per_day, [(a - 1, b - 1) for a, b in args.rest], args.max_consecutive_days
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if rules and (args.rolling is not None or args.aggregate):
+        parser.error("Work rules cannot be combined with --rolling or --aggregate.")
+    if args.aggregate and args.rolling is not None:
+        parser.error("--aggregate cannot be combined with --rolling.")
+    if args.cache_dir is not None and args.rolling is not None:
+        parser.error("--cache-dir cannot be combined with --rolling.")
+    if args.decompose and (args.rolling is not None or args.cache_dir is not None):
+        parser.error("--decompose cannot be combined with --rolling or --cache-dir.")
+
+    paths = find_instances(args.instance_dir)
+    if not paths:
+        print(f"No instance files found in {args.instance_dir}.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    num_workers = max(1, min(args.workers or os.cpu_count() or 1, len(paths)))
+    threads = thread_budget(num_workers, args.threads_per_worker)
+    print(f"Solving {len(paths)} instances with {num_workers} workers x {threads} {args.backend} threads.")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(
+                solve_instance,
+                path, args.output_dir, threads, args.time_limit, args.format, args.rolling, args.backend,
+                args.cache_dir, args.telemetry is not None, args.aggregate, args.flow, args.decompose, rules or None,
+                not args.enumerate_rules,
+            )
+            for path in paths
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            record = row.pop("telemetry", None)
+            if record is not None:
+                with open(args.telemetry, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            rows.append(row)
+            objective = "-" if row["objective"] is None else f"{row['objective']:.2f}"
+            print(f"{row['instance']}: {row['status']} (objective {objective})")
+
+    rows.sort(key=lambda row: row["instance"])
+    write_summary(args.output_dir, rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
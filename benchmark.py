@@ -0,0 +1,1065 @@
+"""Benchmarks for the staff-scheduling and advertising models.
+
+Usage:
+    python benchmark.py build [--sizes 100x30x3 1000x90x3 ...]
+    python benchmark.py sparse [--size 200x28x3] [--densities 0.3 0.6 1.0]
+    python benchmark.py whatif [--size 200x28x3] [--edits 10]
+    python benchmark.py scaling [--sizes ...] [--densities ...] [--output results.jsonl]
+    python benchmark.py compare baseline.jsonl candidate.jsonl
+    python benchmark.py rolling [--sizes 100x56x3 ...] [--window 14] [--step 7]
+    python benchmark.py advertising [--channels 1000 10000 100000] [--skip-gurobi]
+    python benchmark.py backends [--backends gurobi highs] [--sizes 20x7x3 ...] [--channels 100 1000]
+    python benchmark.py cache [--sizes 200x28x3 ...] [--edits 5] [--backend highs]
+    python benchmark.py symmetry [--sizes 200x28x3 ...] [--classes 5 20]
+    python benchmark.py robust [--channels 100 1000] [--scenarios 1000 10000] [--probability 0.9]
+    python benchmark.py service [--workers 2] [--concurrency 1 4 16] [--requests 100] [--endpoint scheduling]
+    python benchmark.py flow [--sizes 200x28x3 ...] [--backends gurobi highs] [--repeats 3]
+    python benchmark.py instances [--sizes 1000x90x3 5000x365x3] [--formats ssi npz]
+    python benchmark.py live [--channels 100 1000] [--updates 50]
+    python benchmark.py decompose [--sites 4 16] [--site-size 50x28x3] [--workers 1 4] [--backend highs]
+    python benchmark.py rules [--sizes 20x14x3 ...] [--backends gurobi highs] [--max-consecutive-days 5]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from advertising_model import AdvertisingModel, results_agree
+from aggregation import AggregatedSchedulingModel
+from robust_allocation import DEFAULT_CV, RobustAllocation
+from instance_io import INSTANCE_KEYS, binary_instance_bytes, load_instance, save_instance
+from decomposition import solve_decomposed
+from min_cost_flow import FlowBackend
+from scheduling_model import STATUS_NAMES, StaffSchedulingModel, SchedulingSession
+from rolling_horizon import solve_rolling_horizon
+from solve_service import SolveService, request_json
+from solution_cache import SolutionCache, instance_key as cache_key, row_digests
+from solver_backends import BACKENDS, available_backends, get_backend
+from synthetic import COST_DISTRIBUTIONS, generate_catalog, generate_instance, generate_site_instance
+from work_rules import RuleSchedulingModel, WorkRules
+
+DEFAULT_BUILD_SIZES = ["50x20x3", "200x30x3", "500x60x3", "1000x90x3", "3700x90x3"]
+DEFAULT_SCALING_SIZES = ["50x7x3", "100x14x3", "200x28x3", "500x28x3", "1000x56x3"]
+DEFAULT_INSTANCE_SIZES = ["200x28x3", "1000x90x3", "5000x365x3"]
+DEFAULT_RULE_SIZES = ["20x14x3", "30x21x3", "100x28x3"]
+
+# Parameters of a scaling record that are passed on to generate_instance
+GENERATOR_KEYS = ("num_employees", "num_days", "num_shifts", "density", "cost_distribution", "tightness", "seed")
+
+
+def parse_size(text):
+    """Parse an 'ExTxS' size string into a tuple of ints."""
+    try:
+        num_employees, num_days, num_shifts = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size '{text}', expected ExTxS (e.g. 100x30x3).")
+    return num_employees, num_days, num_shifts
+
+
+def build_loop_model(costs, availability, requirements, max_shifts):
+    """Loop-based construction, as previously done in StaffSchedulingApp.run_optimization."""
+    from gurobipy import GRB, Model, quicksum
+
+    num_employees, num_days, num_shifts = costs.shape
+    costs = costs.reshape(num_employees * num_days, num_shifts).tolist()
+    availability = availability.reshape(num_employees * num_days, num_shifts).astype(float).tolist()
+    requirements = requirements.tolist()
+
+    model = Model("StaffScheduling")
+    x = model.addVars(num_employees, num_days, num_shifts, vtype=GRB.BINARY, name="x")
+    model.setObjective(
+        quicksum(
+            costs[e * num_days + d][s] * x[e, d, s]
+            for e in range(num_employees)
+            for d in range(num_days)
+            for s in range(num_shifts)
+        ),
+        GRB.MINIMIZE,
+    )
+    for e in range(num_employees):
+        for d in range(num_days):
+            for s in range(num_shifts):
+                if availability[e * num_days + d][s] == 0:
+                    model.addConstr(x[e, d, s] == 0, f"Availability_{e}_{d}_{s}")
+    for d in range(num_days):
+        for s in range(num_shifts):
+            model.addConstr(
+                quicksum(x[e, d, s] for e in range(num_employees)) == requirements[d][s],
+                f"Requirements_{d}_{s}",
+            )
+    for e in range(num_employees):
+        model.addConstr(
+            quicksum(x[e, d, s] for d in range(num_days) for s in range(num_shifts)) <= max_shifts,
+            f"MaxShifts_{e}",
+        )
+    model.update()
+    return model
+
+
+def build_matrix_model(costs, availability, requirements, max_shifts):
+    """Matrix-API construction through StaffSchedulingModel."""
+    return StaffSchedulingModel(costs, availability, requirements, max_shifts).build()
+
+
+def time_build(builder, instance):
+    """Return (seconds, NumVars, NumConstrs) for building one model."""
+    start = time.perf_counter()
+    model = builder(**instance)
+    elapsed = time.perf_counter() - start
+    stats = (elapsed, model.NumVars, model.NumConstrs)
+    model.dispose()
+    return stats
+
+
+def run_build_benchmark(args):
+    print(f"{'size':>14} {'vars':>9} {'constrs':>9} {'loop (s)':>10} {'matrix (s)':>11} {'speedup':>8}")
+    for num_employees, num_days, num_shifts in args.sizes:
+        instance = generate_instance(num_employees, num_days, num_shifts, seed=args.seed)
+        matrix_time, num_vars, num_constrs = time_build(build_matrix_model, instance)
+        if args.skip_loop:
+            loop_text, speedup_text = "-", "-"
+        else:
+            loop_time, _, _ = time_build(build_loop_model, instance)
+            loop_text, speedup_text = f"{loop_time:.3f}", f"{loop_time / matrix_time:.1f}x"
+        size = f"{num_employees}x{num_days}x{num_shifts}"
+        print(f"{size:>14} {num_vars:>9} {num_constrs:>9} {loop_text:>10} {matrix_time:>11.3f} {speedup_text:>8}")
+
+
+def time_presolve(model):
+    """Return (seconds, presolved NumVars, presolved NumConstrs) for presolving a model."""
+    model.Params.OutputFlag = 0
+    start = time.perf_counter()
+    presolved = model.presolve()
+    return time.perf_counter() - start, presolved.NumVars, presolved.NumConstrs
+
+
+def run_sparse_benchmark(args):
+    num_employees, num_days, num_shifts = args.size
+    print(f"{'density':>8} {'dense vars':>11} {'dense rows':>11} {'vars':>9} {'rows':>9} "
+          f"{'dense presolve (s)':>19} {'sparse presolve (s)':>20}")
+    for density in args.densities:
+        instance = generate_instance(num_employees, num_days, num_shifts, density=density, seed=args.seed)
+        scheduler = StaffSchedulingModel(**instance)
+        report = scheduler.size_report()
+        dense_time, _, _ = time_presolve(build_loop_model(**instance))
+        sparse_time, _, _ = time_presolve(scheduler.build())
+        print(f"{density:>8.2f} {report['dense_vars']:>11} {report['dense_constrs']:>11} {report['vars']:>9} "
+              f"{report['constrs']:>9} {dense_time:>19.3f} {sparse_time:>20.3f}")
+
+
+def run_whatif_benchmark(args):
+    from gurobipy import GRB
+
+    num_employees, num_days, num_shifts = args.size
+    rng = np.random.default_rng(args.seed)
+    instance = generate_instance(num_employees, num_days, num_shifts, seed=args.seed)
+    costs, availability, requirements, max_shifts = (instance[key] for key in INSTANCE_KEYS)
+    session = SchedulingSession(StaffSchedulingModel(costs, availability, requirements, max_shifts))
+    session.prepare().Params.OutputFlag = 0
+    session.solve()
+
+    print(f"{'edit':>5} {'cold (s)':>9} {'session (s)':>12} {'objective':>12}")
+    for edit in range(args.edits):
+        # Change one cost cell and one requirement, as a planner would between two solves
+        costs = costs.copy()
+        requirements = requirements.copy()
+        costs[tuple(rng.integers(0, n) for n in costs.shape)] = rng.uniform(50, 150)
+        day, shift = rng.integers(0, num_days), rng.integers(0, num_shifts)
+        requirements[day, shift] = max(0, requirements[day, shift] + rng.choice([-1, 1]))
+
+        start = time.perf_counter()
+        cold = StaffSchedulingModel(costs, availability, requirements, max_shifts)
+        cold.build().Params.OutputFlag = 0
+        cold.solve()
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        session.update(costs, availability, requirements, max_shifts)
+        session.prepare().Params.OutputFlag = 0
+        status = session.solve()
+        session_time = time.perf_counter() - start
+
+        objective = f"{session.model.ObjVal:.2f}" if status == GRB.OPTIMAL else f"status {status}"
+        print(f"{edit + 1:>5} {cold_time:>9.3f} {session_time:>12.3f} {objective:>12}")
+        cold.model.dispose()
+
+
+def measure_instance(params):
+    """Generate, parse, build, presolve and solve one instance; runs in a fresh process.
+
+    Returns a result record. Peak RSS is that of the worker process, which only
+    handles this instance.
+    """
+    record = dict(params)
+    generator_args = {key: params[key] for key in GENERATOR_KEYS}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "instance.npz")
+            save_instance(path, **generate_instance(**generator_args))
+            start = time.perf_counter()
+            instance = load_instance(path)
+            record["parse_time"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scheduler = StaffSchedulingModel(**instance)
+        model = scheduler.build()
+        record["build_time"] = time.perf_counter() - start
+        record.update(rows=model.NumConstrs, cols=model.NumVars, nonzeros=model.NumNZs)
+
+        model.Params.OutputFlag = 0
+        model.Params.Threads = params["threads"]
+        if params["time_limit"] is not None:
+            model.Params.TimeLimit = params["time_limit"]
+        presolved = model.presolve()
+        record.update(
+            presolved_rows=presolved.NumConstrs, presolved_cols=presolved.NumVars, presolved_nonzeros=presolved.NumNZs
+        )
+        presolved.dispose()
+
+        start = time.perf_counter()
+        status = scheduler.solve()
+        record["solve_time"] = time.perf_counter() - start
+        record["status"] = STATUS_NAMES.get(status, str(status))
+        record["objective"] = model.ObjVal if model.SolCount > 0 else None
+        model.dispose()
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return record
+
+
+
+def run_scaling_benchmark(args):
+    grid = [
+        {
+            "label": args.label,
+            "num_employees": num_employees,
+            "num_days": num_days,
+            "num_shifts": num_shifts,
+            "density": density,
+            "cost_distribution": args.cost_distribution,
+            "tightness": args.tightness,
+            "seed": seed,
+            "threads": args.threads,
+            "time_limit": args.time_limit,
+        }
+        for (num_employees, num_days, num_shifts), density, seed in itertools.product(
+            args.sizes, args.densities, range(args.seed, args.seed + args.repeats)
+        )
+    ]
+
+    output = open(args.output, "a") if args.output else None
+    print(f"{'size':>14} {'density':>8} {'seed':>5} {'parse':>7} {'build':>7} {'presolved':>16} "
+          f"{'solve':>8} {'rss MB':>7} {'status':>12} {'objective':>12}")
+    # One process per instance, so that peak RSS is measured per instance
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for record in pool.imap(measure_instance, grid):
+            if output:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+            size = f"{record['num_employees']}x{record['num_days']}x{record['num_shifts']}"
+            presolved = (f"{record['presolved_rows']}x{record['presolved_cols']}"
+                         if "presolved_rows" in record else "-")
+            objective = "-" if record.get("objective") is None else f"{record['objective']:.2f}"
+            print(f"{size:>14} {record['density']:>8.2f} {record['seed']:>5} "
+                  f"{format_seconds(record.get('parse_time'))} {format_seconds(record.get('build_time'))} "
+                  f"{presolved:>16} {format_seconds(record.get('solve_time'), 8)} {record['peak_rss_mb']:>7.0f} "
+                  f"{record['status']:>12} {objective:>12}")
+            if record.get("error"):
+                print(f"{'':>14} error: {record['error']}")
+    if output:
+        output.close()
+
+
+def format_seconds(value, width=7):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.3f}"
+
+
+def instance_key(record):
+    return tuple(record[key] for key in GENERATOR_KEYS)
+
+
+def run_compare(args):
+    """Compare two scaling result files on the instances they have in common."""
+    def read(path):
+        with open(path) as f:
+            return {instance_key(record): record for record in map(json.loads, filter(str.strip, f))}
+
+    baseline, candidate = read(args.baseline), read(args.candidate)
+    common = [key for key in baseline if key in candidate]
+    if not common:
+        print("The two result files have no instance in common.")
+        return
+
+    print(f"{'size':>14} {'density':>8} {'seed':>5} {'build x':>8} {'solve x':>8} {'rss x':>7} {'objective diff':>15}")
+    for key in common:
+        old, new = baseline[key], candidate[key]
+        num_employees, num_days, num_shifts, density, _, _, seed = key
+        size = f"{num_employees}x{num_days}x{num_shifts}"
+        if old.get("objective") is not None and new.get("objective") is not None:
+            objective_diff = f"{new['objective'] - old['objective']:.4f}"
+        else:
+            objective_diff = f"{old['status']}/{new['status']}"
+        print(f"{size:>14} {density:>8.2f} {seed:>5} {ratio(old, new, 'build_time'):>8} "
+              f"{ratio(old, new, 'solve_time'):>8} {ratio(old, new, 'peak_rss_mb'):>7} {objective_diff:>15}")
+
+
+def ratio(old, new, key):
+    """Speedup-style ratio old/new of a metric, or '-' when missing."""
+    if not old.get(key) or not new.get(key):
+        return "-"
+    return f"{old[key] / new[key]:.2f}"
+
+
+def run_rolling_benchmark(args):
+    """Compare rolling-horizon and monolithic solves; the gap is relative to the monolithic objective."""
+    backend = get_backend(args.backend)
+    print(f"{'size':>14} {'monolithic (s)':>15} {'rolling (s)':>12} {'monolithic obj':>15} "
+          f"{'rolling obj':>12} {'gap':>8} {'fallback':>10}")
+    for num_employees, num_days, num_shifts in args.sizes:
+        instance = generate_instance(
+            num_employees, num_days, num_shifts, tightness=args.tightness, seed=args.seed
+        )
+
+        start = time.perf_counter()
+        monolithic = StaffSchedulingModel(**instance).solve_with(backend, args.time_limit, args.threads)["objective"]
+        monolithic_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = solve_rolling_horizon(
+            **instance, window=args.window, step=args.step, time_limit=args.time_limit, threads=args.threads,
+            backend=backend,
+        )
+        rolling_time = time.perf_counter() - start
+        rolling = result["objective"]
+
+        size = f"{num_employees}x{num_days}x{num_shifts}"
+        monolithic_text = "-" if monolithic is None else f"{monolithic:.2f}"
+        rolling_text = result["status"] if rolling is None else f"{rolling:.2f}"
+        gap = "-" if monolithic is None or rolling is None else f"{(rolling - monolithic) / abs(monolithic) * 100:.2f}%"
+        print(f"{size:>14} {monolithic_time:>15.3f} {rolling_time:>12.3f} {monolithic_text:>15} "
+              f"{rolling_text:>12} {gap:>8} {result['fallback'] or '-':>10}")
+
+
+def run_advertising_benchmark(args):
+    """Compare the fast allocation solver with Gurobi on synthetic catalogs.
+
+    The budget is a fraction of the cost of running every channel at its maximum
+    and the desired reach a fraction of the reach that would buy.
+    """
+    print(f"{'channels':>9} {'fast (ms)':>10} {'gurobi (ms)':>12} {'fast obj':>15} {'gurobi obj':>15} {'agree':>6}")
+    for num_channels in args.channels:
+        catalog = generate_catalog(num_channels, seed=args.seed)
+        allocation = AdvertisingModel(**catalog)
+        budget = args.budget_fraction * float(allocation.costs @ allocation.max_ads)
+        desired_reach = args.reach_fraction * float(allocation.reaches @ allocation.max_ads)
+
+        start = time.perf_counter()
+        fast = allocation.solve_fast(budget, desired_reach)
+        fast_time = (time.perf_counter() - start) * 1000
+        fast_text = "-" if fast is None else fast["status"] if fast["objective"] is None else f"{fast['objective']:.2f}"
+
+        gurobi_time, gurobi_text, agree = "-", "-", "-"
+        if not args.skip_gurobi:
+            try:
+                start = time.perf_counter()
+                reference = allocation.solve_gurobi(budget, desired_reach)
+                gurobi_time = f"{(time.perf_counter() - start) * 1000:.1f}"
+                gurobi_text = (reference["status"] if reference["objective"] is None
+                               else f"{reference['objective']:.2f}")
+                agree = "-" if fast is None else "yes" if results_agree(fast, reference) else "NO"
+                allocation.model.dispose()
+            except Exception as e:
+                gurobi_text = f"error: {e}"
+        print(f"{num_channels:>9} {fast_time:>10.1f} {gurobi_time:>12} {fast_text:>15} {gurobi_text:>15} {agree:>6}")
+
+
+def run_live_benchmark(args):
+    """Time budget updates as in live mode: rebuilding the Gurobi model, updating it in place, and the fast solver.
+
+    The budget moves in equal steps between budget_fraction and twice that
+    fraction of the cost of running every channel at its maximum.
+    """
+    print(f"{'channels':>9} {'updates':>8} {'rebuild (ms)':>13} {'in place (ms)':>14} {'fast (ms)':>10} {'agree':>6}")
+    for num_channels in args.channels:
+        catalog = generate_catalog(num_channels, seed=args.seed)
+        allocation = AdvertisingModel(**catalog)
+        full_cost = float(allocation.costs @ allocation.max_ads)
+        desired_reach = args.reach_fraction * float(allocation.reaches @ allocation.max_ads)
+        budgets = np.linspace(args.budget_fraction, 2 * args.budget_fraction, args.updates) * full_cost
+
+        rebuilt, start = [], time.perf_counter()
+        for budget in budgets:
+            rebuilt.append(allocation.solve_gurobi(budget, desired_reach))
+            allocation.model.dispose()
+            allocation.model = None
+        rebuild_time = (time.perf_counter() - start) * 1000 / args.updates
+
+        live = AdvertisingModel(**catalog)
+        updated, start = [], time.perf_counter()
+        for budget in budgets:
+            updated.append(live.reoptimize(budget, desired_reach))
+        update_time = (time.perf_counter() - start) * 1000 / args.updates
+        live.model.dispose()
+
+        fast, start = [], time.perf_counter()
+        for budget in budgets:
+            fast.append(allocation.solve_fast(budget, desired_reach))
+        fast_time = (time.perf_counter() - start) * 1000 / args.updates
+
+        agree = all(
+            results_agree(first, second) and (third is None or results_agree(third, second))
+            for first, second, third in zip(updated, rebuilt, fast)
+        )
+        print(f"{num_channels:>9} {args.updates:>8} {rebuild_time:>13.2f} {update_time:>14.2f} {fast_time:>10.2f} "
+              f"{'yes' if agree else 'NO':>6}")
+
+
+def objectives_agree(first, second, tolerance=1e-6):
+    """True if two objectives are equal up to a relative tolerance (and both exist)."""
+    if first is None or second is None:
+        return False
+    return abs(first - second) <= tolerance * max(1.0, abs(first))
+
+
+def print_backend_row(label, result, reference):
+    objective = "-" if result["objective"] is None else f"{result['objective']:.2f}"
+    agree = "-" if reference is None or reference is result else (
+        "yes" if objectives_agree(reference["objective"], result["objective"]) else "NO"
+    )
+    print(f"{label:>14} {result['backend']:>8} {result['build_time']:>10.3f} {result['solve_time']:>10.3f} "
+          f"{result['status']:>12} {objective:>15} {agree:>6}")
+
+
+def run_backends_benchmark(args):
+    """Solve the same staff-scheduling instances and advertising catalogs with each backend.
+
+    Objectives are compared with those of the first backend listed.
+    """
+    backends = [get_backend(name) for name in args.backends]
+    print(f"{'instance':>14} {'backend':>8} {'build (s)':>10} {'solve (s)':>10} {'status':>12} "
+          f"{'objective':>15} {'agree':>6}")
+    for num_employees, num_days, num_shifts in args.sizes:
+        instance = generate_instance(num_employees, num_days, num_shifts, seed=args.seed)
+        label = f"{num_employees}x{num_days}x{num_shifts}"
+        reference = None
+        for backend in backends:
+            try:
+                result = StaffSchedulingModel(**instance).solve_with(backend, args.time_limit, args.threads)
+            except Exception as e:
+                print(f"{label:>14} {backend.name:>8} error: {e}")
+                continue
+            reference = reference or result
+            print_backend_row(label, result, reference)
+
+    for num_channels in args.channels:
+        allocation = AdvertisingModel(**generate_catalog(num_channels, seed=args.seed))
+        budget = 0.3 * float(allocation.costs @ allocation.max_ads)
+        desired_reach = 0.3 * float(allocation.reaches @ allocation.max_ads)
+        problem = allocation.to_problem(budget, desired_reach)
+        label = f"{num_channels} ch."
+        reference = None
+        for backend in backends:
+            try:
+                result = backend.solve(problem, args.time_limit, args.threads)
+            except Exception as e:
+                print(f"{label:>14} {backend.name:>8} error: {e}")
+                continue
+            reference = reference or result
+            print_backend_row(label, result, reference)
+
+
+def run_cache_benchmark(args):
+    """Time cold solves, cache hits and near-miss solves started from the cached solution."""
+    backend = get_backend(args.backend)
+    print(f"{'size':>14} {'cold (s)':>9} {'hit (s)':>9} {'near cold (s)':>14} {'near start (s)':>15} {'objective':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SolutionCache(directory)
+        for num_employees, num_days, num_shifts in args.sizes:
+            rng = np.random.default_rng(args.seed)
+            instance = generate_instance(num_employees, num_days, num_shifts, seed=args.seed)
+            key = cache_key(**instance)
+            rows = row_digests(instance["costs"], instance["availability"], instance["max_shifts"])
+
+            start = time.perf_counter()
+            scheduler = StaffSchedulingModel(**instance)
+            result = scheduler.solve_with(backend, args.time_limit, args.threads)
+            cold_time = time.perf_counter() - start
+            cache.put(
+                key, scheduler.assignment_from(result["x"]), result["objective"], result["status"], rows,
+                instance["requirements"],
+            )
+
+            start = time.perf_counter()
+            cache.get(cache_key(**instance))
+            hit_time = time.perf_counter() - start
+
+            # Change a few cost cells, as after reopening last week's roster and editing it
+            costs = instance["costs"].copy()
+            for _ in range(args.edits):
+                costs[tuple(rng.integers(0, n) for n in costs.shape)] = rng.uniform(50, 150)
+            edited = dict(instance, costs=costs)
+
+            start = time.perf_counter()
+            StaffSchedulingModel(**edited).solve_with(backend, args.time_limit, args.threads)
+            near_cold_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rows = row_digests(costs, edited["availability"], edited["max_shifts"])
+            near = cache.nearest(rows, edited["requirements"])
+            mip_start = None if near is None else near[0]["assignment"]
+            near_result = StaffSchedulingModel(**edited).solve_with(backend, args.time_limit, args.threads, mip_start)
+            near_time = time.perf_counter() - start
+
+            size = f"{num_employees}x{num_days}x{num_shifts}"
+            objective = near_result["status"] if near_result["objective"] is None else f"{near_result['objective']:.2f}"
+            print(f"{size:>14} {cold_time:>9.3f} {hit_time:>9.4f} {near_cold_time:>14.3f} {near_time:>15.3f} "
+                  f"{objective:>12}")
+
+
+def run_symmetry_benchmark(args):
+    """Compare the per-employee model with the model aggregated over classes of identical employees.
+
+    Times include building the problem and, for the aggregated model, disaggregating its solution.
+    """
+    backend = get_backend(args.backend)
+    print(f"{'size':>14} {'classes':>8} {'variables':>19} {'binary (s)':>11} {'aggregated (s)':>15} "
+          f"{'binary obj':>12} {'aggregated obj':>15}")
+    for num_employees, num_days, num_shifts in args.sizes:
+        for num_classes in args.classes:
+            instance = generate_instance(
+                num_employees, num_days, num_shifts, tightness=args.tightness, num_classes=num_classes,
+                seed=args.seed,
+            )
+            timings, objectives = [], []
+            for model_class in (StaffSchedulingModel, AggregatedSchedulingModel):
+                start = time.perf_counter()
+                scheduler = model_class(**instance)
+                result = scheduler.solve_with(backend, args.time_limit, args.threads)
+                if result["x"] is not None:
+                    scheduler.assignment_from(result["x"])
+                timings.append(time.perf_counter() - start)
+                objectives.append(result["status"] if result["objective"] is None else f"{result['objective']:.2f}")
+
+            size = f"{num_employees}x{num_days}x{num_shifts}"
+            variables = f"{np.count_nonzero(instance['availability']):,} -> {scheduler.size_report()['vars']:,}"
+            print(f"{size:>14} {scheduler.num_classes:>8} {variables:>19} {timings[0]:>11.3f} {timings[1]:>15.3f} "
+                  f"{objectives[0]:>12} {objectives[1]:>15}")
+
+
+def run_robust_benchmark(args):
+    """Time the robust advertising allocation and compare its reach probability with the nominal plan's.
+
+    The budget and desired reach are fractions of the catalog totals, as in the
+    advertising benchmark. Probabilities are measured on fresh validation scenarios.
+    """
+    backend = get_backend(args.backend)
+    print(f"{'channels':>9} {'scenarios':>10} {'sample (s)':>11} {'build (s)':>10} {'solve (s)':>10} "
+          f"{'evaluate (s)':>13} {'robust P':>9} {'nominal P':>10} {'robust obj':>12} {'nominal obj':>12}")
+    for num_channels in args.channels:
+        catalog = generate_catalog(num_channels, seed=args.seed)
+        allocation = AdvertisingModel(**catalog)
+        budget = args.budget_fraction * float(allocation.costs @ allocation.max_ads)
+        desired_reach = args.reach_fraction * float(allocation.reaches @ allocation.max_ads)
+        for num_scenarios in args.scenarios:
+            robust = RobustAllocation(
+                allocation, budget, desired_reach, args.probability, num_scenarios, args.cv, args.cv, args.seed
+            )
+            result = robust.solve(backend)
+            timings = result["timings"]
+            columns = [f"{timings.get(name, 0.0):.3f}" for name in ("sample", "build", "solve", "evaluate")]
+            if result["objective"] is None:
+                print(f"{num_channels:>9} {num_scenarios:>10} {columns[0]:>11} {columns[1]:>10} {columns[2]:>10} "
+                      f"{'-':>13} {result['status']:>9}")
+                continue
+            nominal = result.get("nominal_distribution")
+            nominal_p, nominal_obj = ("-", "-") if nominal is None else (
+                f"{nominal['reach_probability']:.3f}", f"{nominal['expected_conversions']:.2f}"
+            )
+            robust_dist = result["distribution"]
+            print(f"{num_channels:>9} {num_scenarios:>10} {columns[0]:>11} {columns[1]:>10} {columns[2]:>10} "
+                  f"{columns[3]:>13} {robust_dist['reach_probability']:>9.3f} {nominal_p:>10} "
+                  f"{robust_dist['expected_conversions']:>12.2f} {nominal_obj:>12}")
+
+
+def run_flow_benchmark(args):
+    """Compare the min-cost-flow solver with the MIP backends and check that the objectives agree.
+
+    Times include building the problem. Backends that fail (e.g. on a size-limited
+    licence) are reported with their error.
+    """
+    flow = FlowBackend()
+    print(f"{'size':>14} {'seed':>5} {'variables':>10} {'backend':>8} {'time (s)':>9} {'speedup':>8} "
+          f"{'objective':>14} {'agree':>6}")
+    seeds = range(args.seed, args.seed + args.repeats)
+    for (num_employees, num_days, num_shifts), seed in itertools.product(args.sizes, seeds):
+        instance = generate_instance(
+            num_employees, num_days, num_shifts, density=args.density, tightness=args.tightness, seed=seed
+        )
+        size = f"{num_employees}x{num_days}x{num_shifts}"
+        variables = int(np.count_nonzero(instance["availability"]))
+        reference = None
+        for backend in [flow] + [get_backend(name) for name in args.backends]:
+            start = time.perf_counter()
+            try:
+                result = StaffSchedulingModel(**instance).solve_with(backend, args.time_limit, args.threads)
+            except Exception as e:
+                print(f"{size:>14} {seed:>5} {variables:>10,} {backend.name:>8} error: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference, flow_time = result, elapsed
+            objective = result["status"] if result["objective"] is None else f"{result['objective']:.2f}"
+            agree = "-" if result is reference else (
+                "yes" if objectives_agree(reference["objective"], result["objective"]) else "NO"
+            )
+            speedup = "-" if result is reference else f"{elapsed / flow_time:.1f}x"
+            print(f"{size:>14} {seed:>5} {variables:>10,} {backend.name:>8} {elapsed:>9.3f} {speedup:>8} "
+                  f"{objective:>14} {agree:>6}")
+
+
+def run_decompose_benchmark(args):
+    """Compare one model over all sites with solving the sites' sub-rosters separately.
+
+    Sub-rosters are the connected components of the availability graph, or the
+    sites with --partition. Decomposed times are wall times and include starting
+    the worker processes when there is more than one.
+    """
+    backend = get_backend(args.backend)
+    if args.flow:
+        backend = FlowBackend(backend)
+    num_employees, num_days, num_shifts = args.site_size
+    print(f"{'sites':>6} {'size':>14} {'workers':>8} {'sub-rosters':>12} {'time (s)':>9} {'speedup':>8} "
+          f"{'objective':>14} {'agree':>6}")
+    for num_sites in args.sites:
+        instance, sites = generate_site_instance(
+            num_sites, num_employees, num_days, num_shifts, density=args.density, tightness=args.tightness,
+            seed=args.seed,
+        )
+        size = "x".join(str(n) for n in instance["costs"].shape)
+        start = time.perf_counter()
+        reference = StaffSchedulingModel(**instance).solve_with(backend, args.time_limit, args.threads)
+        single_time = time.perf_counter() - start
+        objective = reference["status"] if reference["objective"] is None else f"{reference['objective']:.2f}"
+        print(f"{num_sites:>6} {size:>14} {'single':>8} {1:>12} {single_time:>9.3f} {'-':>8} {objective:>14} {'-':>6}")
+        for workers in args.workers:
+            result = solve_decomposed(
+                **instance, partition=sites if args.partition else None, workers=workers,
+                time_limit=args.time_limit, threads=args.threads, backend=backend,
+            )
+            objective = result["status"] if result["objective"] is None else f"{result['objective']:.2f}"
+            agree = "yes" if objectives_agree(reference["objective"], result["objective"]) else "NO"
+            print(f"{num_sites:>6} {size:>14} {result['workers']:>8} {len(result['sub_rosters']):>12} "
+                  f"{result['wall_time']:>9.3f} {single_time / result['wall_time']:>7.1f}x {objective:>14} {agree:>6}")
+
+
+def run_rules_benchmark(args):
+    """Compare enumerated work-rule constraints with adding only the violated ones.
+
+    Rule rows count the rule constraints in the model: all of them when
+    enumerated, the lazy cuts (Gurobi) or the rows added over the re-solve
+    rounds (other backends) otherwise. Objectives are compared with the
+    enumerated solve of the same backend, and every solution is checked
+    against the rules.
+    """
+    rest = [(3, 1)] if args.rest is None else args.rest
+    rules = WorkRules(args.one_shift, [(a - 1, b - 1) for a, b in rest], args.max_consecutive_days)
+    print(f"Rules: {rules}")
+    print(f"{'size':>14} {'variables':>10} {'backend':>8} {'rules':>10} {'rule rows':>10} {'rounds':>7} "
+          f"{'time (s)':>9} {'speedup':>8} {'objective':>14} {'agree':>6} {'broken':>7}")
+    for num_employees, num_days, num_shifts in args.sizes:
+        instance = generate_instance(
+            num_employees, num_days, num_shifts, density=args.density, tightness=args.tightness,
+            max_shifts=args.max_shifts, seed=args.seed,
+        )
+        size = f"{num_employees}x{num_days}x{num_shifts}"
+        variables = int(np.count_nonzero(instance["availability"]))
+        for backend in [get_backend(name) for name in args.backends]:
+            reference = None
+            for lazy in (False, True):
+                scheduler = RuleSchedulingModel(**instance, rules=rules, lazy=lazy)
+                label = "lazy" if lazy else "enumerated"
+                start = time.perf_counter()
+                try:
+                    result = scheduler.solve_with(backend, args.time_limit, args.threads)
+                except Exception as e:
+                    print(f"{size:>14} {variables:>10,} {backend.name:>8} {label:>10} error: {e}")
+                    continue
+                elapsed = time.perf_counter() - start
+                rule_rows = scheduler.cuts if lazy else (
+                    scheduler.to_problem().num_constrs - StaffSchedulingModel.to_problem(scheduler).num_constrs
+                )
+                rounds = result["stats"].get("rule_rounds", "-")
+                objective = result["status"] if result["objective"] is None else f"{result['objective']:.2f}"
+                broken = "-" if result["x"] is None else rules.violations(scheduler.assignment_from(result["x"]))
+                if reference is None:
+                    reference, enumerated_time = result, elapsed
+                    speedup = agree = "-"
+                else:
+                    speedup = f"{enumerated_time / elapsed:.1f}x"
+                    agree = "yes" if (
+                        reference["objective"] is None and result["objective"] is None
+                        or objectives_agree(reference["objective"], result["objective"], args.agree_tolerance)
+                    ) else "NO"
+                print(f"{size:>14} {variables:>10,} {backend.name:>8} {label:>10} {rule_rows:>10,} {rounds:>7} "
+                      f"{elapsed:>9.3f} {speedup:>8} {objective:>14} {agree:>6} {broken:>7}")
+
+
+async def drive_service(host, port, path, payload, num_requests, concurrency):
+    """Send num_requests requests from concurrency clients; returns (wall time, latencies, status codes)."""
+    latencies, codes = [], []
+    remaining = iter(range(num_requests))
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            code, _ = await request_json(host, port, "POST", path, payload)
+            latencies.append(time.perf_counter() - start)
+            codes.append(code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, np.array(latencies), np.array(codes)
+
+
+async def service_benchmark(args, payload):
+    service = None
+    if args.url:
+        host, port = args.url.rsplit(":", 1)
+        port = int(port)
+    else:
+        service = SolveService(args.backend, args.workers, args.queue_size, args.time_limit)
+        await service.start("127.0.0.1", 0)
+        host, port = "127.0.0.1", service.port
+    path = f"/{args.endpoint}"
+    try:
+        # Start every worker (and its environment) before timing
+        await drive_service(host, port, path, payload, args.workers, args.workers)
+        print(f"{'concurrency':>12} {'requests':>9} {'ok':>6} {'rejected':>9} {'req/s':>8} "
+              f"{'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9}")
+        for concurrency in args.concurrency:
+            wall, latencies, codes = await drive_service(host, port, path, payload, args.requests, concurrency)
+            ok = latencies[codes == 200] * 1000
+            p50, p95, worst = np.percentile(ok, [50, 95, 100]) if ok.size else (np.nan,) * 3
+            print(f"{concurrency:>12} {len(codes):>9} {ok.size:>6} {np.count_nonzero(codes == 503):>9} "
+                  f"{ok.size / wall:>8.1f} {p50:>9.1f} {p95:>9.1f} {worst:>9.1f}")
+    finally:
+        if service is not None:
+            await service.close()
+
+
+def measure_instance_load(path):
+    """Load an instance file and sum each of its arrays once.
+
+    Returns (load time, time until every array was read, peak memory allocated
+    in MB). Allocations are traced with tracemalloc, which sees NumPy buffers but
+    not the pages of memory-mapped files, as these are cached file data that the
+    system can drop.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    instance = load_instance(path)
+    load_time = time.perf_counter() - start
+    for value in instance.values():
+        np.asarray(value).sum()
+    read_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return load_time, read_time, peak / 2 ** 20
+
+
+def run_instances_benchmark(args):
+    """Compare instance file formats: file size, save time, load time and the memory allocated by loading."""
+    print(f"{'size':>12} {'format':>7} {'file MB':>8} {'save (s)':>9} {'load (s)':>9} {'read (s)':>9} "
+          f"{'alloc MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            instance = generate_instance(*size, density=args.density, seed=args.seed)
+            label = "x".join(str(n) for n in size)
+            for extension in args.formats:
+                path = os.path.join(tmp, f"instance.{extension}")
+                start = time.perf_counter()
+                if extension == "json":
+                    with open(path, "w") as f:
+                        json.dump({key: np.asarray(value).tolist() for key, value in instance.items()}, f)
+                else:
+                    save_instance(path, **instance)
+                save_time = time.perf_counter() - start
+                load_time, read_time, allocated = measure_instance_load(path)
+                print(f"{label:>12} {extension:>7} {os.path.getsize(path) / 2 ** 20:>8.1f} {save_time:>9.3f} "
+                      f"{load_time:>9.3f} {read_time:>9.3f} {allocated:>9.1f}")
+                os.remove(path)
+
+
+def run_service_benchmark(args):
+    """Measure the throughput and latency of the solve service under a closed-loop load.
+
+    Each of the concurrency clients sends its next request as soon as the previous
+    one is answered. The service is started in-process unless --url is given.
+    """
+    if args.endpoint == "scheduling":
+        instance = generate_instance(*args.size, seed=args.seed)
+        if args.binary:
+            payload = binary_instance_bytes(**instance)
+        else:
+            payload = {key: np.asarray(value).tolist() for key, value in instance.items()}
+    else:
+        catalog = generate_catalog(args.channels, seed=args.seed)
+        payload = {key: np.asarray(value).tolist() for key, value in catalog.items() if key != "names"}
+        payload["budget"] = 0.3 * float(catalog["costs"] @ catalog["max_ads"])
+        payload["desired_reach"] = 0.3 * float(catalog["reaches"] @ catalog["max_ads"])
+    asyncio.run(service_benchmark(args, payload))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compare loop-based and matrix-API model construction.")
+    build_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_BUILD_SIZES],
+        help="Instance sizes as ExTxS (default: up to ~1M variables).",
+    )
+    build_parser.add_argument("--seed", type=int, default=0)
+    build_parser.add_argument("--skip-loop", action="store_true", help="Only time the matrix-API builder.")
+    build_parser.set_defaults(func=run_build_benchmark)
+
+    sparse_parser = subparsers.add_parser(
+        "sparse", help="Compare model size and presolve time of the dense and sparse formulations."
+    )
+    sparse_parser.add_argument("--size", type=parse_size, default=parse_size("200x28x3"))
+    sparse_parser.add_argument("--densities", nargs="+", type=float, default=[0.1, 0.3, 0.5, 0.7, 1.0])
+    sparse_parser.add_argument("--seed", type=int, default=0)
+    sparse_parser.set_defaults(func=run_sparse_benchmark)
+
+    whatif_parser = subparsers.add_parser(
+        "whatif", help="Compare cold re-solves with warm-started session re-solves after small edits."
+    )
+    whatif_parser.add_argument("--size", type=parse_size, default=parse_size("200x28x3"))
+    whatif_parser.add_argument("--edits", type=int, default=10)
+    whatif_parser.add_argument("--seed", type=int, default=0)
+    whatif_parser.set_defaults(func=run_whatif_benchmark)
+
+    scaling_parser = subparsers.add_parser(
+        "scaling", help="Measure parse, build, presolve and solve over a grid of synthetic instances."
+    )
+    scaling_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SCALING_SIZES]
+    )
+    scaling_parser.add_argument("--densities", nargs="+", type=float, default=[0.3, 0.7])
+    scaling_parser.add_argument("--cost-distribution", choices=COST_DISTRIBUTIONS, default="uniform")
+    scaling_parser.add_argument("--tightness", type=float, default=0.8)
+    scaling_parser.add_argument("--repeats", type=int, default=1, help="Instances (seeds) per grid point.")
+    scaling_parser.add_argument("--seed", type=int, default=0)
+    scaling_parser.add_argument("--threads", type=int, default=1, help="Gurobi threads per solve.")
+    scaling_parser.add_argument("--time-limit", type=float, default=None)
+    scaling_parser.add_argument("--label", default="", help="Free-form label stored in every record.")
+    scaling_parser.add_argument("--output", help="Append one JSON record per instance to this file.")
+    scaling_parser.set_defaults(func=run_scaling_benchmark)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two scaling result files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.set_defaults(func=run_compare)
+
+    rolling_parser = subparsers.add_parser(
+        "rolling", help="Compare rolling-horizon and monolithic solves (time and optimality gap)."
+    )
+    rolling_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in ("30x28x3", "30x56x3", "30x112x3")]
+    )
+    rolling_parser.add_argument("--window", type=int, default=14)
+    rolling_parser.add_argument("--step", type=int, default=7)
+    rolling_parser.add_argument("--tightness", type=float, default=0.8)
+    rolling_parser.add_argument("--seed", type=int, default=0)
+    rolling_parser.add_argument("--threads", type=int, default=1)
+    rolling_parser.add_argument("--time-limit", type=float, default=None)
+    rolling_parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    rolling_parser.set_defaults(func=run_rolling_benchmark)
+
+    backends_parser = subparsers.add_parser(
+        "backends", help="Compare solver backends on staff-scheduling instances and advertising catalogs."
+    )
+    backends_parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=available_backends())
+    backends_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in ("20x7x3", "30x14x3", "40x14x3")]
+    )
+    backends_parser.add_argument("--channels", nargs="*", type=int, default=[100, 1000])
+    backends_parser.add_argument("--seed", type=int, default=0)
+    backends_parser.add_argument("--threads", type=int, default=1)
+    backends_parser.add_argument("--time-limit", type=float, default=None)
+    backends_parser.set_defaults(func=run_backends_benchmark)
+
+    cache_parser = subparsers.add_parser(
+        "cache", help="Time solution cache hits and near-miss solves seeded from the cache."
+    )
+    cache_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in ("100x28x3", "200x28x3", "400x28x3")]
+    )
+    cache_parser.add_argument("--edits", type=int, default=5, help="Cost cells changed for the near-miss solve.")
+    cache_parser.add_argument("--seed", type=int, default=0)
+    cache_parser.add_argument("--threads", type=int, default=1)
+    cache_parser.add_argument("--time-limit", type=float, default=None)
+    cache_parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    cache_parser.set_defaults(func=run_cache_benchmark)
+
+    symmetry_parser = subparsers.add_parser(
+        "symmetry", help="Compare the per-employee model with the model over classes of identical employees."
+    )
+    symmetry_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in ("100x14x3", "200x28x3", "500x28x3")]
+    )
+    symmetry_parser.add_argument("--classes", nargs="+", type=int, default=[5, 20], help="Employee profiles.")
+    symmetry_parser.add_argument("--tightness", type=float, default=0.9)
+    symmetry_parser.add_argument("--seed", type=int, default=0)
+    symmetry_parser.add_argument("--threads", type=int, default=1)
+    symmetry_parser.add_argument("--time-limit", type=float, default=None)
+    symmetry_parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    symmetry_parser.set_defaults(func=run_symmetry_benchmark)
+
+    advertising_parser = subparsers.add_parser(
+        "advertising", help="Compare the fast advertising allocation solver with Gurobi."
+    )
+    advertising_parser.add_argument("--channels", nargs="+", type=int, default=[1000, 10_000, 100_000])
+    advertising_parser.add_argument("--budget-fraction", type=float, default=0.3)
+    advertising_parser.add_argument("--reach-fraction", type=float, default=0.3)
+    advertising_parser.add_argument("--seed", type=int, default=0)
+    advertising_parser.add_argument("--skip-gurobi", action="store_true", help="Only time the fast solver.")
+    advertising_parser.set_defaults(func=run_advertising_benchmark)
+
+    live_parser = subparsers.add_parser(
+        "live", help="Time budget updates on one advertising model against rebuilding it for each budget."
+    )
+    live_parser.add_argument("--channels", nargs="+", type=int, default=[100, 1000])
+    live_parser.add_argument("--updates", type=int, default=50, help="Budgets in the sweep.")
+    live_parser.add_argument("--budget-fraction", type=float, default=0.2)
+    live_parser.add_argument("--reach-fraction", type=float, default=0.2)
+    live_parser.add_argument("--seed", type=int, default=0)
+    live_parser.set_defaults(func=run_live_benchmark)
+
+    robust_parser = subparsers.add_parser(
+        "robust", help="Time the robust advertising allocation and compare it with the nominal plan."
+    )
+    robust_parser.add_argument("--channels", nargs="+", type=int, default=[100, 1000])
+    robust_parser.add_argument("--scenarios", nargs="+", type=int, default=[1000, 10_000])
+    robust_parser.add_argument("--probability", type=float, default=0.9)
+    robust_parser.add_argument("--cv", type=float, default=DEFAULT_CV, help="Uncertainty of reaches and rates.")
+    robust_parser.add_argument("--budget-fraction", type=float, default=0.3)
+    robust_parser.add_argument("--reach-fraction", type=float, default=0.4)
+    robust_parser.add_argument("--seed", type=int, default=0)
+    robust_parser.add_argument("--backend", choices=sorted(BACKENDS), default="highs")
+    robust_parser.set_defaults(func=run_robust_benchmark)
+
+    service_parser = subparsers.add_parser(
+        "service", help="Measure solve service throughput and latency with a local load generator."
+    )
+    service_parser.add_argument("--endpoint", choices=["scheduling", "advertising"], default="scheduling")
+    service_parser.add_argument("--size", type=parse_size, default=parse_size("20x7x3"))
+    service_parser.add_argument("--channels", type=int, default=1000)
+    service_parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level.")
+    service_parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    service_parser.add_argument("--workers", type=int, default=2)
+    service_parser.add_argument("--queue-size", type=int, default=32)
+    service_parser.add_argument("--time-limit", type=float, default=60.0)
+    service_parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    service_parser.add_argument("--url", help="HOST:PORT of a running service (default: start one in-process).")
+    service_parser.add_argument("--seed", type=int, default=0)
+    service_parser.add_argument(
+        "--binary", action="store_true", help="Send scheduling instances in the binary format instead of JSON."
+    )
+    service_parser.set_defaults(func=run_service_benchmark)
+
+    flow_parser = subparsers.add_parser("flow", help="Compare the min-cost-flow solver with the MIP backends.")
+    flow_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SCALING_SIZES],
+        help="Instance sizes as ExTxS.",
+    )
+    flow_parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=available_backends())
+    flow_parser.add_argument("--density", type=float, default=0.7)
+    flow_parser.add_argument("--tightness", type=float, default=0.8)
+    flow_parser.add_argument("--repeats", type=int, default=1, help="Instances (seeds) per size.")
+    flow_parser.add_argument("--seed", type=int, default=0)
+    flow_parser.add_argument("--threads", type=int, default=1)
+    flow_parser.add_argument("--time-limit", type=float, default=None)
+    flow_parser.set_defaults(func=run_flow_benchmark)
+
+    instances_parser = subparsers.add_parser(
+        "instances", help="Compare the size, save and load time and load memory of instance file formats."
+    )
+    instances_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_INSTANCE_SIZES],
+        help="Instance sizes as ExTxS.",
+    )
+    instances_parser.add_argument("--formats", nargs="+", choices=["ssi", "npz", "json"], default=["ssi", "npz"])
+    instances_parser.add_argument("--density", type=float, default=0.7)
+    instances_parser.add_argument("--seed", type=int, default=0)
+    instances_parser.set_defaults(func=run_instances_benchmark)
+
+    decompose_parser = subparsers.add_parser(
+        "decompose", help="Compare single-model solves with solving independent sub-rosters in parallel."
+    )
+    decompose_parser.add_argument("--sites", nargs="+", type=int, default=[4, 16], help="Independent sites.")
+    decompose_parser.add_argument(
+        "--site-size", type=parse_size, default=parse_size("50x28x3"), help="Size of every site as ExTxS."
+    )
+    decompose_parser.add_argument(
+        "--workers", nargs="+", type=int, default=sorted({1, os.cpu_count() or 1}), help="Worker processes."
+    )
+    decompose_parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    decompose_parser.add_argument(
+        "--no-flow", dest="flow", action="store_false", help="Solve with the backend, not as min-cost flows."
+    )
+    decompose_parser.add_argument(
+        "--partition", action="store_true", help="Split by the site labels instead of the availability graph."
+    )
+    decompose_parser.add_argument("--density", type=float, default=0.7)
+    decompose_parser.add_argument("--tightness", type=float, default=0.8)
+    decompose_parser.add_argument("--seed", type=int, default=0)
+    decompose_parser.add_argument("--threads", type=int, default=None)
+    decompose_parser.add_argument("--time-limit", type=float, default=None)
+    decompose_parser.set_defaults(func=run_decompose_benchmark)
+
+    rules_parser = subparsers.add_parser(
+        "rules", help="Compare enumerated work-rule constraints with lazily added ones."
+    )
+    rules_parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_RULE_SIZES],
+        help="Instance sizes as ExTxS.",
+    )
+    rules_parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=available_backends())
+    rules_parser.add_argument(
+        "--any-shifts-per-day", dest="one_shift", action="store_false",
+        help="Drop the one-shift-per-day rule.",
+    )
+    rules_parser.add_argument("--max-consecutive-days", type=int, default=5)
+    rules_parser.add_argument(
+        "--rest", nargs=2, type=int, action="append", metavar=("A", "B"), default=None,
+        help="Rest pair: shift A is not followed by shift B the next day (shifts from 1; default: 3 1).",
+    )
+    rules_parser.add_argument("--density", type=float, default=0.7)
+    rules_parser.add_argument("--tightness", type=float, default=0.5)
+    rules_parser.add_argument("--max-shifts", type=int, default=None)
+    rules_parser.add_argument(
+        "--agree-tolerance", type=float, default=1e-4, help="Relative objective tolerance (the MIP gap)."
+    )
+    rules_parser.add_argument("--seed", type=int, default=0)
+    rules_parser.add_argument("--threads", type=int, default=1)
+    rules_parser.add_argument("--time-limit", type=float, default=None)
+    rules_parser.set_defaults(func=run_rules_benchmark)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Decomposition of staff-scheduling instances into independent sub-rosters.
+
+Two employees interact only through a (day, shift) requirement that both of
+them can cover. In the bipartite graph with one node per employee and per
+required (day, shift) cell, and an edge wherever an employee is available for
+a cell, every connected component is therefore a sub-roster of its own: its
+requirements can only be met by its employees, and its employees cannot cover
+any other requirement. Solving each component as a separate model and merging
+the assignments gives an optimal solution of the whole instance, since the
+total cost is the sum of the component costs.
+
+Cells without a requirement do not link employees (nobody works them), and
+employees who are not available for any required cell are left out.
+
+An explicit partition, such as a site or skill column with one label per
+employee, can be given instead. The instance is then split by label, so that
+large organizations can solve one model per site even when a site falls into
+several components. A partition must not separate employees of the same
+component, since they cover the same requirements.
+
+Sub-rosters are packed into batches of similar total size, which are solved
+concurrently in worker processes. Small instances are solved in the calling
+process, since starting the workers would take longer than the solves.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import scipy.sparse as sp
+
+from scheduling_model import StaffSchedulingModel
+from solver_backends import get_backend, solve_result, thread_budget
+
+# Batches of sub-rosters per worker process, so that workers finishing early can take more work
+BATCHES_PER_WORKER = 4
+
+# Below this many variables in all, sub-rosters are solved in the calling process by default:
+# starting a worker process (importing NumPy, SciPy and the solvers) takes about a second
+MIN_POOL_VARIABLES = 50_000
+
+# Seconds between checks for a stop request while waiting for the workers
+STOP_POLL_INTERVAL = 0.1
+
+
+def roster_components(availability, requirements):
+    """Connected components of the employee / required-cell availability graph.
+
+    Returns (employee_labels, cell_labels): the component of every employee and
+    of every (day, shift) cell, shaped (E,) and (T, S). Employees available for
+    no required cell, and cells without a requirement or without any available
+    employee, are labelled -1. Components are numbered in the order of their
+    first employee.
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    availability = np.asarray(availability) != 0
+    num_employees = availability.shape[0]
+    required = np.asarray(requirements, dtype=float).ravel() > 0
+    employees, cells = np.nonzero(availability.reshape(num_employees, -1)[:, required])
+    size = num_employees + int(required.sum())
+    graph = sp.csr_matrix((np.ones(employees.size), (employees, num_employees + cells)), shape=(size, size))
+    num_components, labels = connected_components(graph, directed=False)
+
+    # Keep the components with at least one employee and one cell, renumbered by first employee
+    linked = np.zeros(num_components, dtype=bool)
+    linked[labels[num_employees + cells]] = True
+    employee_labels = labels[:num_employees]
+    kept = np.flatnonzero(linked[employee_labels])
+    unique, first = np.unique(employee_labels[kept], return_index=True)
+    rank = np.full(num_components, -1)
+    rank[unique[np.argsort(first)]] = np.arange(unique.size)
+
+    cell_labels = np.full(required.size, -1)
+    cell_labels[required] = rank[labels[num_employees:]]
+    return rank[employee_labels], cell_labels.reshape(np.shape(requirements))
+
+
+def roster_groups(availability, requirements, partition=None):
+    """Sub-rosters of an instance: the connected components, or the labels of a partition.
+
+    Returns (employee_groups, cell_groups) as roster_components does. With a
+    partition (one label per employee), the groups are its labels, numbered in
+    the order of their first employee, and ValueError is raised if a label
+    boundary runs through a component.
+    """
+    employee_groups, cell_groups = roster_components(availability, requirements)
+    if partition is None:
+        return employee_groups, cell_groups
+
+    partition = np.asarray(partition).ravel()
+    if partition.size != employee_groups.size:
+        raise ValueError(f"The partition needs one label per employee ({employee_groups.size}), got {partition.size}.")
+    active = np.flatnonzero(employee_groups >= 0)
+    labels, label_index = np.unique(partition, return_inverse=True)
+    label_index = label_index.ravel()
+
+    # Every component must lie within one label
+    component_label = np.full(int(employee_groups.max(initial=-1)) + 1, -1)
+    component_label[employee_groups[active]] = label_index[active]
+    split = active[component_label[employee_groups[active]] != label_index[active]]
+    if split.size:
+        e = split[0]
+        other = active[(employee_groups[active] == employee_groups[e]) & (label_index[active] != label_index[e])][0]
+        first_e, second_e = sorted((e, other))
+        raise ValueError(
+            f"The partition separates employees who can cover the same requirements: employees {first_e + 1} "
+            f"({labels[label_index[first_e]]}) and {second_e + 1} ({labels[label_index[second_e]]}) are linked by "
+            f"their availability."
+        )
+
+    unique, first = np.unique(label_index[active], return_index=True)
+    rank = np.full(labels.size, -1)
+    rank[unique[np.argsort(first)]] = np.arange(unique.size)
+    groups = np.full(employee_groups.size, -1)
+    groups[active] = rank[label_index[active]]
+    cells = cell_groups >= 0
+    cell_groups = cell_groups.copy()
+    cell_groups[cells] = component_label[cell_groups[cells]]
+    cell_groups[cells] = rank[cell_groups[cells]]
+    return groups, cell_groups
+
+
+def sub_rosters(costs, availability, requirements, max_shifts, employee_groups, cell_groups):
+    """Instance dicts for StaffSchedulingModel(**instance), one per group, and the employees of each."""
+    costs = np.asarray(costs, dtype=float)
+    availability = np.asarray(availability) != 0
+    requirements = np.asarray(requirements, dtype=float)
+    max_shifts = np.broadcast_to(np.asarray(max_shifts, dtype=float), (costs.shape[0],))
+    order = np.argsort(employee_groups, kind="stable")
+    bounds = np.searchsorted(employee_groups[order], np.arange(int(employee_groups.max(initial=-1)) + 2))
+    instances, members = [], []
+    for group in range(bounds.size - 1):
+        employees = order[bounds[group]:bounds[group + 1]]
+        cells = cell_groups == group
+        instances.append({
+            "costs": costs[employees],
+            "availability": availability[employees] & cells,
+            "requirements": np.where(cells, requirements, 0.0),
+            "max_shifts": max_shifts[employees],
+        })
+        members.append(employees)
+    return instances, members
+
+
+def pack_batches(sizes, num_batches):
+    """Split item indices into at most num_batches lists of similar total size (largest first)."""
+    batches = [[] for _ in range(max(1, min(num_batches, len(sizes))))]
+    loads = np.zeros(len(batches))
+    for item in np.argsort(sizes, kind="stable")[::-1]:
+        lightest = int(np.argmin(loads))
+        batches[lightest].append(int(item))
+        loads[lightest] += sizes[item]
+    return batches
+
+
+def solve_sub_rosters(instances, backend, time_limit=None, threads=None, model_class=StaffSchedulingModel,
+                      stop=None):
+    """Solve sub-roster instances one after the other; runs in the worker processes.
+
+    Returns one dict per instance with the status, (E', T, S) assignment (None
+    without a solution), objective, MIP gap, backend, build and solve times.
+    stop is an optional callable checked before each instance; once it returns
+    True, the remaining instances are left unsolved (None).
+    """
+    solved = []
+    for instance in instances:
+        if stop is not None and stop():
+            solved += [None] * (len(instances) - len(solved))
+            break
+        scheduler = model_class(**instance)
+        result = scheduler.solve_with(backend, time_limit, threads)
+        solved.append({
+            "status": result["status"],
+            "assignment": None if result["x"] is None else scheduler.assignment_from(result["x"]),
+            "objective": result["objective"],
+            "mip_gap": result["mip_gap"],
+            "backend": result["backend"],
+            "build_time": result["build_time"],
+            "solve_time": result["solve_time"],
+        })
+    return solved
+
+
+def solve_decomposed(costs, availability, requirements, max_shifts, partition=None, workers=None, time_limit=None,
+                     threads=None, backend=None, model_class=StaffSchedulingModel, stop=None):
+    """Solve every sub-roster of an instance (see roster_groups) and return a result dict.
+
+    Sub-rosters are solved in up to `workers` processes (default: one per core,
+    or only this process below MIN_POOL_VARIABLES variables); with one worker
+    they are solved in this process. stop is an optional callable: once it
+    returns True, sub-rosters not yet started are skipped and the status is
+    "interrupted" (sub-rosters being solved run to the end). backend is a solver
+    backend from solver_backends or min_cost_flow (default: get_backend()),
+    which is copied to the workers. time_limit applies to every sub-roster,
+    threads to every worker (default: cores divided by workers) and model_class
+    is the model used per sub-roster. The result contains the status name, the (E, T, S)
+    assignment and objective when every sub-roster was solved, the MIP gap,
+    the summed build and solve times, the wall time of the whole solve, the
+    number of workers and one entry per sub-roster.
+    """
+    start = time.perf_counter()
+    if backend is None:
+        backend = get_backend()
+    costs = np.asarray(costs, dtype=float)
+    requirements = np.asarray(requirements, dtype=float)
+    employee_groups, cell_groups = roster_groups(availability, requirements, partition)
+    instances, members = sub_rosters(costs, availability, requirements, max_shifts, employee_groups, cell_groups)
+    result = {"status": "optimal", "assignment": None, "objective": None, "mip_gap": None, "build_time": 0.0,
+              "solve_time": 0.0, "wall_time": 0.0, "workers": 0, "sub_rosters": []}
+
+    if np.any((cell_groups < 0) & (requirements > 0)):
+        # A requirement nobody is available for
+        result["status"] = "infeasible"
+        result["wall_time"] = time.perf_counter() - start
+        return result
+
+    sizes = [int(np.count_nonzero(instance["availability"])) for instance in instances]
+    if workers is None and sum(sizes) < MIN_POOL_VARIABLES:
+        workers = 1
+    workers = max(1, min(workers or os.cpu_count() or 1, len(instances)))
+    threads = thread_budget(workers, threads)
+    options = (backend, time_limit, threads, model_class)
+    solved = [None] * len(instances)
+    if workers == 1:
+        solved = solve_sub_rosters(instances, *options, stop=stop)
+    else:
+        batches = pack_batches(sizes, workers * BATCHES_PER_WORKER)
+        with ProcessPoolExecutor(workers, multiprocessing.get_context("spawn")) as executor:
+            pending = {
+                executor.submit(solve_sub_rosters, [instances[i] for i in batch], *options): batch for batch in batches
+            }
+            while pending:
+                done, _ = wait(pending, STOP_POLL_INTERVAL, FIRST_COMPLETED)
+                for future in done:
+                    if not future.cancelled():
+                        for i, sub_result in zip(pending[future], future.result()):
+                            solved[i] = sub_result
+                    del pending[future]
+                if stop is not None and stop():
+                    for future in pending:
+                        future.cancel()
+    result["workers"] = workers
+
+    assignment = np.zeros(costs.shape, dtype=bool)
+    absolute_gap = 0.0
+    if any(sub_result is None for sub_result in solved):
+        result["status"] = "interrupted"
+        absolute_gap = None
+    for employees, size, sub_result in zip(members, sizes, solved):
+        if sub_result is None:
+            result["sub_rosters"].append({
+                "employees": int(employees.size), "variables": size, "status": "interrupted", "objective": None,
+                "backend": None, "build_time": 0.0, "solve_time": 0.0,
+            })
+            continue
+        result["build_time"] += sub_result["build_time"]
+        result["solve_time"] += sub_result["solve_time"]
+        result["sub_rosters"].append({
+            "employees": int(employees.size), "variables": size,
+            **{key: sub_result[key] for key in ("status", "objective", "backend", "build_time", "solve_time")},
+        })
+        if sub_result["assignment"] is None:
+            if result["status"] != "infeasible":
+                result["status"] = sub_result["status"]
+            absolute_gap = None
+            continue
+        if sub_result["status"] != "optimal" and result["status"] == "optimal":
+            result["status"] = "suboptimal"
+        assignment[employees] = sub_result["assignment"]
+        if absolute_gap is not None and sub_result["mip_gap"] is not None:
+            absolute_gap += sub_result["mip_gap"] * abs(sub_result["objective"])
+        else:
+            absolute_gap = None
+
+    if all(sub_result is not None and sub_result["assignment"] is not None for sub_result in solved):
+        objective = float(costs[assignment].sum())
+        result.update(assignment=assignment, objective=objective)
+        if absolute_gap is not None:
+            result["mip_gap"] = absolute_gap / abs(objective) if objective else 0.0
+    result["wall_time"] = time.perf_counter() - start
+    return result
+
+
+class DecomposedSolve:
+    """Runs solve_decomposed for a scheduler behind the optimize()/terminate() interface of SolveWorker.
+
+    self.result is a solver backend result dict over the scheduler's own
+    variables (see solver_backends.solve_result), so it can be shown like that
+    of a single-model solve; its stats count the sub-rosters and workers.
+    model_class builds the model of each sub-roster (default: the scheduler's
+    class), e.g. a functools.partial of work_rules.RuleSchedulingModel.
+    terminate() skips the sub-rosters not yet started; those being solved run
+    to the end.
+    """
+
+    def __init__(self, scheduler, backend, partition=None, workers=None, time_limit=None, model_class=None):
+        self.scheduler = scheduler
+        self.backend = backend
+        self.options = {"partition": partition, "workers": workers, "time_limit": time_limit,
+                        "model_class": model_class or type(scheduler)}
+        self.result = None
+        self.terminated = False
+
+    def optimize(self, callback=None):
+        if self.terminated:
+            self.result = solve_result(self.backend.name, "interrupted")
+            return
+        scheduler = self.scheduler
+        solved = solve_decomposed(
+            scheduler.costs, scheduler.availability, scheduler.requirements, scheduler.max_shifts,
+            backend=self.backend, stop=lambda: self.terminated, **self.options
+        )
+        backends = sorted({sub_result["backend"] for sub_result in solved["sub_rosters"]} - {None})
+        stats = {"sub_rosters": len(solved["sub_rosters"]), "workers": solved["workers"],
+                 "wall_time": solved["wall_time"]}
+        x = None
+        if solved["assignment"] is not None:
+            scheduler.to_problem()
+            x = scheduler.start_from(solved["assignment"])
+        self.result = solve_result(
+            "+".join(backends) or self.backend.name, solved["status"], x, solved["objective"], solved["mip_gap"],
+            solved["build_time"], solved["solve_time"], stats,
+        )
+
+    def terminate(self):
+        self.terminated = True
@@ -0,0 +1,188 @@
+"""Feasibility pre-checks and infeasibility diagnosis for staff-scheduling instances.
+
+precheck() rejects instances whose requirements obviously cannot be met, in
+O(E*T*S) NumPy operations and without building a model:
+
+- a (day, shift) needs more employees than are available for it,
+- a day needs more shifts than its available employees can work,
+- all days together need more shifts than the employees can work,
+- a requirement is not a whole number.
+
+When an instance passes these checks but the solver still reports it
+infeasible, explain_infeasibility() computes an irreducible inconsistent
+subsystem (IIS) with Gurobi and describes its constraints by day, shift and
+employee, including the work rules of a work_rules.RuleSchedulingModel.
+diagnose_infeasible() wraps it for solves by any backend: the IIS is only
+computed after Gurobi solves, and a failure to compute it (for instance a model
+over the size limit of a restricted licence) becomes a note instead of an error.
+
+Days, shifts and employees are numbered from 1 in messages, as in the GUI.
+"""
+import re
+
+import numpy as np
+
+from solver_backends import GurobiBackend, gurobi_installed
+
+# Offending cells listed per failed check
+MAX_LISTED = 10
+
+CONSTRAINT_PATTERNS = {
+    "Requirements": re.compile(r"Requirements_(\d+)_(\d+)$"),
+    "MaxShifts": re.compile(r"MaxShifts_(\d+)$"),
+    "ClassShifts": re.compile(r"ClassShifts_(\d+)$"),
+    "OneShift": re.compile(r"OneShift_(\d+)_(\d+)$"),
+    "Rest": re.compile(r"Rest_(\d+)_(\d+)_(\d+)_(\d+)$"),
+    "MaxConsecutive": re.compile(r"MaxConsecutive_(\d+)_(\d+)$"),
+    "WorkedDay": re.compile(r"WorkedDay_(\d+)_(\d+)$"),
+}
+
+
+def _listed(items):
+    """Join at most MAX_LISTED items, mentioning how many were left out."""
+    text = "; ".join(items[:MAX_LISTED])
+    if len(items) > MAX_LISTED:
+        text += f"; and {len(items) - MAX_LISTED} more"
+    return text
+
+
+def _plural(count, noun):
+    return f"{count:g} {noun}" + ("" if count == 1 else "s")
+
+
+def precheck(availability, requirements, max_shifts, rules=None):
+    """Return a list of messages, one per failed check; empty if no check fails.
+
+    availability has shape (E, T, S), requirements (T, S) and max_shifts is a
+    number or one value per employee. With work rules (see work_rules) that
+    allow one shift per day, employees count once per day in the capacity
+    checks. Passing every check does not guarantee feasibility.
+    """
+    availability = np.asarray(availability) != 0
+    requirements = np.asarray(requirements, dtype=float)
+    num_employees = availability.shape[0]
+    max_shifts = np.floor(np.broadcast_to(np.asarray(max_shifts, dtype=float), (num_employees,)) + 1e-9)
+    problems = []
+
+    fractional = np.argwhere(np.abs(requirements - np.round(requirements)) > 1e-9)
+    if fractional.size:
+        problems.append("Requirements must be whole numbers of employees: " + _listed([
+            f"Day {d + 1}, Shift {s + 1} needs {requirements[d, s]:g}" for d, s in fractional
+        ]))
+
+    # Available headcount per (day, shift)
+    headcount = availability.sum(axis=0)
+    short = np.argwhere(headcount < requirements - 1e-9)
+    if short.size:
+        problems.append("Not enough available employees: " + _listed([
+            f"Day {d + 1}, Shift {s + 1} needs {requirements[d, s]:g} but {headcount[d, s]} are available"
+            for d, s in short
+        ]))
+
+    # Shifts each employee can work per day, limited by its max shifts
+    day_shifts = availability.sum(axis=2)
+    if rules is not None and rules.one_shift_per_day:
+        day_shifts = np.minimum(day_shifts, 1)
+    day_capacity = np.minimum(day_shifts, max_shifts[:, None]).sum(axis=0)
+    day_required = requirements.sum(axis=1)
+    short_days = np.flatnonzero(day_capacity < day_required - 1e-9)
+    if short_days.size:
+        problems.append("Not enough capacity per day: " + _listed([
+            f"Day {d + 1} needs {day_required[d]:g} shifts but its available employees can work {day_capacity[d]:g}"
+            for d in short_days
+        ]))
+
+    total_capacity = np.minimum(day_shifts.sum(axis=1), max_shifts).sum()
+    total_required = requirements.sum()
+    if total_capacity < total_required - 1e-9:
+        problems.append(
+            f"Not enough capacity in total: the requirements add up to {total_required:g} shifts but the "
+            f"employees can work at most {total_capacity:g} within their availability and max shifts"
+        )
+    return problems
+
+
+def describe_constraint(name, scheduler):
+    """Human-readable description of a model constraint by its name."""
+    match = CONSTRAINT_PATTERNS["Requirements"].match(name)
+    if match:
+        d, s = int(match[1]), int(match[2])
+        return f"Day {d + 1}, Shift {s + 1} needs exactly {_plural(scheduler.requirements[d, s], 'employee')}"
+    match = CONSTRAINT_PATTERNS["MaxShifts"].match(name)
+    if match:
+        e = int(match[1])
+        return f"Employee {e + 1} works at most {_plural(scheduler.max_shifts[e], 'shift')}"
+    match = CONSTRAINT_PATTERNS["ClassShifts"].match(name)
+    if match:
+        members = np.flatnonzero(scheduler.classes == int(match[1])) + 1
+        shifts = _plural(scheduler.max_shifts[members[0] - 1], "shift")
+        if members.size == 1:
+            return f"Employee {members[0]} works at most {shifts}"
+        names = ", ".join(str(e) for e in members[:MAX_LISTED]) + (", ..." if members.size > MAX_LISTED else "")
+        return f"Employees {names} ({members.size} identical employees) work at most {shifts} each"
+    match = CONSTRAINT_PATTERNS["OneShift"].match(name)
+    if match:
+        return f"Employee {int(match[1]) + 1} works at most one shift on Day {int(match[2]) + 1}"
+    match = CONSTRAINT_PATTERNS["Rest"].match(name)
+    if match:
+        e, d, a, b = (int(group) for group in match.groups())
+        return f"Employee {e + 1} cannot work Shift {b + 1} on Day {d + 2} after Shift {a + 1} on Day {d + 1}"
+    match = CONSTRAINT_PATTERNS["MaxConsecutive"].match(name)
+    if match:
+        e, d = int(match[1]), int(match[2])
+        limit = scheduler.rules.max_consecutive_days
+        return f"Employee {e + 1} works at most {_plural(limit, 'day')} of Days {d + 1}-{d + limit + 1}"
+    match = CONSTRAINT_PATTERNS["WorkedDay"].match(name)
+    if match:
+        return f"Shifts of Employee {int(match[1]) + 1} on Day {int(match[2]) + 1} make it a working day"
+    return name
+
+
+def explain_infeasibility(scheduler):
+    """Describe an IIS of an infeasible scheduling model, or return [] if Gurobi is not installed.
+
+    Uses the model built by scheduler.build() when there is one, otherwise builds
+    a temporary Gurobi model from scheduler.to_problem(). Variables whose upper
+    bound is part of the IIS are cells made unavailable in a session. Work rules
+    added lazily are diagnosed in their enumerated form.
+    """
+    if not gurobi_installed():
+        return []
+    if getattr(scheduler, "lazy", False) and scheduler.rules:
+        scheduler = scheduler.enumerated()
+    model, x = scheduler.model, scheduler.x
+    temporary = model is None
+    if temporary:
+        model, x, _ = GurobiBackend().build_model(scheduler.to_problem(), "Infeasibility")
+    output_flag = model.Params.OutputFlag
+    model.Params.OutputFlag = 0
+    try:
+        model.computeIIS()
+        reasons = [describe_constraint(constr.ConstrName, scheduler) for constr in model.getConstrs() if constr.IISConstr]
+        in_iis = np.flatnonzero(np.asarray(x.IISUB) & (x.UB == 0))
+        cells = np.unravel_index(scheduler.cells[in_iis], scheduler.costs.shape)
+        reasons += [f"Employee {e + 1} is unavailable on Day {d + 1}, Shift {s + 1}" for e, d, s in zip(*cells)]
+    finally:
+        if temporary:
+            model.dispose()
+        else:
+            model.Params.OutputFlag = output_flag
+    return reasons
+
+
+def diagnose_infeasible(scheduler, backend):
+    """Explain an infeasible solve by a solver backend (or its name); returns (reasons, note).
+
+    reasons are those of explain_infeasibility(), computed only when the solve
+    used Gurobi, directly or as the fallback of a min_cost_flow.FlowBackend.
+    note is None, or says why there are no reasons; errors while computing the
+    IIS end up there, so the solve is still reported infeasible.
+    """
+    solver = getattr(backend, "fallback", None) or backend
+    name = solver if isinstance(solver, str) else solver.name
+    if name != GurobiBackend.name:
+        return [], f"diagnosis unavailable: conflicts are only computed with the {GurobiBackend.name} backend"
+    try:
+        return explain_infeasibility(scheduler), None
+    except Exception as e:
+        return [], f"diagnosis unavailable: {e}"
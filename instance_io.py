@@ -0,0 +1,485 @@
+"""Reading and validating staff-scheduling input matrices.
+
+Matrices use the same layout as the StaffSchedulingApp tables: costs and
+availability have one row per (employee, day) pair, in employee-major order,
+and one column per shift; requirements have one row per day and one column per
+shift. Files are read straight into NumPy arrays, without going through Qt
+widgets, and validated in vectorized form. pandas is only imported when a CSV
+file is read.
+
+Complete instances are stored as .npz, .json or .ssi files. The .ssi format is
+a compact binary layout that is memory-mapped rather than parsed:
+
+    magic b"STAFFSSI" | format version (uint32) | header length (uint32) | JSON header | arrays
+
+The header gives the instance shape, optional metadata and the dtype, shape
+and byte offset of every array. Arrays start on 64-byte boundaries: costs as
+float32 (E, T, S), availability as bits packed with np.packbits, requirements
+as int16 (T, S) and max_shifts as float32 (E,). A 5000 x 365 x 3 instance takes
+about 23 MB, nearly all of it costs, and loading it maps the file instead of
+parsing it, so memory use is that of the arrays themselves.
+"""
+import io
+import json
+import os
+import struct
+
+import numpy as np
+
+# Rows read at a time from CSV files
+CSV_CHUNK_ROWS = 200_000
+
+# Assignments written at a time when exporting results
+EXPORT_CHUNK_ROWS = 100_000
+
+# Arrays stored in an instance file, and the supported instance file types
+INSTANCE_KEYS = ("costs", "availability", "requirements", "max_shifts")
+INSTANCE_EXTENSIONS = (".npz", ".json", ".ssi")
+
+# Binary instance files: magic and version, header length, then the JSON header
+BINARY_MAGIC = b"STAFFSSI"
+BINARY_VERSION = 1
+BINARY_PREFIX = struct.Struct("<8sII")
+BINARY_ALIGNMENT = 64
+BINARY_DTYPES = {"costs": "<f4", "availability": "|u1", "requirements": "<i2", "max_shifts": "<f4"}
+
+# Validation rules per table kind
+VALUE_RULES = {
+    "costs": None,
+    "availability": "binary",
+    "requirements": "nonnegative_integer",
+}
+
+
+def read_matrix(path, name="Input"):
+    """Read a 2-D (or 3-D .npy) numeric matrix from a .csv or .npy file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        data = np.load(path, mmap_mode="r")
+        if not np.issubdtype(data.dtype, np.number) and data.dtype != bool:
+            raise ValueError(f"The {name} file must contain numbers, found dtype {data.dtype}.")
+        return np.asarray(data, dtype=float)
+    if extension in (".csv", ".txt"):
+        return read_csv_matrix(path, name)
+    raise ValueError(f"Unsupported file type '{extension}' for the {name} table. Use .csv or .npy.")
+
+
+def read_csv_matrix(path, name="Input", chunk_rows=CSV_CHUNK_ROWS):
+    """Read a numeric CSV file chunk by chunk into a float array.
+
+    A header line is skipped if none of its fields is a number. Empty cells
+    become NaN and are reported by validate_matrix; non-numeric cells raise a
+    ValueError giving their row and column.
+    """
+    import pandas as pd
+
+    header = "infer" if _has_header(path) else None
+    first_row = 2 if header is not None else 1
+    chunks = []
+    row_offset = 0
+    reader = pd.read_csv(path, header=header, chunksize=chunk_rows, skipinitialspace=True)
+    for chunk in reader:
+        values = chunk.to_numpy()
+        if values.dtype == object:
+            values = _coerce_chunk(chunk, name, first_row + row_offset)
+        chunks.append(values.astype(float, copy=False))
+        row_offset += len(chunk)
+    if not chunks:
+        return np.empty((0, 0))
+    widths = {chunk.shape[1] for chunk in chunks}
+    if len(widths) > 1:
+        raise ValueError(f"The {name} file has rows of different lengths.")
+    return np.concatenate(chunks)
+
+
+def _has_header(path):
+    with open(path, newline="") as f:
+        first_line = f.readline()
+    for field in first_line.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        try:
+            float(field)
+            return False
+        except ValueError:
+            continue
+    return first_line.strip() != ""
+
+
+def _coerce_chunk(chunk, name, first_row):
+    """Convert a chunk with non-numeric columns, reporting the first invalid cell."""
+    import pandas as pd
+
+    columns = []
+    for col, label in enumerate(chunk.columns):
+        raw = chunk[label]
+        numeric = pd.to_numeric(raw, errors="coerce")
+        invalid = numeric.isna().to_numpy() & raw.notna().to_numpy()
+        if invalid.any():
+            row = int(np.argmax(invalid))
+            raise ValueError(
+                f"The {name} table contains invalid data at row {first_row + row}, column {col + 1}: "
+                f"'{str(raw.iloc[row]).strip()}' is not a valid number."
+            )
+        columns.append(numeric.to_numpy(dtype=float))
+    return np.column_stack(columns)
+
+
+def validate_matrix(data, expected_rows, expected_cols, name, kind=None):
+    """Check the shape and values of a matrix, returning it as a float array.
+
+    kind selects the value rule from VALUE_RULES ("costs", "availability" or
+    "requirements"). Raises ValueError naming the first offending row and column.
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim == 3 and data.shape[0] * data.shape[1] == expected_rows:
+        data = data.reshape(expected_rows, data.shape[2])
+    elif data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if data.ndim != 2:
+        raise ValueError(f"The {name} table must be a 2-D matrix, found shape {data.shape}.")
+    rows, cols = data.shape
+    if rows != expected_rows or cols != expected_cols:
+        raise ValueError(
+            f"The {name} table must have exactly {expected_rows} rows and {expected_cols} columns. "
+            f"Found {rows} rows and {cols} columns."
+        )
+
+    _raise_first(np.isnan(data), data, name, "has an empty cell")
+    _raise_first(~np.isfinite(data), data, name, "contains invalid data", "is not a finite number")
+
+    rule = VALUE_RULES.get(kind)
+    if rule == "binary":
+        _raise_first((data != 0) & (data != 1), data, name, "contains invalid data", "must be 0 or 1")
+    elif rule == "nonnegative_integer":
+        _raise_first(
+            (data < 0) | (data != np.round(data)), data, name, "contains invalid data",
+            "must be a non-negative integer",
+        )
+    return data
+
+
+def validate_max_shifts(max_shifts, num_employees):
+    """Check that max_shifts is a number or one value per employee, each finite and non-negative.
+
+    Returns it as a float array of the same shape.
+    """
+    data = np.asarray(max_shifts, dtype=float)
+    if data.shape not in ((), (num_employees,)):
+        raise ValueError(f"Instance max_shifts must be a number or have shape ({num_employees},), got {data.shape}.")
+    values = data.reshape(-1)
+    invalid = np.flatnonzero(~np.isfinite(values) | (values < 0))
+    if invalid.size:
+        employee = f" of employee {invalid[0] + 1}" if data.ndim else ""
+        raise ValueError(f"The max shifts{employee} must be a non-negative number, got '{values[invalid[0]]:g}'.")
+    return data
+
+
+def _raise_first(mask, data, name, problem, reason=None):
+    """Raise a ValueError for the first True cell of mask, if any."""
+    flat = np.flatnonzero(mask)
+    if flat.size == 0:
+        return
+    row, col = np.unravel_index(flat[0], mask.shape)
+    message = f"The {name} table {problem} at row {row + 1}, column {col + 1}"
+    if reason is not None:
+        message += f": '{data[row, col]:g}' {reason}"
+    if flat.size > 1:
+        message += f" ({flat.size - 1} more cells have the same problem)"
+    raise ValueError(message + ".")
+
+
+def load_matrix(path, expected_rows, expected_cols, name, kind=None):
+    """Read a matrix file and validate it against the expected shape and value rule."""
+    return validate_matrix(read_matrix(path, name), expected_rows, expected_cols, name, kind)
+
+
+def save_instance(path, costs, availability, requirements, max_shifts, metadata=None, partition=None):
+    """Save a complete instance (costs and availability of shape (E, T, S)).
+
+    Files ending in .ssi are written in the binary format (see
+    write_binary_instance), with the optional metadata dict in their header;
+    any other path is saved as a compressed .npz file. partition is an optional
+    site or skill label per employee (see decomposition), stored as the
+    "partition" metadata entry or array.
+    """
+    if partition is not None:
+        partition = np.asarray(partition).ravel()
+    if os.path.splitext(path)[1].lower() == ".ssi":
+        if partition is not None:
+            metadata = {**(metadata or {}), "partition": partition.tolist()}
+        # Write next to the target and rename, so arrays still mapped from it stay valid
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                write_binary_instance(f, costs, availability, requirements, max_shifts, metadata)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return
+    np.savez_compressed(
+        path,
+        costs=np.asarray(costs, dtype=float),
+        availability=np.asarray(availability) != 0,
+        requirements=np.asarray(requirements, dtype=float),
+        max_shifts=np.asarray(max_shifts, dtype=float),
+        **({} if partition is None else {"partition": partition}),
+    )
+
+
+def load_instance(path):
+    """Load an instance saved by save_instance, or a .json file with the same keys.
+
+    Returns a dict with costs, availability, requirements and max_shifts, ready
+    to be passed to StaffSchedulingModel(**instance). The arrays of an .ssi file
+    keep their stored dtypes and costs stays memory-mapped (see
+    read_binary_instance).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".ssi":
+        return read_binary_instance(path)
+    if extension == ".npz":
+        with np.load(path) as data:
+            instance = {key: data[key] for key in INSTANCE_KEYS if key in data}
+    elif extension == ".json":
+        with open(path) as f:
+            instance = {key: np.asarray(value) for key, value in json.load(f).items() if key in INSTANCE_KEYS}
+    else:
+        raise ValueError(
+            f"Unsupported instance file type '{extension}'. Use one of: {', '.join(INSTANCE_EXTENSIONS)}."
+        )
+
+    return instance_from_dict(instance, f"Instance file {path}")
+
+
+def load_partition(path):
+    """Return the partition stored with an instance file (one label per employee), or None.
+
+    The partition is the "partition" metadata entry of an .ssi file, or the
+    "partition" array or list of an .npz or .json file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".ssi":
+        partition = read_binary_header(path)[0].get("metadata", {}).get("partition")
+    elif extension == ".npz":
+        with np.load(path) as data:
+            partition = data["partition"] if "partition" in data else None
+    else:
+        with open(path) as f:
+            partition = json.load(f).get("partition")
+    return None if partition is None else np.asarray(partition)
+
+
+def write_binary_instance(f, costs, availability, requirements, max_shifts, metadata=None):
+    """Write an instance in the binary format to a binary file object.
+
+    Costs are stored as float32, which keeps about 7 significant digits.
+    Requirements must be whole numbers that fit in an int16 and max_shifts is a
+    number or one value per employee. metadata is an optional JSON-serializable
+    dict kept in the header.
+    """
+    costs = np.asarray(costs, dtype=float)
+    if costs.ndim != 3:
+        raise ValueError(f"Instance costs must have shape (E, T, S), got {costs.shape}.")
+    num_employees, num_days, num_shifts = costs.shape
+    requirements = validate_matrix(requirements, num_days, num_shifts, "Requirements", "requirements")
+    if requirements.size and requirements.max() > np.iinfo(np.int16).max:
+        raise ValueError(f"Requirements above {np.iinfo(np.int16).max} do not fit in the binary instance format.")
+    if np.shape(availability) != costs.shape:
+        raise ValueError(f"Instance availability must have shape {costs.shape}, got {np.shape(availability)}.")
+    max_shifts = validate_max_shifts(max_shifts, num_employees)
+    stored_costs = costs.astype(BINARY_DTYPES["costs"])
+    _raise_first(~np.isfinite(stored_costs.reshape(-1, num_shifts)), costs.reshape(-1, num_shifts), "Costs",
+                 "contains invalid data", "is not a finite single-precision number")
+    arrays = {
+        "costs": stored_costs,
+        "availability": np.packbits(np.asarray(availability) != 0, axis=None),
+        "requirements": requirements.astype(BINARY_DTYPES["requirements"]),
+        "max_shifts": np.broadcast_to(np.asarray(max_shifts, dtype=BINARY_DTYPES["max_shifts"]), (num_employees,)),
+    }
+
+    # Offsets are relative to the end of the header, which is padded to the alignment
+    offsets, offset = {}, 0
+    for key, array in arrays.items():
+        offsets[key] = offset
+        offset += -(-array.nbytes // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+    header = {
+        "shape": list(costs.shape),
+        "metadata": metadata or {},
+        "arrays": {
+            key: {"dtype": BINARY_DTYPES[key], "shape": list(array.shape), "offset": offsets[key]}
+            for key, array in arrays.items()
+        },
+    }
+    encoded = json.dumps(header).encode()
+    start = -(-(BINARY_PREFIX.size + len(encoded)) // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+    f.write(BINARY_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, start - BINARY_PREFIX.size))
+    f.write(encoded.ljust(start - BINARY_PREFIX.size))
+    for key, array in arrays.items():
+        data = np.ascontiguousarray(array).tobytes()
+        f.write(data + bytes(-len(data) % BINARY_ALIGNMENT))
+
+
+def binary_instance_bytes(costs, availability, requirements, max_shifts, metadata=None):
+    """Encode an instance in the binary format, e.g. as a request body."""
+    buffer = io.BytesIO()
+    write_binary_instance(buffer, costs, availability, requirements, max_shifts, metadata)
+    return buffer.getvalue()
+
+
+def read_binary_header(source):
+    """Read and check the header of a binary instance, given as a path or a bytes-like object.
+
+    Returns (header dict, byte offset of the arrays).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            prefix = f.read(BINARY_PREFIX.size)
+            magic, version, length = _binary_prefix(prefix)
+            encoded = f.read(length)
+    else:
+        magic, version, length = _binary_prefix(bytes(source[:BINARY_PREFIX.size]))
+        encoded = bytes(source[BINARY_PREFIX.size:BINARY_PREFIX.size + length])
+    if len(encoded) != length:
+        raise ValueError("The binary instance is truncated.")
+    try:
+        header = json.loads(encoded)
+    except ValueError as e:
+        raise ValueError(f"The binary instance has an invalid header: {e}")
+    if not isinstance(header, dict):
+        raise ValueError("The binary instance has an invalid header: expected a JSON object.")
+    header["version"] = version
+    return header, BINARY_PREFIX.size + length
+
+
+def _binary_prefix(prefix):
+    if len(prefix) != BINARY_PREFIX.size or prefix[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError("Not a binary instance file.")
+    magic, version, length = BINARY_PREFIX.unpack(prefix)
+    if version > BINARY_VERSION:
+        raise ValueError(
+            f"The binary instance has format version {version}; this version reads up to {BINARY_VERSION}."
+        )
+    return magic, version, length
+
+
+def read_binary_instance(source):
+    """Load a binary instance from a path (memory-mapped) or a bytes-like object (without copying).
+
+    Returns a dict as load_instance does: costs are a read-only float32 array,
+    availability a bool array unpacked from its bits, requirements int16 and
+    max_shifts float32. Costs are checked in one pass over the mapped file but
+    never copied into memory by the loader. Raises ValueError if the header is
+    incomplete or invalid, the data is truncated, has the wrong shapes, or has
+    non-finite costs, negative requirements or invalid max shifts.
+    """
+    header, start = read_binary_header(source)
+    shape = _header_shape(header.get("shape"))
+    if shape is None or len(shape) != 3:
+        raise ValueError(f"Instance costs must have shape (E, T, S), got {header.get('shape')}.")
+    size = os.path.getsize(source) if isinstance(source, (str, os.PathLike)) else len(source)
+    specs = header.get("arrays")
+    if not isinstance(specs, dict):
+        raise ValueError("The binary instance has no array table in its header.")
+    arrays = {}
+    for key in INSTANCE_KEYS:
+        spec = specs.get(key)
+        if not isinstance(spec, dict):
+            raise ValueError(f"The binary instance has no {key} array.")
+        missing = [field for field in ("dtype", "shape", "offset") if field not in spec]
+        if missing:
+            raise ValueError(f"The {key} array of the binary instance has no {', '.join(missing)}.")
+        try:
+            dtype = np.dtype(spec["dtype"])
+        except (TypeError, ValueError):
+            raise ValueError(f"The {key} array of the binary instance has an invalid dtype {spec['dtype']!r}.")
+        array_shape = _header_shape(spec["shape"])
+        if array_shape is None or not isinstance(spec["offset"], int) or spec["offset"] < 0:
+            raise ValueError(f"The {key} array of the binary instance has an invalid shape or offset.")
+        offset = start + spec["offset"]
+        if offset + dtype.itemsize * int(np.prod(array_shape)) > size:
+            raise ValueError("The binary instance is truncated.")
+        if isinstance(source, (str, os.PathLike)):
+            arrays[key] = np.memmap(source, dtype, "r", offset, array_shape)
+        else:
+            arrays[key] = np.frombuffer(source, dtype, int(np.prod(array_shape)), offset).reshape(array_shape)
+
+    num_employees, num_days, num_shifts = shape
+    expected = {"costs": shape, "requirements": (num_days, num_shifts), "max_shifts": (num_employees,)}
+    expected["availability"] = (-(-int(np.prod(shape)) // 8),)
+    for key, key_shape in expected.items():
+        if arrays[key].shape != key_shape:
+            raise ValueError(f"Instance {key} must have shape {key_shape}, got {arrays[key].shape}.")
+    availability = np.unpackbits(np.asarray(arrays["availability"]), count=int(np.prod(shape)))
+    availability = availability.view(bool).reshape(shape)
+    _raise_first(~np.isfinite(arrays["costs"].reshape(-1, num_shifts)), arrays["costs"].reshape(-1, num_shifts),
+                 "Costs", "contains invalid data", "is not a finite number")
+    _raise_first(arrays["requirements"] < 0, arrays["requirements"], "Requirements", "contains invalid data",
+                 "must be a non-negative integer")
+    validate_max_shifts(arrays["max_shifts"], num_employees)
+    return {
+        "costs": arrays["costs"],
+        "availability": availability,
+        "requirements": arrays["requirements"],
+        "max_shifts": arrays["max_shifts"],
+    }
+
+
+def _header_shape(value):
+    """A shape from a binary header as a tuple of non-negative ints, or None if it is not one."""
+    if not isinstance(value, list) or not all(isinstance(n, int) and n >= 0 for n in value):
+        return None
+    return tuple(value)
+
+
+def instance_from_dict(instance, source="Instance"):
+    """Validate a dict with the INSTANCE_KEYS (arrays or nested lists), as load_instance does.
+
+    source names the instance in error messages.
+    """
+    missing = [key for key in INSTANCE_KEYS if key not in instance]
+    if missing:
+        raise ValueError(f"{source} is missing: {', '.join(missing)}.")
+    costs = np.asarray(instance["costs"], dtype=float)
+    if costs.ndim != 3:
+        raise ValueError(f"Instance costs must have shape (E, T, S), got {costs.shape}.")
+    num_employees, num_days, num_shifts = costs.shape
+    return {
+        "costs": validate_matrix(costs, num_employees * num_days, num_shifts, "Costs", "costs").reshape(costs.shape),
+        "availability": validate_matrix(
+            instance["availability"], num_employees * num_days, num_shifts, "Availability", "availability"
+        ).reshape(costs.shape) != 0,
+        "requirements": validate_matrix(instance["requirements"], num_days, num_shifts, "Requirements", "requirements"),
+        "max_shifts": validate_max_shifts(instance["max_shifts"], num_employees),
+    }
+
+
+def export_assignment(path, assignment, instance_name=None, status=None, objective=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Stream an (E, T, S) assignment to a .csv or .json file, with 1-based indices.
+
+    Assignments are formatted and written in chunks, so no per-assignment Python
+    objects are kept in memory.
+    """
+    rows = np.argwhere(assignment) + 1 if assignment is not None else np.empty((0, 3), dtype=np.int64)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, "w", newline="") as f:
+            f.write("employee,day,shift\n")
+            for begin in range(0, len(rows), chunk_rows):
+                np.savetxt(f, rows[begin:begin + chunk_rows], fmt="%d", delimiter=",")
+    elif extension == ".json":
+        with open(path, "w") as f:
+            header = {"instance": instance_name, "status": status, "objective": objective}
+            f.write(json.dumps(header)[:-1] + ', "assignments": [')
+            for begin in range(0, len(rows), chunk_rows):
+                if begin:
+                    f.write(", ")
+                f.write(", ".join(
+                    f'{{"employee": {e}, "day": {d}, "shift": {s}}}'
+                    for e, d, s in rows[begin:begin + chunk_rows].tolist()
+                ))
+            f.write("]}")
+    else:
+        raise ValueError(f"Unsupported export file type '{extension}'. Use .csv or .json.")
@@ -1,7 +1,37 @@
 import sys
+import time
+START_TIME = time.perf_counter()
+
+import importlib
+import threading
 from PyQt5 import QtWidgets, QtCore, QtGui
-from staff_scheduling import StaffSchedulingApp
-from advertising_budget_allocator import AdvertisingGUI
+
+# Application windows by app type, as (module, class) pairs imported on first use
+APPS = {
+    "advertising": ("advertising_budget_allocator", "AdvertisingGUI"),
+    "staff": ("staff_scheduling", "StaffSchedulingApp"),
+}
+
+# Modules imported in the background once the selector window is shown
+PREWARM_MODULES = [
+    "staff_scheduling", "advertising_budget_allocator", "scipy.optimize", "gurobipy",
+    "matplotlib.figure", "matplotlib.backends.backend_qt5agg", "pandas",
+]
+
+
+def prewarm(modules=PREWARM_MODULES):
+    """Import modules on a daemon thread so that the first click does not pay for them."""
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass  # Optional solver or plotting package: reported when the app is opened
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
 
 class ProblemSelectorApp(QtWidgets.QMainWindow):
     def __init__(self):
@@ -78,14 +108,15 @@ class ProblemSelectorApp(QtWidgets.QMainWindow):
     
     def run_app(self, app_type):
         try:
+            # Import the application module on first use (a no-op once pre-warmed)
+            module_name, class_name = APPS[app_type]
+            window_class = getattr(importlib.import_module(module_name), class_name)
             if app_type == "advertising":
-                # First check if the module is already imported
-                self.advertising_window = AdvertisingGUI()
+                self.advertising_window = window_class()
                 self.advertising_window.show()
             
             elif app_type == "staff":
-                # First check if the module is already imported
-                self.staff_window = StaffSchedulingApp()
+                self.staff_window = window_class()
                 self.staff_window.show()
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
@@ -94,4 +125,12 @@ if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     window = ProblemSelectorApp()
     window.show()
+    if "--startup-time" in sys.argv:
+        # Used by startup_report.py: print the time until the window is shown, then quit
+        def report():
+            print(f"window shown after {(time.perf_counter() - START_TIME) * 1000:.1f} ms")
+            app.quit()
+        QtCore.QTimer.singleShot(0, report)
+    elif "--no-prewarm" not in sys.argv:
+        QtCore.QTimer.singleShot(0, prewarm)
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""Exact min-cost-flow solver for transportation-structured problems.
+
+Without extra work rules, the staff-scheduling model is a transportation
+problem: every variable x[e, d, s] appears in exactly one Requirements_{d}_{s}
+row (an equality) and one MaxShifts_{e} row (a capacity), both with
+coefficient 1. As a network:
+
+    source --(max shifts)--> employee --(1, cost)--> (day, shift) --(requirement)--> sink
+
+Its constraint matrix is totally unimodular, so the LP optimum is integral and
+branch-and-bound is unnecessary. The aggregated model (see aggregation) has the
+same structure with class nodes and arc capacities equal to the class sizes.
+
+min_cost_flow() solves such networks over NumPy arc arrays with cost scaling
+and the primal-dual method. Costs are first rounded down to a coarse unit,
+which shrinks by SCALE_FACTOR at every stage. Each stage saturates the arcs
+whose reduced cost became negative and routes the resulting excesses to the
+deficits. Routing repeats two steps: a Dijkstra shortest-path tree on the
+reduced costs updates the node potentials, then a maximum flow on the
+zero-reduced-cost arcs augments along every shortest path at once. Both run
+in scipy.sparse.csgraph. The last stage uses the exact costs, so the flow is
+optimal, not approximate.
+
+FlowBackend solves any LinearProblem with this structure and can be used like
+the other solver backends, handing other problems to a fallback backend;
+is_transportation() checks for the structure. batch_solve.py and the solve
+service solve through it unless it is turned off (--no-flow, "flow": false);
+the staff scheduling application only when "Network flow" is ticked, which it
+is not by default.
+
+The routing keeps both residual directions of every arc in one sparse pattern,
+which needs at most one arc between any two nodes. The network of a
+transportation problem has no antiparallel arcs, and problems with two
+variables in the same pair of rows (parallel arcs) are not treated as
+transportation problems.
+"""
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from solver_backends import CONTINUOUS, solve_result
+
+# Cost units shrink by this factor per scaling stage
+SCALE_FACTOR = 8
+
+# Costs are rounded to multiples of this fraction of the largest cost before the final, exact stage
+FINEST_UNIT = 1e-4
+
+
+def transportation_network(problem):
+    """Describe a LinearProblem as a network, or return None if it is not a transportation problem.
+
+    The problem qualifies when every column has two coefficients of 1, one in an
+    equality row (a demand) and one in a '<' row (a capacity), no two columns
+    share both rows, the bounds are 0 <= x <= ub and the right-hand sides are
+    non-negative integers. Returns a
+    dict of NumPy arrays: "capacity_rows" and "demand_rows" (row indices), and
+    per variable its "capacity" and "demand" node (positions in those arrays),
+    its arc capacity "ub" and its "cost" (negated when maximizing).
+    """
+    A = problem.A.tocsc()
+    lb, ub = problem.var_bounds()
+    rhs = problem.rhs
+    if np.any(lb != 0) or np.any(ub < 0) or np.any(problem.senses == ">"):
+        return None
+    if np.any(np.diff(A.indptr) != 2) or np.any(A.data != 1) or np.any(rhs < 0):
+        return None
+    # Fractional capacities only round down when the variables are integer
+    fractional = np.abs(rhs - np.round(rhs)) > 1e-9
+    finite = np.isfinite(ub)
+    if np.any(fractional & (problem.senses == "=")) or np.any(np.abs(ub[finite] - np.round(ub[finite])) > 1e-9):
+        return None
+    if np.any(fractional) and not np.all(problem.vtypes != CONTINUOUS):
+        return None
+
+    rows = A.indices.reshape(-1, 2)
+    equality = problem.senses[rows] == "="
+    # One equality and one capacity row per column
+    if np.any(equality[:, 0] == equality[:, 1]):
+        return None
+    demand_row = np.where(equality[:, 0], rows[:, 0], rows[:, 1])
+    capacity_row = np.where(equality[:, 0], rows[:, 1], rows[:, 0])
+    # Parallel arcs would share an entry of the sparse matrices used by _route
+    if np.unique(capacity_row * problem.num_constrs + demand_row).size != capacity_row.size:
+        return None
+
+    demand_rows = np.flatnonzero(problem.senses == "=")
+    capacity_rows = np.flatnonzero(problem.senses == "<")
+    position = np.empty(problem.num_constrs, dtype=np.int64)
+    position[demand_rows] = np.arange(demand_rows.size)
+    position[capacity_rows] = np.arange(capacity_rows.size)
+    total_demand = np.rint(rhs[demand_rows]).sum()
+    return {
+        "capacity_rows": capacity_rows,
+        "demand_rows": demand_rows,
+        "capacity": position[capacity_row],
+        "demand": position[demand_row],
+        "ub": np.rint(np.minimum(ub, total_demand)),
+        "cost": -problem.c if problem.maximize else problem.c.copy(),
+    }
+
+
+def is_transportation(problem):
+    """True if the problem can be solved as a min-cost flow (see transportation_network)."""
+    return transportation_network(problem) is not None
+
+
+def min_cost_flow(num_nodes, tail, head, capacity, cost, supply, deadline=None):
+    """Minimum-cost flow meeting node supplies (positive) and demands (negative), which sum to zero.
+
+    Arcs are given as arrays tail, head, integer capacity and cost; at most one
+    arc may join any two nodes, in either direction. deadline is
+    an optional time.perf_counter() value after which the solve stops. Returns
+    (status, flow, stats): status is "optimal", "infeasible" or "time_limit",
+    flow the integer flow per arc (None unless optimal) and stats counts the
+    scaling stages and primal-dual phases.
+    """
+    tail = np.asarray(tail, dtype=np.int64)
+    head = np.asarray(head, dtype=np.int64)
+    capacity = np.asarray(capacity, dtype=np.int64)
+    cost = np.asarray(cost, dtype=float)
+    supply = np.asarray(supply, dtype=np.int64)
+    flow = np.zeros(tail.size, dtype=np.int64)
+    potential = np.zeros(num_nodes)
+    stats = {"stages": 0, "phases": 0}
+
+    span = float(np.abs(cost).max()) if cost.size else 0.0
+    span = span or 1.0
+    tolerance = 1e-9 * (1.0 + span)
+    unit = 2.0 ** np.ceil(np.log2(span))
+    while True:
+        final = unit < span * FINEST_UNIT
+        stage_cost = cost if final else np.floor(cost / unit) * unit
+        stats["stages"] += 1
+
+        # Saturate arcs with a negative reduced cost and empty those with a positive one
+        reduced = stage_cost + potential[tail] - potential[head]
+        flow[reduced < -tolerance] = capacity[reduced < -tolerance]
+        flow[reduced > tolerance] = 0
+        excess = supply - np.bincount(tail, flow, num_nodes).astype(np.int64) + np.bincount(
+            head, flow, num_nodes
+        ).astype(np.int64)
+
+        status = _route(num_nodes, tail, head, capacity, stage_cost, flow, potential, excess, tolerance, deadline,
+                        stats)
+        if status != "optimal":
+            return status, None, stats
+        if final:
+            return "optimal", flow, stats
+        unit /= SCALE_FACTOR
+
+
+def _route(num_nodes, tail, head, capacity, cost, flow, potential, excess, tolerance, deadline, stats):
+    """Route the excesses to the deficits along shortest paths, updating flow and potential in place."""
+    from scipy.sparse.csgraph import dijkstra, maximum_flow
+
+    sources = np.flatnonzero(excess > 0)
+    sinks = np.flatnonzero(excess < 0)
+    if sources.size == 0:
+        return "optimal"
+
+    # Super source and sink joined to the nodes with an excess and a deficit
+    source, sink = num_nodes, num_nodes + 1
+    size = num_nodes + 2
+    num_arcs = tail.size
+    t = np.concatenate([tail, np.full(sources.size, source), sinks])
+    h = np.concatenate([head, sources, np.full(sinks.size, sink)])
+    c = np.concatenate([capacity, excess[sources], -excess[sinks]])
+    w = np.concatenate([cost, np.zeros(sources.size + sinks.size)])
+    f = np.concatenate([flow, np.zeros(sources.size + sinks.size, dtype=np.int64)])
+    p = np.concatenate([potential, [potential[sources].max(), potential[sinks].min()]])
+    m = t.size
+
+    # One CSR pattern holds both residual directions of every arc (no two arcs are
+    # parallel or antiparallel), so each Dijkstra graph only rewrites the data. Entry k of the pattern
+    # (arc k forward, arc k - m backward) sits at data position slot[k].
+    pattern = sp.csr_matrix(
+        (np.arange(1, 2 * m + 1, dtype=float), (np.concatenate([t, h]), np.concatenate([h, t]))), shape=(size, size)
+    )
+    slot = np.empty(2 * m, dtype=np.int64)
+    slot[pattern.data.astype(np.int64) - 1] = np.arange(2 * m)
+    indices, indptr = pattern.indices, pattern.indptr
+    forward, backward = slot[:m], slot[m:]
+
+    required = int(excess[sources].sum())
+    routed = 0
+    weights = np.empty(2 * m)
+    reduced = w + p[t] - p[h]
+    while routed < required:
+        if deadline is not None and time.perf_counter() > deadline:
+            return "time_limit"
+        stats["phases"] += 1
+        weights[forward] = np.where(f < c, np.maximum(reduced, 0.0), np.inf)
+        weights[backward] = np.where(f > 0, np.maximum(-reduced, 0.0), np.inf)
+        distance = dijkstra(sp.csr_matrix((weights, indices, indptr), shape=(size, size)), indices=source)
+        if not np.isfinite(distance[sink]):
+            return "infeasible"
+        p += np.minimum(distance, distance[sink])
+
+        # Augment along all shortest paths: a maximum flow over the arcs of zero reduced cost
+        reduced = w + p[t] - p[h]
+        ahead = (reduced <= tolerance) & (f < c)
+        back = (reduced >= -tolerance) & (f > 0)
+        arcs = np.flatnonzero(ahead | back)
+        admissible = sp.csr_matrix(
+            (np.concatenate([(c - f)[ahead], f[back]]).astype(np.int32),
+             (np.concatenate([t[ahead], h[back]]), np.concatenate([h[ahead], t[back]]))),
+            shape=(size, size),
+        )
+        result = maximum_flow(admissible, source, sink)
+        routed += result.flow_value
+        f[arcs] += np.asarray(result.flow[t[arcs], h[arcs]]).ravel().astype(np.int64)
+
+    flow[:] = f[:num_arcs]
+    potential[:] = p[:num_nodes]
+    return "optimal"
+
+
+class FlowBackend:
+    """Solve transportation problems (see transportation_network) as min-cost flows.
+
+    Other problems, including those with two variables in the same pair of rows,
+    are passed to the fallback backend, or raise ValueError without one; the
+    "backend" of a result names the backend that solved it. Flow results are
+    optimal with a MIP gap of 0.
+    """
+
+    name = "flow"
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback
+
+    def solve(self, problem, time_limit=None, threads=None):
+        start = time.perf_counter()
+        network = transportation_network(problem)
+        if network is None:
+            if self.fallback is None:
+                raise ValueError("The flow backend only solves transportation problems.")
+            return self.fallback.solve(problem, time_limit=time_limit, threads=threads)
+        num_capacities = network["capacity_rows"].size
+        num_demands = network["demand_rows"].size
+        num_vars = problem.num_vars
+
+        # Nodes: source, capacity rows, demand rows, sink
+        source, sink = 0, num_capacities + num_demands + 1
+        capacity_nodes = 1 + np.arange(num_capacities)
+        demand_nodes = 1 + num_capacities + np.arange(num_demands)
+        demands = np.rint(problem.rhs[network["demand_rows"]]).astype(np.int64)
+        limits = np.floor(problem.rhs[network["capacity_rows"]] + 1e-9).astype(np.int64)
+        total = int(demands.sum())
+        supply = np.zeros(sink + 1, dtype=np.int64)
+        supply[source], supply[sink] = total, -total
+        tail = np.concatenate([np.full(num_capacities, source), capacity_nodes[network["capacity"]], demand_nodes])
+        head = np.concatenate([capacity_nodes, demand_nodes[network["demand"]], np.full(num_demands, sink)])
+        capacity = np.concatenate([np.minimum(limits, total), network["ub"].astype(np.int64), demands])
+        cost = np.concatenate([np.zeros(num_capacities), network["cost"], np.zeros(num_demands)])
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        status, flow, stats = min_cost_flow(sink + 1, tail, head, capacity, cost, supply, deadline)
+        solve_time = time.perf_counter() - start
+        stats.update(rows=problem.num_constrs, columns=num_vars, nonzeros=int(problem.A.nnz), runtime=solve_time)
+        if status != "optimal":
+            return solve_result(self.name, status, build_time=build_time, solve_time=solve_time, stats=stats)
+        x = flow[num_capacities:num_capacities + num_vars].astype(float)
+        return solve_result(self.name, status, x, float(problem.c @ x), 0.0, build_time, solve_time, stats)
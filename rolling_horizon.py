@@ -0,0 +1,88 @@
+"""Rolling-horizon solving for long staff-scheduling horizons.
+
+Instead of one MIP over all T days, overlapping windows of `window` days are
+solved one after the other. Only the first `step` days of each window are
+committed; the shifts an employee works in committed days are subtracted from
+its max-shift budget in the following windows. This gives up some optimality
+in exchange for solve times that grow roughly linearly with T.
+
+The windows do not see the requirements after them, so on tight instances a
+window can spend budget that later days need and leave a later window
+infeasible. The whole horizon is then solved as one model instead, so an
+infeasible result means that the instance itself is infeasible.
+"""
+import numpy as np
+
+from scheduling_model import StaffSchedulingModel
+from solver_backends import get_backend
+
+# Window statuses that trigger a fallback
+INFEASIBLE_STATUSES = ("infeasible", "inf_or_unbd")
+
+
+def solve_rolling_horizon(costs, availability, requirements, max_shifts, window=14, step=7,
+                          time_limit=None, threads=None, backend=None):
+    """Solve an instance window by window and return a result dict.
+
+    time_limit and threads apply to every window, and backend is a solver
+    backend from solver_backends (default: get_backend()). The result contains
+    the status name, the (E, T, S) assignment and objective when every window was
+    solved, the total build and solve times, and one entry per window. "fallback"
+    is "monolithic" when a window was infeasible and the whole horizon was solved
+    instead (the last window entry), None otherwise.
+    """
+    if step < 1 or window < step:
+        raise ValueError(f"Need 1 <= step <= window, got window={window} and step={step}.")
+    if backend is None:
+        backend = get_backend()
+    costs = np.asarray(costs, dtype=float)
+    availability = np.asarray(availability) != 0
+    requirements = np.asarray(requirements, dtype=float)
+    num_employees, num_days, _ = costs.shape
+    budget = np.broadcast_to(np.asarray(max_shifts, dtype=float), (num_employees,)).copy()
+
+    assignment = np.zeros(costs.shape, dtype=bool)
+    result = {"status": "optimal", "assignment": None, "objective": None, "fallback": None,
+              "build_time": 0.0, "solve_time": 0.0, "windows": []}
+
+    def solve_days(start, end, budget):
+        """Solve days [start, end) with a max-shift budget; returns (scheduler, backend result)."""
+        scheduler = StaffSchedulingModel(
+            costs[:, start:end], availability[:, start:end], requirements[start:end], budget
+        )
+        solved = scheduler.solve_with(backend, time_limit, threads)
+        result["build_time"] += solved["build_time"]
+        result["solve_time"] += solved["solve_time"]
+        result["windows"].append({
+            "start": start, "end": end, "status": solved["status"],
+            "build_time": solved["build_time"], "solve_time": solved["solve_time"],
+        })
+        return scheduler, solved
+
+    for start in range(0, num_days, step):
+        end = min(start + window, num_days)
+        commit_end = end if end == num_days else start + step
+
+        scheduler, solved = solve_days(start, end, budget)
+        if solved["status"] in INFEASIBLE_STATUSES and start > 0:
+            # Earlier windows spent budget that this one needs. Solving the remaining days
+            # at once cannot help, since they include this window: solve the whole horizon.
+            result["fallback"] = "monolithic"
+            start, end, commit_end = 0, num_days, num_days
+            scheduler, solved = solve_days(start, end, max_shifts)
+
+        if solved["x"] is None:
+            result["status"] = solved["status"]
+            return result
+        if solved["status"] != "optimal":
+            result["status"] = "suboptimal"
+
+        committed = scheduler.assignment_from(solved["x"])[:, :commit_end - start]
+        assignment[:, start:commit_end] = committed
+        budget -= committed.sum(axis=(1, 2))
+        if end == num_days:
+            break
+
+    result["assignment"] = assignment
+    result["objective"] = float(costs[assignment].sum())
+    return result
@@ -0,0 +1,274 @@
+"""Headless staff-scheduling model in matrix form.
+
+This module does not depend on PyQt5, so it can be used from scripts and
+benchmarks as well as from the StaffSchedulingApp GUI. The model can be solved
+with any backend of solver_backends; build() and SchedulingSession keep a
+Gurobi model alive for warm starts and in-place edits.
+"""
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from solver_backends import BINARY, GUROBI_STATUS_NAMES, GurobiBackend, LinearProblem
+from telemetry import log_to_callback_only
+
+# Lower-case names of the Gurobi status codes, e.g. {2: "optimal"}
+STATUS_NAMES = GUROBI_STATUS_NAMES
+
+
+class StaffSchedulingModel:
+    """Staff-scheduling MIP over NumPy arrays.
+
+    costs and availability have shape (E, T, S), requirements has shape (T, S)
+    and max_shifts is the maximum number of shifts per employee, either a single
+    number or one value per employee.
+    """
+
+    def __init__(self, costs, availability, requirements, max_shifts):
+        self.costs = np.asarray(costs, dtype=float)
+        self.availability = np.asarray(availability) != 0
+        self.requirements = np.asarray(requirements, dtype=float)
+
+        if self.costs.ndim != 3:
+            raise ValueError(f"costs must have shape (E, T, S), got {self.costs.shape}.")
+        self.num_employees, self.num_days, self.num_shifts = self.costs.shape
+        try:
+            self.max_shifts = np.broadcast_to(np.asarray(max_shifts, dtype=float), (self.num_employees,)).copy()
+        except ValueError:
+            raise ValueError(f"max_shifts must be a number or have shape ({self.num_employees},).")
+        if self.availability.shape != self.costs.shape:
+            raise ValueError(
+                f"availability must have shape {self.costs.shape}, got {self.availability.shape}."
+            )
+        if self.requirements.shape != (self.num_days, self.num_shifts):
+            raise ValueError(
+                f"requirements must have shape {(self.num_days, self.num_shifts)}, "
+                f"got {self.requirements.shape}."
+            )
+
+        self.model = None
+        self.x = None
+        self.cells = None
+        self.requirement_constrs = None
+        self.max_shift_constrs = None
+
+    @classmethod
+    def from_tables(cls, costs, availability, requirements, num_employees, num_days, num_shifts, max_shifts):
+        """Create a model from the (E*T) x S table layout used by the GUI."""
+        shape = (num_employees, num_days, num_shifts)
+        return cls(
+            np.reshape(np.asarray(costs, dtype=float), shape),
+            np.reshape(np.asarray(availability, dtype=float), shape),
+            requirements,
+            max_shifts,
+        )
+
+    def to_problem(self):
+        """Describe the model as a LinearProblem for any solver backend.
+
+        Variables are only created for available (employee, day, shift) cells, so
+        unavailable cells need neither a variable nor a constraint. The rows are
+        the Requirements_{d}_{s} constraints followed by the MaxShifts_{e} ones.
+        """
+        num_employees, num_days, num_shifts = self.costs.shape
+        num_cells = num_days * num_shifts
+
+        # Flat (e, d, s) indices of the available cells, in (e, d, s) order
+        cells = np.flatnonzero(self.availability.ravel())
+        num_vars = cells.size
+        columns = np.arange(num_vars)
+        ones = np.ones(num_vars)
+
+        # Shift requirements: one row per (day, shift)
+        coverage = sp.csr_matrix((ones, (cells % num_cells, columns)), shape=(num_cells, num_vars))
+        # Max shifts per employee: one row per employee
+        workload = sp.csr_matrix((ones, (cells // num_cells, columns)), shape=(num_employees, num_vars))
+
+        self.cells = cells
+        # x[k] = 1 if the employee of available cell k is assigned to its shift and day
+        return LinearProblem(
+            self.costs.ravel()[cells],
+            sp.vstack([coverage, workload], format="csr"),
+            np.repeat(np.array(["=", "<"]), [num_cells, num_employees]),
+            np.concatenate([self.requirements.ravel(), self.max_shifts]),
+            vtypes=BINARY,
+            constr_names=[f"Requirements_{d}_{s}" for d in range(num_days) for s in range(num_shifts)]
+            + [f"MaxShifts_{e}" for e in range(num_employees)],
+        )
+
+    def build(self):
+        """Build the Gurobi model and return it."""
+        num_cells = self.num_days * self.num_shifts
+        model, x, constrs = GurobiBackend().build_model(self.to_problem(), "StaffScheduling")
+        log_to_callback_only(model)
+
+        self.model = model
+        self.x = x
+        self.requirement_constrs = constrs[:num_cells]
+        self.max_shift_constrs = constrs[num_cells:]
+        return model
+
+    def size_report(self):
+        """Compare the model size with the dense formulation that pins unavailable cells.
+
+        The dense formulation has one variable per (employee, day, shift) cell and one
+        Availability constraint per unavailable cell.
+        """
+        num_employees, num_days, num_shifts = self.costs.shape
+        dense_vars = self.costs.size
+        num_vars = int(np.count_nonzero(self.availability))
+        num_constrs = num_days * num_shifts + num_employees
+        dense_constrs = num_constrs + (dense_vars - num_vars)
+        return {
+            "dense_vars": dense_vars,
+            "dense_constrs": dense_constrs,
+            "vars": num_vars,
+            "constrs": num_constrs,
+            "vars_saved": dense_vars - num_vars,
+            "constrs_saved": dense_constrs - num_constrs,
+        }
+
+    def solve(self, callback=None):
+        """Optimize the model, building it first if needed, and return the Gurobi status."""
+        if self.model is None:
+            self.build()
+        if callback is None:
+            self.model.optimize()
+        else:
+            self.model.optimize(callback)
+        return self.model.Status
+
+    def solve_with(self, backend, time_limit=None, threads=None, start=None):
+        """Solve with a solver backend (see solver_backends) and return its result dict.
+
+        start is an optional (E, T, S) assignment used as MIP start by backends
+        that support one; it is restricted to the available cells.
+        """
+        start_time = time.perf_counter()
+        problem = self.to_problem()
+        if start is not None:
+            problem.start = self.start_from(start)
+        problem_time = time.perf_counter() - start_time
+        result = backend.solve(problem, time_limit=time_limit, threads=threads)
+        result["build_time"] += problem_time
+        return result
+
+    def start_from(self, assignment):
+        """MIP start vector over the model variables from an (E, T, S) assignment."""
+        return np.asarray(assignment, dtype=float).ravel()[self.cells]
+
+    def assignment(self):
+        """Return a boolean (E, T, S) array of the assignments in the current solution."""
+        return self.assignment_from(self.x.X)
+
+    def assignment_from(self, x):
+        """Return a boolean (E, T, S) array from a solution vector over the available cells."""
+        assigned = np.zeros(self.costs.size, dtype=bool)
+        assigned[self.cells] = x > 0.5
+        return assigned.reshape(self.costs.shape)
+
+
+class SchedulingSession:
+    """Keeps a scheduling model alive between solves for what-if iterations.
+
+    update() applies edited inputs to the existing Gurobi model as objective
+    coefficient, right-hand side and bound changes, and every solve after the
+    first is warm-started from the previous assignment. Cells that become
+    unavailable keep their variable with an upper bound of 0, so making them
+    available again only restores the bound. The model is only rebuilt when a
+    cell that was unavailable when it was built becomes available, since that
+    cell has no variable yet.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.last_assignment = None
+
+    @property
+    def model(self):
+        return self.scheduler.model
+
+    def update(self, costs, availability, requirements, max_shifts):
+        """Apply new inputs and return a dict counting the edits of each kind."""
+        scheduler = self.scheduler
+        costs = np.asarray(costs, dtype=float)
+        availability = np.asarray(availability) != 0
+        requirements = np.asarray(requirements, dtype=float)
+        if costs.shape != scheduler.costs.shape:
+            raise ValueError(f"costs must keep shape {scheduler.costs.shape}, got {costs.shape}.")
+        try:
+            max_shifts = np.broadcast_to(np.asarray(max_shifts, dtype=float), (scheduler.num_employees,))
+        except ValueError:
+            raise ValueError(f"max_shifts must be a number or have shape ({scheduler.num_employees},).")
+        if availability.shape != costs.shape:
+            raise ValueError(f"availability must have shape {costs.shape}, got {availability.shape}.")
+        if requirements.shape != scheduler.requirements.shape:
+            raise ValueError(
+                f"requirements must have shape {scheduler.requirements.shape}, got {requirements.shape}."
+            )
+
+        changes = {
+            "costs": int(np.count_nonzero(costs != scheduler.costs)),
+            "availability": int(np.count_nonzero(availability != scheduler.availability)),
+            "requirements": int(np.count_nonzero(requirements != scheduler.requirements)),
+            "max_shifts": int(np.count_nonzero(max_shifts != scheduler.max_shifts)),
+            "rebuilt": False,
+        }
+
+        # Cells with a variable: those available when the model was built
+        has_variable = np.zeros(costs.size, dtype=bool)
+        if scheduler.cells is not None:
+            has_variable[scheduler.cells] = True
+        if scheduler.model is None or np.any(availability.ravel() & ~has_variable):
+            # New variables are needed: rebuild, the previous assignment still seeds the solve
+            if scheduler.model is not None:
+                scheduler.model.dispose()
+            self.scheduler = StaffSchedulingModel(costs, availability, requirements, max_shifts)
+            self.scheduler.build()
+            changes["rebuilt"] = True
+            return changes
+
+        cells = scheduler.cells
+        if changes["costs"]:
+            new_obj = costs.ravel()[cells]
+            changed = np.flatnonzero(new_obj != scheduler.costs.ravel()[cells])
+            if changed.size:
+                scheduler.x[changed].Obj = new_obj[changed]
+        if changes["availability"]:
+            # Cells that became unavailable keep their variable with an upper bound of 0
+            scheduler.x.UB = availability.ravel()[cells].astype(float)
+        if changes["requirements"]:
+            changed = np.flatnonzero(requirements.ravel() != scheduler.requirements.ravel())
+            scheduler.requirement_constrs[changed].RHS = requirements.ravel()[changed]
+        if changes["max_shifts"]:
+            changed = np.flatnonzero(max_shifts != scheduler.max_shifts)
+            scheduler.max_shift_constrs[changed].RHS = max_shifts[changed]
+
+        scheduler.costs = costs
+        scheduler.availability = availability
+        scheduler.requirements = requirements
+        scheduler.max_shifts = max_shifts.copy()
+        return changes
+
+    def prepare(self):
+        """Return the model ready to optimize, with the previous assignment as MIP start."""
+        scheduler = self.scheduler
+        if scheduler.model is None:
+            scheduler.build()
+        if self.last_assignment is not None and self.last_assignment.shape == scheduler.costs.shape:
+            start = self.last_assignment & scheduler.availability
+            scheduler.x.Start = start.ravel()[scheduler.cells].astype(float)
+        return scheduler.model
+
+    def solve(self, callback=None):
+        """Optimize the current model warm-started from the last solution and return the status."""
+        self.prepare()
+        status = self.scheduler.solve(callback)
+        self.record_solution()
+        return status
+
+    def record_solution(self):
+        """Remember the current assignment, if any, to seed the next solve."""
+        if self.scheduler.model.SolCount > 0:
+            self.last_assignment = self.scheduler.assignment()
@@ -0,0 +1,241 @@
+"""Content-addressed on-disk cache of staff-scheduling solutions.
+
+Entries are keyed by a SHA-256 hash of the normalized instance (shape, costs,
+availability, requirements, max shifts) and of the solver parameters, so an
+identical instance is answered without building or solving a model. Each entry
+is an .npz file with the bit-packed assignment, the objective, and one digest
+per employee row; the digests let an instance that differs in only a few
+employees find the closest cached solution and use it as a MIP start.
+
+Near matches need the same shape, requirements and solver parameters. Next to
+each entry, a small index file holds its row digests; its name starts with a
+hash of the shape, requirements and parameters, so a lookup only reads the
+index files of candidate entries, never the entries themselves.
+
+The cache directory is kept under a size limit by deleting the least recently
+used entries (hits refresh an entry's modification time).
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Default cache directory, unless the STAFF_SCHEDULING_CACHE environment variable is set
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "staff-scheduling")
+
+# Default size limit of the cache directory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Changes whenever the key or entry layout changes, so that old entries are never matched
+CACHE_VERSION = 1
+
+
+def normalize_instance(costs, availability, requirements, max_shifts):
+    """Return the instance as contiguous arrays with canonical dtypes and shapes."""
+    costs = np.ascontiguousarray(costs, dtype=np.float64)
+    num_employees = costs.shape[0]
+    availability = np.ascontiguousarray(np.asarray(availability) != 0, dtype=np.uint8)
+    requirements = np.ascontiguousarray(requirements, dtype=np.float64)
+    max_shifts = np.ascontiguousarray(
+        np.broadcast_to(np.asarray(max_shifts, dtype=np.float64), (num_employees,))
+    )
+    return costs, availability, requirements, max_shifts
+
+
+def instance_key(costs, availability, requirements, max_shifts, params=None):
+    """Hex SHA-256 key of an instance and the solver parameters that produced its solution."""
+    costs, availability, requirements, max_shifts = normalize_instance(costs, availability, requirements, max_shifts)
+    digest = hashlib.sha256()
+    header = {"version": CACHE_VERSION, "shape": costs.shape, "params": params or {}}
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    for array in (costs, availability, requirements, max_shifts):
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def row_digests(costs, availability, max_shifts):
+    """One 8-byte digest per employee over its costs, availability and max shifts."""
+    costs, availability, _, max_shifts = normalize_instance(costs, availability, np.zeros(0), max_shifts)
+    rows = np.empty(costs.shape[0], dtype=np.uint64)
+    for e in range(costs.shape[0]):
+        digest = hashlib.blake2b(costs[e].data, digest_size=8)
+        digest.update(availability[e].data)
+        digest.update(max_shifts[e:e + 1].data)
+        rows[e] = int.from_bytes(digest.digest(), "little")
+    return rows
+
+
+def group_key(shape, requirements, params=None):
+    """Hex hash of what a near match must share: shape, requirements and solver parameters."""
+    requirements = np.ascontiguousarray(requirements, dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=8)
+    header = {"version": CACHE_VERSION, "shape": [int(n) for n in shape], "params": params or {}}
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    digest.update(requirements.data)
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """Size-bounded LRU cache of solutions in a directory of .npz files."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("STAFF_SCHEDULING_CACHE") or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def index_path(self, group, key):
+        return os.path.join(self.directory, f"{group}.{key}.rows")
+
+    def get(self, key):
+        """Return the cached entry for a key as a dict, or None on a miss.
+
+        The entry has the boolean (E, T, S) assignment, the objective and status,
+        and the solver parameters it was solved with.
+        """
+        path = self.path(key)
+        try:
+            entry = self.read(path)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            # Missing, unreadable, or evicted by another process since it was read
+            return None
+        return entry
+
+    def put(self, key, assignment, objective, status, rows, requirements, params=None):
+        """Store a solution under a key; rows are the instance's row_digests."""
+        assignment = np.asarray(assignment, dtype=bool)
+        rows = np.asarray(rows, dtype=np.uint64)
+        self.write(self.path(key), lambda f: np.savez(
+            f,
+            shape=np.array(assignment.shape),
+            assignment=np.packbits(assignment.ravel()),
+            objective=np.float64(objective),
+            status=np.array(status),
+            params=np.array(json.dumps(params or {}, sort_keys=True)),
+            rows=rows,
+        ))
+        # Written after the entry, so that an index file never names an entry that was not stored
+        group = group_key(assignment.shape, requirements, params)
+        self.write(self.index_path(group, key), lambda f: f.write(rows.tobytes()))
+        self.evict()
+
+    def write(self, path, write):
+        """Write a file through a temporary file, so that concurrent readers never see a partial one."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def nearest(self, rows, requirements, params=None, max_rows=None):
+        """Closest cached solution for an instance that is not in the cache.
+
+        Entries of the same shape, requirements and solver parameters are
+        compared by the number of employees whose row digests differ. Returns
+        (entry, differing employees) for the closest entry, or None if no entry
+        differs in at most max_rows employees (default: a tenth of the
+        employees, at least one).
+        """
+        rows = np.asarray(rows, dtype=np.uint64)
+        if max_rows is None:
+            max_rows = max(1, len(rows) // 10)
+        prefix = group_key((len(rows), *np.shape(requirements)), requirements, params) + "."
+        best_path, best_distance = None, max_rows + 1
+        for name in os.listdir(self.directory):
+            if not (name.startswith(prefix) and name.endswith(".rows")):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    cached_rows = np.frombuffer(f.read(), dtype=np.uint64)
+            except OSError:
+                continue
+            if cached_rows.shape != rows.shape:
+                continue
+            distance = int(np.count_nonzero(cached_rows != rows))
+            if distance < best_distance:
+                best_path, best_distance = self.path(name[len(prefix):-len(".rows")]), distance
+        if best_path is None:
+            return None
+        try:
+            best = self.read(best_path)
+            os.utime(best_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return best, best_distance
+
+    @staticmethod
+    def read(path):
+        with np.load(path) as data:
+            shape = tuple(data["shape"])
+            assignment = np.unpackbits(data["assignment"], count=int(np.prod(shape))).astype(bool)
+            return {
+                "assignment": assignment.reshape(shape),
+                "objective": float(data["objective"]),
+                "status": str(data["status"]),
+                "params": json.loads(str(data["params"])),
+            }
+
+    def entries(self):
+        """(path, size, modification time) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def index_files(self):
+        """Index file paths by the key of their entry."""
+        index = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(".rows"):
+                key = name[:-len(".rows")].partition(".")[2]
+                index.setdefault(key, []).append(os.path.join(self.directory, name))
+        return index
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        Also deletes index files whose entry is gone, e.g. after an eviction by another process.
+        """
+        # Listed first: an index file is written after its entry, so its entry is listed as well
+        index = self.index_files()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        kept = set()
+        for path, size, _ in entries:
+            key = os.path.basename(path)[:-len(".npz")]
+            if total <= self.max_bytes:
+                kept.add(key)
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+        for key, paths in index.items():
+            if key not in kept:
+                for path in paths:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.unlink(path)
+        for paths in self.index_files().values():
+            for path in paths:
+                os.unlink(path)
@@ -0,0 +1,369 @@
+"""Local HTTP/JSON solve service for the staff-scheduling and advertising models.
+
+Usage:
+    python solve_service.py [--host 127.0.0.1] [--port 8765] [--workers N] [--queue-size 32]
+                            [--max-time-limit 60] [--backend gurobi|highs]
+
+Endpoints (request and response bodies are JSON):
+    POST /scheduling   {"costs", "availability", "requirements", "max_shifts"
+                        [, "time_limit", "aggregate", "flow"]}
+                       -> status, objective, mip_gap, backend, assignments (1-based employee, day, shift)
+    POST /advertising  {"costs", "reaches", "conv_rates", "min_ads", "max_ads", "budget", "desired_reach"
+                        [, "time_limit"]}
+                       -> status, objective, allocation
+    GET  /status       -> workers, queued and running requests, request counts
+
+Arrays are nested lists in the shapes the applications use, e.g. costs and
+availability of shape (E, T, S). A scheduling instance can instead be sent as
+a binary instance (see instance_io.write_binary_instance) with Content-Type
+application/octet-stream and the options in the query string, e.g.
+POST /scheduling?time_limit=10&aggregate=true, which avoids encoding large
+instances as JSON. Solves run in a pool of worker processes.
+Each worker creates one gurobipy.Env when it starts and builds all its models
+on it, so environment and licence setup are paid once per worker instead of
+once per solve. At most queue_size requests wait for a worker; further
+requests are answered with 503 until the queue drains. Time limits are capped
+at max_time_limit, which is also the default. Scheduling requests are solved
+as min-cost flows (see min_cost_flow) unless "flow" is false.
+
+Every response carries queue_time (seconds waiting for a worker) and
+service_time (seconds in the worker).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from advertising_model import AdvertisingModel
+from aggregation import AggregatedSchedulingModel
+from feasibility import precheck
+from instance_io import instance_from_dict, read_binary_instance
+from min_cost_flow import FlowBackend
+from scheduling_model import StaffSchedulingModel
+from solver_backends import BACKENDS, GurobiBackend, default_backend_name, get_backend, thread_budget
+
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_TIME_LIMIT = 60.0
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+# Content type of scheduling requests sent as binary instances
+BINARY_CONTENT_TYPE = "application/octet-stream"
+
+ADVERTISING_KEYS = ("costs", "reaches", "conv_rates", "min_ads", "max_ads", "budget", "desired_reach")
+
+# Backend of the current worker process and its min-cost-flow front, set by init_worker
+_backend = _flow_backend = None
+
+
+def init_worker(backend_name):
+    """Create the long-lived solver backend of a worker process."""
+    global _backend, _flow_backend
+    if backend_name == GurobiBackend.name:
+        from gurobipy import Env
+
+        env = Env(empty=True)
+        env.setParam("OutputFlag", 0)
+        env.start()
+        _backend = GurobiBackend(env=env)
+    else:
+        _backend = get_backend(backend_name)
+    _flow_backend = FlowBackend(_backend)
+
+
+def solve_scheduling(request, time_limit, threads):
+    """Solve a staff-scheduling request in a worker; returns the response dict."""
+    start = time.perf_counter()
+    instance = instance_from_dict(request, "Request")
+    response = {"status": "infeasible", "objective": None, "mip_gap": None, "backend": _backend.name}
+    problems = precheck(instance["availability"], instance["requirements"], instance["max_shifts"])
+    if problems:
+        response["diagnosis"] = problems
+    else:
+        model_class = AggregatedSchedulingModel if request.get("aggregate") else StaffSchedulingModel
+        scheduler = model_class(**instance)
+        backend = _flow_backend if request.get("flow", True) else _backend
+        result = scheduler.solve_with(backend, time_limit, threads)
+        response.update(
+            status=result["status"], objective=result["objective"], mip_gap=result["mip_gap"], backend=result["backend"]
+        )
+        if result["x"] is not None:
+            rows = np.argwhere(scheduler.assignment_from(result["x"])) + 1
+            response["assignments"] = [
+                {"employee": e, "day": d, "shift": s} for e, d, s in rows.tolist()
+            ]
+    response["service_time"] = time.perf_counter() - start
+    return response
+
+
+def solve_advertising(request, time_limit, threads):
+    """Solve an advertising request in a worker; returns the response dict.
+
+    The fast allocation solver is tried first, as in the application.
+    """
+    start = time.perf_counter()
+    missing = [key for key in ADVERTISING_KEYS if key not in request]
+    if missing:
+        raise ValueError(f"Request is missing: {', '.join(missing)}.")
+    allocation = AdvertisingModel(*(request[key] for key in ADVERTISING_KEYS[:5]))
+    if len({len(getattr(allocation, key)) for key in ADVERTISING_KEYS[:5]}) != 1:
+        raise ValueError("The channel arrays must all have the same length.")
+    budget, desired_reach = float(request["budget"]), float(request["desired_reach"])
+    result = allocation.solve_fast(budget, desired_reach)
+    if result is None:
+        result = allocation.result_from(
+            _backend.solve(allocation.to_problem(budget, desired_reach), time_limit=time_limit, threads=threads)
+        )
+    return {
+        "status": result["status"],
+        "objective": result["objective"],
+        "allocation": None if result["allocation"] is None else np.asarray(result["allocation"]).tolist(),
+        "method": result["method"],
+        "service_time": time.perf_counter() - start,
+    }
+
+
+SOLVERS = {"/scheduling": solve_scheduling, "/advertising": solve_advertising}
+
+
+class SolveService:
+    """Asyncio HTTP server dispatching solve requests to a pool of worker processes.
+
+    One dispatcher task per worker takes requests from the queue, so a worker
+    never has more than one solve at a time. A request is rejected when
+    workers + queue_size requests are already running or waiting.
+    """
+
+    def __init__(self, backend=None, workers=1, queue_size=DEFAULT_QUEUE_SIZE,
+                 max_time_limit=DEFAULT_MAX_TIME_LIMIT, threads=None):
+        self.backend_name = (backend or default_backend_name()).lower()
+        if self.backend_name not in BACKENDS:
+            raise ValueError(f"Unknown solver backend '{self.backend_name}'. Choose one of: {', '.join(BACKENDS)}.")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_time_limit = max_time_limit
+        self.threads = thread_budget(workers, threads)
+        self.counts = {"received": 0, "solved": 0, "rejected": 0, "failed": 0}
+        self.running = self.pending = 0
+        self.executor = self.queue = self.server = None
+        self.dispatchers = []
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start the worker pool and listen; port 0 picks a free port (see self.port)."""
+        # Spawned workers do not inherit the event loop or a half-initialized Gurobi state
+        self.executor = ProcessPoolExecutor(
+            self.workers, multiprocessing.get_context("spawn"), init_worker, (self.backend_name,)
+        )
+        self.queue = asyncio.Queue()
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.executor.shutdown(cancel_futures=True)
+
+    def status(self):
+        return {
+            "backend": self.backend_name,
+            "workers": self.workers,
+            "threads_per_worker": self.threads,
+            "queue_size": self.queue_size,
+            "queued": self.pending - self.running,
+            "running": self.running,
+            **self.counts,
+        }
+
+    async def dispatch(self):
+        """Run queued requests on the worker pool, one at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            solver, request, time_limit, future, queued = await self.queue.get()
+            self.running += 1
+            try:
+                response = await loop.run_in_executor(self.executor, solver, request, time_limit, self.threads)
+                response["queue_time"] = time.perf_counter() - queued - response["service_time"]
+                if not future.done():
+                    future.set_result(response)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.running -= 1
+                self.queue.task_done()
+
+    async def submit(self, path, request):
+        """Queue a solve and wait for it; returns (HTTP status, response dict)."""
+        self.counts["received"] += 1
+        if not isinstance(request, dict):
+            return HTTPStatus.BAD_REQUEST, {"error": "The request body must be a JSON object."}
+        try:
+            time_limit = min(float(request.get("time_limit", self.max_time_limit)), self.max_time_limit)
+        except (TypeError, ValueError):
+            return HTTPStatus.BAD_REQUEST, {"error": "time_limit must be a number of seconds."}
+
+        if self.pending >= self.workers + self.queue_size:
+            self.counts["rejected"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"The queue is full ({self.queue_size} requests)."}
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((SOLVERS[path], request, time_limit, future, time.perf_counter()))
+        self.pending += 1
+        try:
+            response = await future
+        except ValueError as e:
+            self.counts["failed"] += 1
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            self.counts["failed"] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.pending -= 1
+        self.counts["solved"] += 1
+        return HTTPStatus.OK, response
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large."})
+                    break
+                body = await reader.readexactly(length)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, response = await self.route(method, path, body, headers.get("content-type", ""))
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body, content_type=""):
+        url = urlsplit(path)
+        path = url.path
+        if method == "GET" and path == "/status":
+            return HTTPStatus.OK, self.status()
+        if path not in SOLVERS:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {path}."}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Use POST for {path}."}
+        if content_type.split(";")[0].strip().lower() == BINARY_CONTENT_TYPE:
+            if path != "/scheduling":
+                return HTTPStatus.BAD_REQUEST, {"error": "Binary requests are only accepted by /scheduling."}
+            try:
+                request = {**self.query_options(url.query), **read_binary_instance(body)}
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid binary instance: {e}"}
+            return await self.submit(path, request)
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"}
+        return await self.submit(path, request)
+
+    @staticmethod
+    def query_options(query):
+        """Options of a binary request from its query string; values are parsed as JSON where possible."""
+        options = {}
+        for name, value in parse_qsl(query):
+            try:
+                options[name] = json.loads(value)
+            except ValueError:
+                options[name] = value
+        return options
+
+    @staticmethod
+    async def respond(writer, status, response, keep_alive=False):
+        body = json.dumps(response).encode()
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+
+async def request_json(host, port, method, path, payload=None):
+    """Send one request to a solve service on a new connection; returns (HTTP status code, response dict).
+
+    A bytes payload (a binary instance) is sent as is, any other payload as JSON.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        binary = isinstance(payload, bytes)
+        body = payload if binary else b"" if payload is None else json.dumps(payload).encode()
+        content_type = BINARY_CONTENT_TYPE if binary else "application/json"
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        while (await reader.readline()).strip():
+            pass
+        return int(status_line.split()[1]), json.loads(await reader.read())
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    service = SolveService(args.backend, args.workers, args.queue_size, args.max_time_limit, args.threads_per_worker)
+    await service.start(args.host, args.port)
+    print(f"Serving on http://{args.host}:{service.port} with {service.workers} {service.backend_name} workers "
+          f"x {service.threads} threads.")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own environment.")
+    parser.add_argument(
+        "--threads-per-worker", type=int, default=None,
+        help="Solver threads per worker (default: cores divided among the workers).",
+    )
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Requests waiting for a worker.")
+    parser.add_argument(
+        "--max-time-limit", type=float, default=DEFAULT_MAX_TIME_LIMIT, help="Largest time limit per solve, in seconds."
+    )
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Background solving for the GUI applications.
+
+Models are built and optimized on a QThread so the window stays responsive.
+Progress of MIP solves is streamed back through Qt signals and a solve can be
+cancelled at any time, keeping the best solution found so far.
+"""
+import time
+from contextlib import nullcontext
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# Value of GRB.INFINITY, repeated here so that gurobipy is only imported by solves
+GRB_INFINITY = 1e100
+
+
+class SolveWorker(QThread):
+    """Build and optimize a Gurobi model on a worker thread.
+
+    build_fn() is called on the worker thread and must return the model to
+    optimize. result_fn(model) is also called on the worker thread once the solve
+    ends, and its return value is emitted through the solved signal. With a
+    telemetry object (see telemetry.Telemetry) the three steps are timed as the
+    build, solve and collect phases and the Gurobi log is captured. callback is
+    an optional Gurobi callback run before the worker's own, such as the lazy
+    constraints of work_rules.RuleSchedulingModel.
+    """
+
+    progress = pyqtSignal(float, float, float)  # incumbent objective, best bound, MIP gap
+    solved = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # Minimum number of seconds between two progress signals
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, build_fn, result_fn=None, telemetry=None, parent=None, callback=None):
+        super().__init__(parent)
+        self.build_fn = build_fn
+        self.result_fn = result_fn
+        self.telemetry = telemetry
+        self.extra_callback = callback
+        self.model = None
+        self.cancelled = False
+        self.last_progress = 0.0
+
+    def run(self):
+        try:
+            with self.phase("build"):
+                self.model = self.build_fn()
+            with self.phase("solve"):
+                self.model.optimize(self.callback)
+            with self.phase("collect"):
+                result = self.result_fn(self.model) if self.result_fn else self.model
+            self.solved.emit(result)
+        except Exception as e:
+            if type(e).__name__ == "GurobiError":
+                self.failed.emit(f"Gurobi error: {e.message}")
+            else:
+                self.failed.emit(str(e))
+
+    def phase(self, name):
+        return self.telemetry.phase(name) if self.telemetry is not None else nullcontext()
+
+    def cancel(self):
+        """Request the solve to stop; safe to call from the GUI thread."""
+        self.cancelled = True
+        if self.model is not None:
+            self.model.terminate()
+
+    def callback(self, model, where):
+        from gurobipy import GRB
+
+        if self.extra_callback is not None:
+            self.extra_callback(model, where)
+        if where == GRB.Callback.MESSAGE:
+            if self.telemetry is not None:
+                self.telemetry.add_log(model.cbGet(GRB.Callback.MSG_STRING))
+            return
+        if self.cancelled:
+            model.terminate()
+            return
+
+        if where == GRB.Callback.MIPSOL:
+            # Always report a new incumbent
+            self.emit_progress(model.cbGet(GRB.Callback.MIPSOL_OBJBST), model.cbGet(GRB.Callback.MIPSOL_OBJBND))
+        elif where == GRB.Callback.MIP:
+            now = time.monotonic()
+            if now - self.last_progress >= self.PROGRESS_INTERVAL:
+                self.emit_progress(model.cbGet(GRB.Callback.MIP_OBJBST), model.cbGet(GRB.Callback.MIP_OBJBND))
+
+    def emit_progress(self, incumbent, bound):
+        self.last_progress = time.monotonic()
+        self.progress.emit(incumbent, bound, mip_gap(incumbent, bound))
+
+
+def mip_gap(incumbent, bound):
+    """Relative MIP gap as computed by Gurobi, or inf when there is no incumbent."""
+    if abs(incumbent) >= GRB_INFINITY:
+        return float("inf")
+    if incumbent == bound:
+        return 0.0
+    if incumbent == 0:
+        return float("inf")
+    return abs(incumbent - bound) / abs(incumbent)
+
+
+def format_progress(incumbent, bound, gap):
+    """Human-readable progress line for the GUI."""
+    incumbent_text = "-" if abs(incumbent) >= GRB_INFINITY else f"{incumbent:.2f}"
+    bound_text = "-" if abs(bound) >= GRB_INFINITY else f"{bound:.2f}"
+    gap_text = "-" if gap == float("inf") else f"{gap * 100:.2f}%"
+    return f"Incumbent: {incumbent_text}    Best bound: {bound_text}    Gap: {gap_text}"
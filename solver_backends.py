@@ -0,0 +1,319 @@
+"""Solver backends for linear and mixed-integer problems in matrix form.
+
+Both applications describe their models as a LinearProblem (objective vector,
+sparse constraint matrix, bounds and variable types) and hand it to a backend:
+
+    backend = get_backend("highs")
+    result = backend.solve(problem, time_limit=60)
+
+GurobiBackend builds the problem with gurobipy's matrix API. HighsBackend uses
+HiGHS through scipy.optimize.milp (or linprog for pure LPs), which needs no
+licence. Every backend returns the same result dict: a lower-case Gurobi status
+name ("optimal", "infeasible", "time_limit", ...), the solution vector and
+objective (None without a solution), the relative MIP gap when known, the
+backend name, the build and solve times, model and solver statistics (see
+telemetry) and the captured solver log.
+
+The default backend is taken from the SOLVER_BACKEND environment variable and
+falls back to Gurobi when gurobipy can be imported, HiGHS otherwise.
+"""
+import importlib.util
+import os
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from telemetry import gurobi_stats, log_to_callback_only, problem_stats
+
+# gurobipy and scipy.optimize are only imported once a backend solves, since
+# both take a noticeable part of application startup.
+
+# Lower-case names of the Gurobi status codes (GRB.Status), which all backends use as status names
+GUROBI_STATUS_NAMES = {
+    1: "loaded", 2: "optimal", 3: "infeasible", 4: "inf_or_unbd", 5: "unbounded", 6: "cutoff",
+    7: "iteration_limit", 8: "node_limit", 9: "time_limit", 10: "solution_limit", 11: "interrupted",
+    12: "numeric", 13: "suboptimal", 14: "inprogress", 15: "user_obj_limit", 16: "work_limit",
+    17: "mem_limit",
+}
+
+# Statuses of scipy.optimize.milp and linprog
+MILP_STATUS = {0: "optimal", 1: "time_limit", 2: "infeasible", 3: "unbounded", 4: "error"}
+LINPROG_STATUS = {0: "optimal", 1: "iteration_limit", 2: "infeasible", 3: "unbounded", 4: "numeric"}
+
+# Absolute row violation accepted when checking a problem without variables
+FEASIBILITY_TOL = 1e-9
+
+# Variable types, using Gurobi's type characters
+CONTINUOUS, BINARY, INTEGER = "C", "B", "I"
+
+
+class LinearProblem:
+    """Minimize (or maximize) c @ x s.t. A @ x (senses) rhs and lb <= x <= ub.
+
+    senses holds one of '<', '=' or '>' per row of the sparse matrix A and vtypes
+    one of 'C', 'B' or 'I' per variable. Names and the start vector (a MIP start,
+    NaN for variables without a start value) are optional and only used by
+    backends that support them (Gurobi).
+    """
+
+    def __init__(self, c, A, senses, rhs, lb=None, ub=None, vtypes=CONTINUOUS, maximize=False,
+                 var_names=None, constr_names=None, start=None):
+        self.c = np.asarray(c, dtype=float)
+        num_vars = self.c.size
+        self.A = sp.csr_matrix(A)
+        # Broadcast scalars to writable arrays (gurobipy does not accept read-only buffers)
+        self.senses = np.array(np.broadcast_to(np.asarray(senses), (self.A.shape[0],)))
+        self.rhs = np.array(np.broadcast_to(np.asarray(rhs, dtype=float), (self.A.shape[0],)))
+        self.lb = np.array(np.broadcast_to(np.asarray(0.0 if lb is None else lb, dtype=float), (num_vars,)))
+        self.ub = np.array(np.broadcast_to(np.asarray(np.inf if ub is None else ub, dtype=float), (num_vars,)))
+        self.vtypes = np.array(np.broadcast_to(np.asarray(vtypes), (num_vars,)))
+        self.maximize = maximize
+        self.var_names = var_names
+        self.constr_names = constr_names
+        self.start = None if start is None else np.asarray(start, dtype=float)
+        if self.A.shape[1] != num_vars:
+            raise ValueError(f"A must have {num_vars} columns, got {self.A.shape[1]}.")
+
+    @property
+    def num_vars(self):
+        return self.c.size
+
+    @property
+    def num_constrs(self):
+        return self.A.shape[0]
+
+    def is_mip(self):
+        return bool(np.any(self.vtypes != CONTINUOUS))
+
+    def row_bounds(self):
+        """Lower and upper row activity bounds, as used by SciPy."""
+        lower = np.where(self.senses == "<", -np.inf, self.rhs)
+        upper = np.where(self.senses == ">", np.inf, self.rhs)
+        return lower, upper
+
+    def var_bounds(self):
+        """Variable bounds, with binary variables clamped to [0, 1]."""
+        binary = self.vtypes == BINARY
+        lb = np.where(binary, np.maximum(self.lb, 0.0), self.lb)
+        ub = np.where(binary, np.minimum(self.ub, 1.0), self.ub)
+        return lb, ub
+
+
+def solve_result(backend, status, x=None, objective=None, mip_gap=None, build_time=0.0, solve_time=0.0,
+                 stats=None, log=""):
+    """Result dict returned by every backend."""
+    return {
+        "status": status,
+        "x": x,
+        "objective": objective,
+        "mip_gap": mip_gap,
+        "backend": backend,
+        "build_time": build_time,
+        "solve_time": solve_time,
+        "stats": stats or {},
+        "log": log,
+    }
+
+
+class GurobiBackend:
+    """Solve with Gurobi, optionally on a given gurobipy.Env."""
+
+    name = "gurobi"
+
+    def __init__(self, env=None):
+        if not gurobi_installed():
+            raise RuntimeError("The Gurobi backend needs the gurobipy package.")
+        self.env = env
+
+    def build_model(self, problem, name="model"):
+        """Build a Gurobi model and return (model, x MVar, MConstr of all rows)."""
+        from gurobipy import GRB, Model
+
+        model = Model(name, env=self.env)
+        x = model.addMVar(problem.num_vars, lb=problem.lb, ub=problem.ub, vtype=problem.vtypes)
+        model.setObjective(problem.c @ x, GRB.MAXIMIZE if problem.maximize else GRB.MINIMIZE)
+        constrs = model.addMConstr(problem.A, x, problem.senses, problem.rhs)
+        model.update()
+        if problem.var_names is not None:
+            model.setAttr("VarName", x.tolist(), list(problem.var_names))
+        if problem.constr_names is not None:
+            model.setAttr("ConstrName", constrs.tolist(), list(problem.constr_names))
+        if problem.start is not None:
+            x.Start = np.where(np.isnan(problem.start), GRB.UNDEFINED, problem.start)
+        return model, x, constrs
+
+    @staticmethod
+    def result(model, x, build_time=0.0, log=""):
+        """Result dict for a solved Gurobi model; log is the solver log captured during the solve."""
+        status = GUROBI_STATUS_NAMES.get(model.Status, str(model.Status))
+        stats = gurobi_stats(model, log)
+        if model.SolCount == 0:
+            return solve_result(
+                GurobiBackend.name, status, build_time=build_time, solve_time=model.Runtime, stats=stats, log=log
+            )
+        return solve_result(
+            GurobiBackend.name, status, x.X, model.ObjVal, model.MIPGap if model.IsMIP else 0.0,
+            build_time, model.Runtime, stats, log,
+        )
+
+    def solve(self, problem, time_limit=None, threads=None):
+        from gurobipy import GRB
+
+        start = time.perf_counter()
+        model, x, _ = self.build_model(problem)
+        build_time = time.perf_counter() - start
+        log_to_callback_only(model)
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        if threads is not None:
+            model.Params.Threads = threads
+        log = []
+
+        def capture_log(model, where):
+            if where == GRB.Callback.MESSAGE:
+                log.append(model.cbGet(GRB.Callback.MSG_STRING))
+
+        model.optimize(capture_log)
+        result = self.result(model, x, build_time, "".join(log))
+        model.dispose()
+        return result
+
+
+class HighsBackend:
+    """Solve with HiGHS through scipy.optimize.milp, or linprog for problems without integer variables.
+
+    SciPy does not expose a thread count for HiGHS, so threads is ignored.
+    """
+
+    name = "highs"
+
+    def solve(self, problem, time_limit=None, threads=None):
+        from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+        if problem.num_vars == 0:
+            return self.solve_empty(problem)
+        start = time.perf_counter()
+        sign = -1.0 if problem.maximize else 1.0
+        lb, ub = problem.var_bounds()
+        options = {"disp": False}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+
+        if problem.is_mip():
+            lower, upper = problem.row_bounds()
+            constraints = LinearConstraint(problem.A, lower, upper) if problem.num_constrs else None
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            res = milp(
+                sign * problem.c, integrality=(problem.vtypes != CONTINUOUS).astype(np.uint8),
+                bounds=Bounds(lb, ub), constraints=constraints, options=options,
+            )
+            solve_time = time.perf_counter() - start
+            status = MILP_STATUS.get(res.status, "error")
+            mip_gap = getattr(res, "mip_gap", None)
+            counts = {"node_count": getattr(res, "mip_node_count", None)}
+        else:
+            A_ub, b_ub, A_eq, b_eq = self.split_rows(problem)
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            res = linprog(
+                sign * problem.c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                bounds=np.column_stack((lb, ub)), method="highs", options=options,
+            )
+            solve_time = time.perf_counter() - start
+            status = LINPROG_STATUS.get(res.status, "error")
+            mip_gap = 0.0
+            counts = {"iter_count": getattr(res, "nit", None)}
+
+        # SciPy reports neither the presolved size nor the log of HiGHS
+        stats = dict(problem_stats(problem), runtime=solve_time)
+        stats.update((name, count) for name, count in counts.items() if count is not None)
+        if mip_gap is not None:
+            stats["mip_gap"] = mip_gap
+        if res.x is None:
+            return solve_result(self.name, status, build_time=build_time, solve_time=solve_time, stats=stats)
+        return solve_result(self.name, status, res.x, sign * res.fun, mip_gap, build_time, solve_time, stats)
+
+    @classmethod
+    def solve_empty(cls, problem):
+        """Result for a problem without variables, which SciPy rejects: every row activity is zero."""
+        lower, upper = problem.row_bounds()
+        if np.all((lower <= FEASIBILITY_TOL) & (upper >= -FEASIBILITY_TOL)):
+            return solve_result(cls.name, "optimal", np.zeros(0), 0.0, 0.0, stats=problem_stats(problem))
+        return solve_result(cls.name, "infeasible", stats=problem_stats(problem))
+
+    @staticmethod
+    def split_rows(problem):
+        """Convert the rows into linprog's A_ub @ x <= b_ub and A_eq @ x == b_eq form."""
+        equal = problem.senses == "="
+        greater = problem.senses == ">"
+        flip = sp.diags(np.where(greater, -1.0, 1.0))
+        A = (flip @ problem.A).tocsr()
+        rhs = np.where(greater, -problem.rhs, problem.rhs)
+        if equal.all():
+            return None, None, A, rhs
+        if not equal.any():
+            return A, rhs, None, None
+        return A[~equal], rhs[~equal], A[equal], rhs[equal]
+
+
+# Backend classes by name
+BACKENDS = {GurobiBackend.name: GurobiBackend, HighsBackend.name: HighsBackend}
+
+
+def gurobi_installed():
+    """True if gurobipy can be imported (checked without importing it)."""
+    return importlib.util.find_spec("gurobipy") is not None
+
+
+def available_backends():
+    """Names of the backends whose packages are installed."""
+    return [name for name in BACKENDS if name != GurobiBackend.name or gurobi_installed()]
+
+
+def default_backend_name():
+    """The SOLVER_BACKEND environment variable, else Gurobi if installed, else HiGHS."""
+    name = os.environ.get("SOLVER_BACKEND")
+    if name:
+        return name.lower()
+    return GurobiBackend.name if gurobi_installed() else HighsBackend.name
+
+
+def get_backend(name=None):
+    """Return a backend instance by name (default: default_backend_name())."""
+    name = (name or default_backend_name()).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown solver backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
+    return BACKENDS[name]()
+
+
+def thread_budget(num_workers, threads=None):
+    """Solver threads per worker so that all workers together use each core once."""
+    if threads:
+        return threads
+    return max(1, (os.cpu_count() or 1) // num_workers)
+
+
+class BackendSolve:
+    """Runs backend.solve(problem) behind the optimize()/terminate() interface of SolveWorker.
+
+    The result dict is stored in self.result. A running HiGHS solve cannot be
+    interrupted through SciPy, so terminate() only has an effect before it starts.
+    """
+
+    def __init__(self, backend, problem, **options):
+        self.backend = backend
+        self.problem = problem
+        self.options = options
+        self.result = None
+        self.terminated = False
+
+    def optimize(self, callback=None):
+        if self.terminated:
+            self.result = solve_result(self.backend.name, "interrupted")
+            return
+        self.result = self.backend.solve(self.problem, **self.options)
+
+    def terminate(self):
+        self.terminated = True
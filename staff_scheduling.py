@@ -1,323 +1,854 @@
-import sys
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QLineEdit, QTableWidget,
-    QTableWidgetItem, QPushButton, QGridLayout, QMessageBox
-)
-from PyQt5.QtCore import Qt
-from gurobipy import Model, GRB, quicksum
-
-
-class StaffSchedulingApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Staff Scheduling Optimization")
-        self.setGeometry(200, 200, 1000, 850)
-
-        layout = QVBoxLayout()
-
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f7f7f7;
-            }
-            QLabel {
-                font-size: 18px;
-                font-weight: bold;
-                color: #34495e;
-            }
-            QLineEdit {
-                border: 1px solid #34495e;
-                border-radius: 5px;
-                padding: 5px;
-                font-size: 14px;
-                background-color: #ffffff;
-                color: #34495e;
-            }
-            QTableWidget {
-                border: 1px solid #34495e;
-                font-size: 14px;
-                background-color: #ffffff;
-                color: #34495e;
-            }
-            QPushButton {
-                background-color: #3498db;
-                border: none;
-                border-radius: 10px;
-                color: white;
-                font-size: 16px;
-                padding: 10px;
-}
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-
-        """)
-
-        self.container = QWidget()
-        self.container.setLayout(layout)
-        self.setCentralWidget(self.container)
-
-        # Title
-        title = QLabel("Staff Scheduling Optimization")
-        title.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title)
-
-        # Input Grid
-        self.input_grid = QGridLayout()
-        layout.addLayout(self.input_grid)
-
-        self.add_input_field(
-            "Number of Employees (E):",
-            "Total number of employees available for scheduling.",
-            0,
-            "employees_input",
-        )
-        self.add_input_field(
-            "Number of Shifts per Day (S):",
-            "Number of shifts required per day (e.g., Morning, Evening, Night).",
-            1,
-            "shifts_input",
-        )
-        self.add_input_field(
-            "Number of Days (T):",
-            "Total number of days to schedule (e.g., 7 for one week).",
-            2,
-            "days_input",
-        )
-        self.add_table(
-            "Cost per shift (matrix for all employees and days):",
-            "Enter the cost for each employee working each shift on each day.",
-            3,
-            "costs_table",
-        )
-        self.add_table(
-            "Availability (1 for available, 0 for not):",
-            "Enter 1 if the employee is available for the shift, 0 otherwise.",
-            4,
-            "availability_table",
-        )
-        self.add_table(
-            "Required employees per shift per day:",
-            "Enter the number of employees required for each shift on each day.",
-            5,
-            "requirements_table",
-        )
-        self.add_input_field(
-            "Max Shifts per Employee (M):",
-            "Maximum number of shifts an employee can work during the scheduling period.",
-            6,
-            "max_shifts_input",
-        )
-
-        # Run Button
-        self.run_button = QPushButton("Solve")
-        self.run_button.setCursor(Qt.PointingHandCursor)
-        self.run_button.clicked.connect(self.run_optimization)
-        layout.addWidget(self.run_button)
-
-        # Results
-        self.output_label = QLabel("Results:")
-        layout.addWidget(self.output_label)
-
-        self.output_area = QTableWidget()
-        self.output_area.setRowCount(0)
-        self.output_area.setColumnCount(3)
-        self.output_area.setHorizontalHeaderLabels(["Employee", "Day", "Shift"])
-        layout.addWidget(self.output_area)
-
-    def add_input_field(self, label_text, tooltip, row, attribute_name):
-        """Add a single-line input field with a tooltip."""
-        label = QLabel(label_text)
-        label.setToolTip(tooltip)
-        self.input_grid.addWidget(label, row, 0)
-        field = QLineEdit()
-        field.setToolTip(tooltip)
-        field.textChanged.connect(self.update_matrices)  # Trigger dynamic matrix resizing
-        setattr(self, attribute_name, field)
-        self.input_grid.addWidget(field, row, 1)
-
-    def add_table(self, label_text, tooltip, row, attribute_name):
-        """Add a table input for matrix data with a tooltip."""
-        label = QLabel(label_text)
-        label.setToolTip(tooltip)
-        self.input_grid.addWidget(label, row, 0)
-        table = QTableWidget(0, 0)
-        table.setToolTip(tooltip)
-        setattr(self, attribute_name, table)
-        self.input_grid.addWidget(table, row, 1)
-
-    def update_matrices(self):
-        """Resize matrices dynamically based on employee, shift, and day input."""
-        try:
-            num_employees = int(self.employees_input.text()) if self.employees_input.text().isdigit() else 0
-            num_shifts = int(self.shifts_input.text()) if self.shifts_input.text().isdigit() else 0
-            num_days = int(self.days_input.text()) if self.days_input.text().isdigit() else 0
-
-            # Update Costs Table (Employees x Days) x Shifts
-            self.resize_table(
-                self.costs_table, num_employees * num_days, num_shifts, "Employee {e} - Day {d}", "Shift {s}"
-            )
-
-            # Update Availability Table (Employees x Days) x Shifts
-            self.resize_table(
-                self.availability_table, num_employees * num_days, num_shifts, "Employee {e} - Day {d}", "Shift {s}"
-            )
-
-            # Update Requirements Table Days x Shifts
-            self.resize_table(
-                self.requirements_table, num_days, num_shifts, "Day {d}", "Shift {s}"
-            )
-        except ValueError:
-            QMessageBox.critical(self, "Error", "Invalid input values for employees, shifts, or days.")
-
-    def resize_table(self, table, rows, cols, row_label_format, col_label_format):
-        """Resize a QTableWidget to the specified rows and columns, with headers."""
-        table.setRowCount(rows)
-        table.setColumnCount(cols)
-
-        # Set row headers
-        for row in range(rows):
-            if "{e}" in row_label_format and "{d}" in row_label_format:
-                employee = (row // (rows // cols)) + 1
-                day = (row % (rows // cols)) + 1
-                table.setVerticalHeaderItem(row, QTableWidgetItem(row_label_format.format(e=employee, d=day)))
-            elif "{d}" in row_label_format:
-                table.setVerticalHeaderItem(row, QTableWidgetItem(row_label_format.format(d=row + 1)))
-
-        # Set column headers
-        for col in range(cols):
-            table.setHorizontalHeaderItem(col, QTableWidgetItem(col_label_format.format(s=col + 1)))
-
-    def parse_table(self, table, expected_rows, expected_cols, table_name):
-        rows = table.rowCount()
-        cols = table.columnCount()
-
-        # Check if the table has the expected dimensions
-        if rows != expected_rows or cols != expected_cols:
-            raise ValueError(
-                f"The {table_name} table must have exactly {expected_rows} rows and {expected_cols} columns. "
-                f"Found {rows} rows and {cols} columns."
-            )
-
-        # Parse the data into a 2D list
-        data = []
-        for row in range(rows):
-            row_data = []
-            for col in range(cols):
-                item = table.item(row, col)
-
-                # Check if the cell is empty
-                if item is None or item.text().strip() == "":
-                    raise ValueError(
-                        f"The {table_name} table has an empty cell at row {row + 1}, column {col + 1}."
-                    )
-
-                # Try to convert the cell data to a float
-                try:
-                    value = float(item.text().strip())
-                    row_data.append(value)
-                except ValueError:
-                    raise ValueError(
-                        f"The {table_name} table contains invalid data at row {row + 1}, column {col + 1}: "
-                        f"'{item.text().strip()}' is not a valid number."
-                    )
-            data.append(row_data)
-
-        return data
-
-    def run_optimization(self):
-        try:
-            # Validate numeric inputs
-            try:
-                num_employees = int(self.employees_input.text())
-                num_shifts = int(self.shifts_input.text())
-                num_days = int(self.days_input.text())
-                max_shifts = int(self.max_shifts_input.text())
-                
-                # Check if all inputs are positive integers
-                if num_employees <= 0 or num_shifts <= 0 or num_days <= 0 or max_shifts <= 0:
-                    raise ValueError("All numeric inputs must be positive integers.")
-
-            except ValueError as e:
-                QMessageBox.warning(self, "Input Error", "Invalid input for employees, shifts, days, or max shifts.")
-                return
-
-            # Parse tables
-            try:
-                costs = self.parse_table(self.costs_table, num_employees * num_days, num_shifts, "Costs")
-                availability = self.parse_table(self.availability_table, num_employees * num_days, num_shifts, "Availability")
-                requirements = self.parse_table(self.requirements_table, num_days, num_shifts, "Requirements")
-            except ValueError as e:
-                QMessageBox.critical(self, "Table Error", str(e))
-                return
-
-            # Initialize Gurobi model
-            model = Model("StaffScheduling")
-
-            # Define decision variables: x[e, d, s] = 1 if employee e is assigned to shift s on day d
-            x = model.addVars(num_employees, num_days, num_shifts, vtype=GRB.BINARY, name="x")
-
-            # Objective: Minimize costs
-            model.setObjective(
-                quicksum(
-                    costs[e * num_days + d][s] * x[e, d, s]
-                    for e in range(num_employees)
-                    for d in range(num_days)
-                    for s in range(num_shifts)
-                ),
-                GRB.MINIMIZE,
-            )
-
-            # Constraints
-            # Employee availability
-            for e in range(num_employees):
-                for d in range(num_days):
-                    for s in range(num_shifts):
-                        if availability[e * num_days + d][s] == 0:
-                            model.addConstr(x[e, d, s] == 0, f"Availability_{e}_{d}_{s}")
-
-            # Shift requirements
-            for d in range(num_days):
-                for s in range(num_shifts):
-                    model.addConstr(
-                        quicksum(x[e, d, s] for e in range(num_employees)) == requirements[d][s],
-                        f"Requirements_{d}_{s}",
-                    )
-
-            # Max shifts per employee
-            for e in range(num_employees):
-                model.addConstr(
-                    quicksum(x[e, d, s] for d in range(num_days) for s in range(num_shifts)) <= max_shifts,
-                    f"MaxShifts_{e}",
-                )
-
-            # Solve the optimization problem
-            model.optimize()
-
-            # Display results
-            self.output_area.setRowCount(0)  # Clear existing results
-            if model.status == GRB.OPTIMAL:
-                for e in range(num_employees):
-                    for d in range(num_days):
-                        for s in range(num_shifts):
-                            if x[e, d, s].x > 0.5:  # If employee e is assigned to shift s on day d
-                                row_pos = self.output_area.rowCount()
-                                self.output_area.insertRow(row_pos)
-                                self.output_area.setItem(row_pos, 0, QTableWidgetItem(f"Employee {e+1}"))
-                                self.output_area.setItem(row_pos, 1, QTableWidgetItem(f"Day {d+1}"))
-                                self.output_area.setItem(row_pos, 2, QTableWidgetItem(f"Shift {s+1}"))
-            elif model.status == GRB.INFEASIBLE:
-                QMessageBox.warning(self, "No Solution", "No feasible solution found.")
-            elif model.status == GRB.UNBOUNDED:
-                QMessageBox.warning(self, "No Solution", "The model is unbounded. Check your constraints.")
-            else:
-                QMessageBox.warning(self, "No Solution", f"Optimization failed. Gurobi status code: {model.status}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
-
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = StaffSchedulingApp()
-    window.show()
-    sys.exit(app.exec_())
+import sys
+from functools import partial
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QLineEdit, QTableView,
+    QPushButton, QGridLayout, QMessageBox, QFileDialog, QCheckBox, QComboBox, QPlainTextEdit
+)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFontDatabase
+import numpy as np
+from aggregation import AggregatedSchedulingModel
+from array_table_model import ArrayTableModel, AssignmentTableModel
+from decomposition import DecomposedSolve, roster_groups
+from feasibility import diagnose_infeasible, precheck
+from instance_io import export_assignment, load_instance, load_matrix, load_partition, save_instance, validate_matrix
+from min_cost_flow import FlowBackend
+from scheduling_model import StaffSchedulingModel, SchedulingSession
+from solution_cache import SolutionCache, instance_key, row_digests
+from solver_backends import BackendSolve, GurobiBackend, available_backends, default_backend_name, get_backend
+from solve_worker import SolveWorker, format_progress
+from work_rules import RuleSchedulingModel, RuleSolve, WorkRules
+from telemetry import Telemetry
+
+
+# Conflicting constraints listed in the message of an infeasible solve
+MAX_SHOWN_REASONS = 20
+
+
+def choose_solve_path(scheduler, backend, rules=None, flow=False, sub_rosters=1):
+    """Name of the way to solve a scheduler with the named backend.
+
+    "decomposed" solves independent sub-rosters in worker processes, "rules" solves
+    a RuleSchedulingModel with a backend without lazy constraints, "model" builds a
+    new Gurobi model (with lazy work rules, or for the classes of an
+    AggregatedSchedulingModel), "flow" and "backend" solve the matrix form with
+    the flow solver or the backend, and "session" re-solves the edits of the
+    Gurobi what-if session from its previous schedule.
+    """
+    if sub_rosters > 1:
+        return "decomposed"
+    if rules:
+        # Rule rows break the network structure, so the flow solver would not apply
+        return "model" if backend == GurobiBackend.name else "rules"
+    if flow:
+        return "flow"
+    if backend != GurobiBackend.name:
+        return "backend"
+    if isinstance(scheduler, AggregatedSchedulingModel):
+        return "model"
+    return "session"
+
+
+class StaffSchedulingApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Staff Scheduling Optimization")
+        self.setGeometry(200, 200, 1000, 850)
+
+        layout = QVBoxLayout()
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #f7f7f7;
+            }
+            QLabel {
+                font-size: 18px;
+                font-weight: bold;
+                color: #34495e;
+            }
+            QLineEdit {
+                border: 1px solid #34495e;
+                border-radius: 5px;
+                padding: 5px;
+                font-size: 14px;
+                background-color: #ffffff;
+                color: #34495e;
+            }
+            QTableView {
+                border: 1px solid #34495e;
+                font-size: 14px;
+                background-color: #ffffff;
+                color: #34495e;
+            }
+            QPushButton {
+                background-color: #3498db;
+                border: none;
+                border-radius: 10px;
+                color: white;
+                font-size: 16px;
+                padding: 10px;
+}
+            QPushButton:hover {
+                background-color: #2980b9;
+            }
+
+        """)
+
+        self.container = QWidget()
+        self.container.setLayout(layout)
+        self.setCentralWidget(self.container)
+
+        # Title
+        title = QLabel("Staff Scheduling Optimization")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        # Input Grid
+        self.input_grid = QGridLayout()
+        layout.addLayout(self.input_grid)
+
+        # Matrices are resized after a short pause in typing
+        self.table_dimensions = None
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(400)
+        self.resize_timer.timeout.connect(self.update_matrices)
+
+        self.add_input_field(
+            "Number of Employees (E):",
+            "Total number of employees available for scheduling.",
+            0,
+            "employees_input",
+        )
+        self.add_input_field(
+            "Number of Shifts per Day (S):",
+            "Number of shifts required per day (e.g., Morning, Evening, Night).",
+            1,
+            "shifts_input",
+        )
+        self.add_input_field(
+            "Number of Days (T):",
+            "Total number of days to schedule (e.g., 7 for one week).",
+            2,
+            "days_input",
+        )
+        self.add_table(
+            "Cost per shift (matrix for all employees and days):",
+            "Enter the cost for each employee working each shift on each day.",
+            3,
+            "costs_table",
+        )
+        self.add_table(
+            "Availability (1 for available, 0 for not):",
+            "Enter 1 if the employee is available for the shift, 0 otherwise.",
+            4,
+            "availability_table",
+        )
+        self.add_table(
+            "Required employees per shift per day:",
+            "Enter the number of employees required for each shift on each day.",
+            5,
+            "requirements_table",
+        )
+        self.add_input_field(
+            "Max Shifts per Employee (M):",
+            "Maximum number of shifts an employee can work during the scheduling period.",
+            6,
+            "max_shifts_input",
+        )
+        self.add_work_rules(7)
+
+        # Whole-instance files
+        instance_buttons = QHBoxLayout()
+        instance_buttons.addStretch(1)
+        open_button = QPushButton("Open Instance...")
+        open_button.setCursor(Qt.PointingHandCursor)
+        open_button.setToolTip("Load the dimensions, tables and max shifts from an .ssi, .npz or .json instance file.")
+        open_button.clicked.connect(self.open_instance_file)
+        instance_buttons.addWidget(open_button)
+        save_button = QPushButton("Save Instance...")
+        save_button.setCursor(Qt.PointingHandCursor)
+        save_button.setToolTip("Save the current inputs as a compact binary .ssi (or .npz) instance file.")
+        save_button.clicked.connect(self.save_instance_file)
+        instance_buttons.addWidget(save_button)
+        layout.addLayout(instance_buttons)
+
+        # Run and Cancel Buttons
+        buttons = QHBoxLayout()
+        solver_label = QLabel("Solver:")
+        solver_label.setToolTip("Gurobi keeps the model between solves and reports progress; HiGHS needs no licence.")
+        buttons.addWidget(solver_label)
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(available_backends())
+        self.backend_combo.setCurrentText(default_backend_name())
+        buttons.addWidget(self.backend_combo)
+        self.cache_checkbox = QCheckBox("Reuse cached solutions")
+        self.cache_checkbox.setToolTip(
+            "Show the stored optimal solution of an instance solved before, and start similar "
+            "instances from the closest stored solution."
+        )
+        self.cache_checkbox.setChecked(True)
+        buttons.addWidget(self.cache_checkbox)
+        self.group_checkbox = QCheckBox("Group identical employees")
+        self.group_checkbox.setToolTip(
+            "Solve employees with identical costs, availability and max shifts as one class, which removes "
+            "symmetric schedules. Gurobi then builds a new model for every solve instead of re-solving "
+            "edits from the previous schedule."
+        )
+        self.group_checkbox.setChecked(False)
+        buttons.addWidget(self.group_checkbox)
+        self.flow_checkbox = QCheckBox("Network flow")
+        self.flow_checkbox.setToolTip(
+            "Solve as an exact min-cost flow when the model has only availability, requirement and max-shift "
+            "constraints; the selected solver handles other models. Every flow solve starts from scratch, "
+            "while Gurobi keeps its model and re-solves edits from the previous schedule."
+        )
+        self.flow_checkbox.setChecked(False)
+        buttons.addWidget(self.flow_checkbox)
+        self.split_checkbox = QCheckBox("Split independent rosters")
+        self.split_checkbox.setToolTip(
+            "Solve groups of employees who never cover the same requirements as separate models, split by the "
+            "partition of the opened instance file if it has one. Large instances are solved in parallel worker "
+            "processes; the session's incremental re-solves are not used then."
+        )
+        self.split_checkbox.setChecked(False)
+        buttons.addWidget(self.split_checkbox)
+        self.run_button = QPushButton("Solve")
+        self.run_button.setCursor(Qt.PointingHandCursor)
+        self.run_button.clicked.connect(self.run_optimization)
+        buttons.addWidget(self.run_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setCursor(Qt.PointingHandCursor)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_optimization)
+        buttons.addWidget(self.cancel_button)
+        layout.addLayout(buttons)
+
+        # Solve progress
+        self.progress_label = QLabel("")
+        self.progress_label.setStyleSheet("font-size: 14px; font-weight: normal;")
+        layout.addWidget(self.progress_label)
+        self.worker = None
+        self.session = None
+        self.cache = None
+        self.pending_cache = None
+        self.partition = None
+
+        # Results
+        results_header = QHBoxLayout()
+        self.output_label = QLabel("Results:")
+        results_header.addWidget(self.output_label, 1)
+        self.pivot_checkbox = QCheckBox("Employee x Day grid")
+        self.pivot_checkbox.toggled.connect(lambda checked: self.output_area.model().set_pivot(checked))
+        results_header.addWidget(self.pivot_checkbox)
+        self.export_button = QPushButton("Export...")
+        self.export_button.setCursor(Qt.PointingHandCursor)
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_results)
+        results_header.addWidget(self.export_button)
+        self.diagnostics_button = QPushButton("Diagnostics")
+        self.diagnostics_button.setCursor(Qt.PointingHandCursor)
+        self.diagnostics_button.setCheckable(True)
+        self.diagnostics_button.setToolTip("Show phase timings, model statistics and the solver log of the last solve.")
+        results_header.addWidget(self.diagnostics_button)
+        layout.addLayout(results_header)
+
+        self.output_area = QTableView()
+        self.output_area.setModel(AssignmentTableModel(parent=self.output_area))
+        layout.addWidget(self.output_area)
+        self.result = None
+
+        # Diagnostics of the last solve, hidden until requested
+        self.diagnostics_area = QPlainTextEdit()
+        self.diagnostics_area.setReadOnly(True)
+        self.diagnostics_area.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.diagnostics_area.setVisible(False)
+        self.diagnostics_button.toggled.connect(self.diagnostics_area.setVisible)
+        layout.addWidget(self.diagnostics_area)
+        self.telemetry = None
+
+    def add_input_field(self, label_text, tooltip, row, attribute_name):
+        """Add a single-line input field with a tooltip."""
+        label = QLabel(label_text)
+        label.setToolTip(tooltip)
+        self.input_grid.addWidget(label, row, 0)
+        field = QLineEdit()
+        field.setToolTip(tooltip)
+        # Resize the matrices once typing pauses or the field loses focus, not on every keystroke
+        field.textChanged.connect(self.resize_timer.start)
+        field.editingFinished.connect(self.update_matrices)
+        setattr(self, attribute_name, field)
+        self.input_grid.addWidget(field, row, 1)
+
+    def add_work_rules(self, row):
+        """Add the work-rule inputs; rules are checked against each solution and added only when violated."""
+        tooltip = "Rules every schedule must follow. They are added to the model only where a solution breaks them."
+        label = QLabel("Work Rules:")
+        label.setToolTip(tooltip)
+        self.input_grid.addWidget(label, row, 0)
+        rules = QHBoxLayout()
+        self.one_shift_checkbox = QCheckBox("One shift per day")
+        self.one_shift_checkbox.setToolTip("An employee works at most one shift on any day.")
+        rules.addWidget(self.one_shift_checkbox)
+        rules.addWidget(QLabel("Max consecutive days:"))
+        self.max_consecutive_input = QLineEdit()
+        self.max_consecutive_input.setPlaceholderText("none")
+        self.max_consecutive_input.setToolTip("Most days in a row an employee may work; leave empty for no limit.")
+        rules.addWidget(self.max_consecutive_input)
+        rules.addWidget(QLabel("Rest pairs:"))
+        self.rest_input = QLineEdit()
+        self.rest_input.setPlaceholderText("e.g. 3>1")
+        self.rest_input.setToolTip(
+            "Comma-separated pairs A>B: an employee working Shift A may not work Shift B the next day, "
+            "e.g. 3>1 for a night shift followed by a morning shift."
+        )
+        rules.addWidget(self.rest_input)
+        self.input_grid.addLayout(rules, row, 1)
+
+    def work_rules(self, num_shifts):
+        """WorkRules from the rule inputs, with shifts numbered from 0; raises ValueError for invalid input."""
+        pairs = []
+        for text in filter(None, (pair.strip() for pair in self.rest_input.text().split(","))):
+            first, separator, second = (part.strip() for part in text.partition(">"))
+            if not (separator and first.isdigit() and second.isdigit()):
+                raise ValueError(f"Invalid rest pair '{text}': use A>B, e.g. 3>1.")
+            pairs.append((int(first) - 1, int(second) - 1))
+        limit = self.max_consecutive_input.text().strip()
+        if limit and not limit.isdigit():
+            raise ValueError("Max consecutive days must be a whole number.")
+        rules = WorkRules(self.one_shift_checkbox.isChecked(), pairs, int(limit) if limit else None)
+        rules.check(num_shifts)
+        return rules
+
+    def add_table(self, label_text, tooltip, row, attribute_name):
+        """Add a table input for matrix data with a tooltip and a file import button."""
+        label = QLabel(label_text)
+        label.setToolTip(tooltip)
+        self.input_grid.addWidget(label, row, 0)
+        table = QTableView()
+        table.setModel(ArrayTableModel(parent=table))
+        table.setToolTip(tooltip)
+        setattr(self, attribute_name, table)
+        self.input_grid.addWidget(table, row, 1)
+        import_button = QPushButton("Import...")
+        import_button.setCursor(Qt.PointingHandCursor)
+        import_button.setToolTip("Load this matrix from a .csv or .npy file.")
+        import_button.clicked.connect(lambda: self.import_table(attribute_name))
+        self.input_grid.addWidget(import_button, row, 2)
+
+    def table_spec(self, attribute_name, num_employees, num_days, num_shifts):
+        """Return (rows, cols, name, kind) describing the expected content of a table."""
+        if attribute_name == "requirements_table":
+            return num_days, num_shifts, "Requirements", "requirements"
+        if attribute_name == "availability_table":
+            return num_employees * num_days, num_shifts, "Availability", "availability"
+        return num_employees * num_days, num_shifts, "Costs", "costs"
+
+    def import_table(self, attribute_name):
+        """Load a matrix from a file directly into the array behind a table."""
+        self.update_matrices()
+        dimensions = [self.employees_input.text(), self.days_input.text(), self.shifts_input.text()]
+        if not all(text.isdigit() and int(text) > 0 for text in dimensions):
+            QMessageBox.warning(
+                self, "Input Error", "Enter the number of employees, shifts and days before importing a matrix."
+            )
+            return
+        rows, cols, name, kind = self.table_spec(attribute_name, *(int(text) for text in dimensions))
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, f"Import {name}", "", "Matrix files (*.csv *.npy);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            data = load_matrix(path, rows, cols, name, kind)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Import Error", str(e))
+            return
+        getattr(self, attribute_name).model().set_array(data)
+
+    def open_instance_file(self):
+        """Load a complete instance file into the input fields and tables.
+
+        The tables keep the arrays as loaded, so the costs of an .ssi file stay
+        memory-mapped until a cell is edited.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Instance", "", "Instance files (*.ssi *.npz *.json);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            instance = load_instance(path)
+            partition = load_partition(path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(self, "Open Error", str(e))
+            return
+        max_shifts = np.unique(instance["max_shifts"])
+        if max_shifts.size != 1 or max_shifts[0] != np.round(max_shifts[0]) or max_shifts[0] <= 0:
+            QMessageBox.critical(
+                self, "Open Error",
+                "The application uses one whole number of max shifts for all employees, but this instance has "
+                "other values. Solve it with batch_solve.py instead.",
+            )
+            return
+
+        num_employees, num_days, num_shifts = instance["costs"].shape
+        for field, value in zip(
+            (self.employees_input, self.days_input, self.shifts_input, self.max_shifts_input),
+            (num_employees, num_days, num_shifts, int(max_shifts[0])),
+        ):
+            field.setText(str(value))
+        self.update_matrices()
+        rows = num_employees * num_days
+        self.costs_table.model().set_array(instance["costs"].reshape(rows, num_shifts))
+        self.availability_table.model().set_array(instance["availability"].reshape(rows, num_shifts))
+        self.requirements_table.model().set_array(instance["requirements"])
+        self.partition = partition
+
+    def save_instance_file(self):
+        """Save the input fields and tables as an instance file (.ssi unless .npz is chosen)."""
+        texts = [field.text() for field in (
+            self.employees_input, self.days_input, self.shifts_input, self.max_shifts_input
+        )]
+        if not all(text.isdigit() and int(text) > 0 for text in texts):
+            QMessageBox.warning(self, "Input Error", "Invalid input for employees, shifts, days, or max shifts.")
+            return
+        num_employees, num_days, num_shifts, max_shifts = (int(text) for text in texts)
+        self.update_matrices()
+        try:
+            costs, availability, requirements = (
+                self.table_data(attribute_name, num_employees, num_days, num_shifts)
+                for attribute_name in ("costs_table", "availability_table", "requirements_table")
+            )
+        except ValueError as e:
+            QMessageBox.critical(self, "Table Error", str(e))
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Instance", "instance.ssi", "Binary instance (*.ssi);;NumPy archive (*.npz)"
+        )
+        if not path:
+            return
+        if not path.lower().endswith((".ssi", ".npz")):
+            path += ".ssi"
+        shape = (num_employees, num_days, num_shifts)
+        try:
+            save_instance(path, costs.reshape(shape), availability.reshape(shape), requirements, max_shifts)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Save Error", str(e))
+
+    def update_matrices(self):
+        """Resize matrices dynamically based on employee, shift, and day input."""
+        self.resize_timer.stop()
+        try:
+            num_employees = int(self.employees_input.text()) if self.employees_input.text().isdigit() else 0
+            num_shifts = int(self.shifts_input.text()) if self.shifts_input.text().isdigit() else 0
+            num_days = int(self.days_input.text()) if self.days_input.text().isdigit() else 0
+
+            dimensions = (num_employees, num_shifts, num_days)
+            if dimensions == self.table_dimensions:
+                return
+            self.table_dimensions = dimensions
+
+            def employee_day_label(row):
+                return f"Employee {row // num_days + 1} - Day {row % num_days + 1}"
+
+            def shift_label(col):
+                return f"Shift {col + 1}"
+
+            # Update Costs Table (Employees x Days) x Shifts
+            self.resize_table(self.costs_table, num_employees * num_days, num_shifts, employee_day_label, shift_label)
+
+            # Update Availability Table (Employees x Days) x Shifts
+            self.resize_table(
+                self.availability_table, num_employees * num_days, num_shifts, employee_day_label, shift_label
+            )
+
+            # Update Requirements Table Days x Shifts
+            self.resize_table(
+                self.requirements_table, num_days, num_shifts, lambda row: f"Day {row + 1}", shift_label
+            )
+        except ValueError:
+            QMessageBox.critical(self, "Error", "Invalid input values for employees, shifts, or days.")
+
+    def resize_table(self, table, rows, cols, row_label, col_label):
+        """Resize a table to the specified rows and columns; headers are computed on demand."""
+        model = table.model()
+        model.resize(rows, cols)
+        model.set_labels(row_label, col_label)
+
+    def table_data(self, attribute_name, num_employees, num_days, num_shifts):
+        """Return the validated matrix of a table."""
+        rows, cols, name, kind = self.table_spec(attribute_name, num_employees, num_days, num_shifts)
+        return self.parse_table(getattr(self, attribute_name), rows, cols, name, kind)
+
+    def parse_table(self, table, expected_rows, expected_cols, table_name, kind=None):
+        """Return the content of a table as a float array, checking shape and values."""
+        return validate_matrix(table.model().array(), expected_rows, expected_cols, table_name, kind)
+
+    def run_optimization(self):
+        if self.worker is not None:
+            return
+        self.telemetry = telemetry = Telemetry("staff_scheduling", backend=self.backend_combo.currentText())
+        try:
+            # Validate numeric inputs
+            try:
+                num_employees = int(self.employees_input.text())
+                num_shifts = int(self.shifts_input.text())
+                num_days = int(self.days_input.text())
+                max_shifts = int(self.max_shifts_input.text())
+                
+                # Check if all inputs are positive integers
+                if num_employees <= 0 or num_shifts <= 0 or num_days <= 0 or max_shifts <= 0:
+                    raise ValueError("All numeric inputs must be positive integers.")
+
+            except ValueError as e:
+                QMessageBox.warning(self, "Input Error", "Invalid input for employees, shifts, days, or max shifts.")
+                return
+            try:
+                rules = self.work_rules(num_shifts)
+            except ValueError as e:
+                QMessageBox.warning(self, "Input Error", str(e))
+                return
+
+            # Parse tables, applying any pending resize first
+            with telemetry.phase("parse"):
+                self.update_matrices()
+                try:
+                    costs, availability, requirements = (
+                        self.table_data(attribute_name, num_employees, num_days, num_shifts)
+                        for attribute_name in ("costs_table", "availability_table", "requirements_table")
+                    )
+                except ValueError as e:
+                    QMessageBox.critical(self, "Table Error", str(e))
+                    return
+
+                shape = (num_employees, num_days, num_shifts)
+                backend = self.backend_combo.currentText()
+                model_class = AggregatedSchedulingModel if self.group_checkbox.isChecked() else StaffSchedulingModel
+                scheduler = model_class.from_tables(
+                    costs, availability, requirements, num_employees, num_days, num_shifts, max_shifts
+                )
+                if rules:
+                    # Dealing class solutions out round-robin could break the rules, so solve per employee
+                    scheduler = RuleSchedulingModel(
+                        scheduler.costs, scheduler.availability, scheduler.requirements, scheduler.max_shifts, rules
+                    )
+                elif model_class is AggregatedSchedulingModel and scheduler.num_classes == num_employees:
+                    # No two employees are interchangeable: keep the session with its warm starts
+                    scheduler = StaffSchedulingModel(
+                        scheduler.costs, scheduler.availability, scheduler.requirements, scheduler.max_shifts
+                    )
+            telemetry.context["size"] = "x".join(str(n) for n in shape)
+            if rules:
+                telemetry.context["rules"] = rules.to_dict()
+
+            # Reject instances that obviously cannot be staffed before building a model
+            with telemetry.phase("precheck"):
+                problems = precheck(scheduler.availability, scheduler.requirements, scheduler.max_shifts, rules)
+            if problems:
+                telemetry.status = "infeasible"
+                telemetry.context["precheck"] = problems
+                self.show_infeasible(scheduler, problems, "The requirements cannot be met:")
+                self.finish_telemetry()
+                return
+            start = None
+            self.pending_cache = None
+            if self.cache_checkbox.isChecked():
+                with telemetry.phase("cache"):
+                    entry, start = self.lookup_cache(scheduler, backend, rules)
+                if entry is not None:
+                    telemetry.context["cache"] = "hit"
+                    telemetry.status = entry["status"]
+                    with telemetry.phase("display"):
+                        self.display_solution(
+                            scheduler, entry["status"], entry["assignment"], entry["objective"], 0.0, cached=True
+                        )
+                    self.finish_telemetry()
+                    return
+
+            # Split off independent sub-rosters, by the partition of the opened instance if it still fits
+            partition = None
+            if self.split_checkbox.isChecked():
+                if self.partition is not None and self.partition.size == num_employees:
+                    partition = self.partition
+                with telemetry.phase("decompose"):
+                    try:
+                        groups, _ = roster_groups(scheduler.availability, scheduler.requirements, partition)
+                    except ValueError as e:
+                        QMessageBox.warning(self, "Partition Error", str(e))
+                        return
+                telemetry.context["sub_rosters"] = int(groups.max(initial=-1)) + 1
+
+            # Solve in the background, reusing the previous model when the dimensions are unchanged
+            path = telemetry.context["path"] = choose_solve_path(
+                scheduler, backend, rules, self.flow_checkbox.isChecked(), telemetry.context.get("sub_rosters", 1)
+            )
+            solver = get_backend(backend)
+            if path == "decomposed":
+                self.start_decomposed_solve(
+                    scheduler, FlowBackend(solver) if self.flow_checkbox.isChecked() else solver, partition,
+                    partial(RuleSchedulingModel, rules=rules) if rules else None,
+                )
+            elif path == "rules":
+                self.start_rules_solve(scheduler, solver)
+            elif path == "model":
+                self.start_model_solve(scheduler, start)
+            elif path == "session":
+                self.start_session_solve(scheduler, start)
+            else:
+                self.start_backend_solve(scheduler, FlowBackend(solver) if path == "flow" else solver)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+
+    def lookup_cache(self, scheduler, backend, rules=None):
+        """Look an instance up in the solution cache, with the work rules as part of its key.
+
+        Returns (entry, None) on a hit. On a miss, returns (None, start) where start
+        is the assignment of the closest cached instance (or None) to use as MIP
+        start, and keeps the key so that show_results can store the solution.
+        """
+        params = {"backend": backend, "time_limit": None}
+        if rules:
+            params["rules"] = rules.to_dict()
+        try:
+            if self.cache is None:
+                self.cache = SolutionCache()
+            key = instance_key(
+                scheduler.costs, scheduler.availability, scheduler.requirements, scheduler.max_shifts, params
+            )
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry, None
+            rows = row_digests(scheduler.costs, scheduler.availability, scheduler.max_shifts)
+            self.pending_cache = (key, rows, scheduler.requirements, params)
+            near = self.cache.nearest(rows, scheduler.requirements, params)
+        except OSError:
+            # The cache is an optimization only; solve normally without it
+            return None, None
+        return None, None if near is None else near[0]["assignment"]
+
+    def start_session_solve(self, scheduler, start=None):
+        """Solve with the what-if session, applying the scheduler's data as edits when the dimensions are unchanged."""
+        if self.session is None or self.session.scheduler.costs.shape != scheduler.costs.shape:
+            self.session = SchedulingSession(scheduler)
+            inputs = None
+        else:
+            inputs = (scheduler.costs, scheduler.availability, scheduler.requirements, scheduler.max_shifts)
+        if start is not None:
+            self.session.last_assignment = start
+        self.start_solve(self.session, inputs)
+
+    def start_solve(self, session, inputs=None):
+        """Solve on a worker thread, first applying inputs as edits to the session's model."""
+        def build():
+            if inputs is not None:
+                session.update(*inputs)
+            return session.prepare()
+
+        def collect(model):
+            session.record_solution()
+            return self.diagnose(
+                session.scheduler, GurobiBackend.result(model, session.scheduler.x, log=self.telemetry.log),
+                GurobiBackend.name,
+            )
+
+        self.worker = SolveWorker(build, collect, self.telemetry)
+        self.worker.progress.connect(self.show_progress)
+        self.start_worker()
+
+    def start_model_solve(self, scheduler, start=None):
+        """Build and solve a new Gurobi model on a worker thread, optionally from an (E, T, S) MIP start."""
+        def build():
+            model = scheduler.build()
+            if start is not None:
+                scheduler.x.Start = scheduler.start_from(start)
+            return model
+
+        def collect(model):
+            result = GurobiBackend.result(model, scheduler.x, log=self.telemetry.log)
+            if isinstance(scheduler, RuleSchedulingModel):
+                result["stats"]["lazy_constraints"] = scheduler.cuts
+            return self.diagnose(scheduler, result, GurobiBackend.name)
+
+        # Work rules are added lazily by the scheduler's own callback
+        callback = scheduler.callback if isinstance(scheduler, RuleSchedulingModel) else None
+        self.worker = SolveWorker(build, collect, self.telemetry, callback=callback)
+        self.worker.progress.connect(self.show_progress)
+        self.start_worker()
+
+    def start_backend_solve(self, scheduler, backend):
+        """Solve on a worker thread with a solver backend (see solver_backends and min_cost_flow)."""
+        self.worker = SolveWorker(
+            lambda: BackendSolve(backend, scheduler.to_problem()),
+            lambda job: self.diagnose(scheduler, job.result, backend), self.telemetry,
+        )
+        self.start_worker()
+
+    def start_decomposed_solve(self, scheduler, backend, partition=None, model_class=None):
+        """Solve the sub-rosters of a scheduler in worker processes (see decomposition)."""
+        self.worker = SolveWorker(
+            lambda: DecomposedSolve(scheduler, backend, partition, model_class=model_class),
+            lambda job: self.diagnose(scheduler, job.result, backend), self.telemetry,
+        )
+        self.start_worker()
+
+    def start_rules_solve(self, scheduler, backend):
+        """Solve a RuleSchedulingModel on a worker thread with a backend without lazy constraints."""
+        self.worker = SolveWorker(
+            lambda: RuleSolve(scheduler, backend), lambda job: self.diagnose(scheduler, job.result, backend),
+            self.telemetry,
+        )
+        self.start_worker()
+
+    @staticmethod
+    def diagnose(scheduler, result, backend):
+        """Add the conflicting constraints of a result infeasible with a backend; runs on the worker thread."""
+        if result["status"] == "infeasible":
+            result["conflicts"], result["diagnosis"] = diagnose_infeasible(scheduler, backend)
+        return scheduler, result
+
+    def start_worker(self):
+        self.worker.solved.connect(lambda solved: self.show_results(*solved))
+        self.worker.failed.connect(self.show_failure)
+        self.worker.finished.connect(self.solve_finished)
+        self.run_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_label.setText("Solving...")
+        self.worker.start()
+
+    def cancel_optimization(self):
+        """Stop the running solve, keeping the best assignment found so far."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.progress_label.setText("Cancelling...")
+
+    def show_progress(self, incumbent, bound, gap):
+        self.progress_label.setText(format_progress(incumbent, bound, gap))
+
+    def show_failure(self, message):
+        self.progress_label.setText("")
+        self.telemetry.status = "error"
+        self.telemetry.context["error"] = message
+        self.finish_telemetry()
+        QMessageBox.critical(self, "Error", f"An unexpected error occurred: {message}")
+
+    def solve_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.run_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def show_results(self, scheduler, result):
+        """Display a solver backend result dict (see solver_backends) for a scheduler."""
+        assignment = None if result["x"] is None else scheduler.assignment_from(result["x"])
+        if self.pending_cache is not None and result["status"] == "optimal" and assignment is not None:
+            key, rows, requirements, params = self.pending_cache
+            try:
+                self.cache.put(key, assignment, result["objective"], result["status"], rows, requirements, params)
+            except OSError:
+                pass
+        self.pending_cache = None
+        self.telemetry.record_result(result)
+        conflicts = result.get("conflicts")
+        if conflicts:
+            self.telemetry.context["conflicts"] = conflicts
+        if result.get("diagnosis"):
+            self.telemetry.context["diagnosis"] = result["diagnosis"]
+        with self.telemetry.phase("display"):
+            if result["status"] == "infeasible":
+                message = "These constraints conflict:" if conflicts else "No feasible solution found."
+                if result.get("diagnosis"):
+                    message += f"\n\n({result['diagnosis']})"
+                self.show_infeasible(scheduler, conflicts, message)
+            else:
+                self.display_solution(
+                    scheduler, result["status"], assignment, result["objective"], result["mip_gap"]
+                )
+        self.finish_telemetry()
+
+    def finish_telemetry(self):
+        """Show the diagnostics of the finished solve and append them to the telemetry file, if any."""
+        self.diagnostics_area.setPlainText(self.telemetry.format())
+        try:
+            self.telemetry.write()
+        except OSError as e:
+            self.diagnostics_area.appendPlainText(f"\nCould not write telemetry: {e}")
+
+    def show_infeasible(self, scheduler, reasons, message):
+        """Clear the results and explain why the instance has no solution."""
+        self.display_solution(scheduler, "infeasible", None, None, None, quiet=True)
+        self.progress_label.setText("No feasible solution.")
+        if reasons:
+            message += "\n\n" + "\n".join(f"\u2022 {reason}" for reason in reasons[:MAX_SHOWN_REASONS])
+            if len(reasons) > MAX_SHOWN_REASONS:
+                message += f"\n... and {len(reasons) - MAX_SHOWN_REASONS} more"
+        QMessageBox.warning(self, "No Solution", message)
+
+    def display_solution(self, scheduler, status, assignment, objective, mip_gap, cached=False, quiet=False):
+        """Display an (E, T, S) assignment, or report why there is none when it is None (unless quiet)."""
+        report = scheduler.size_report()
+        savings = "skipping unavailable cells"
+        if "classes" in report:
+            savings += f" and grouping identical employees into {report['classes']} classes"
+        self.output_label.setText(
+            f"Results: ({report['vars']} variables, {report['constrs']} constraints; "
+            f"{report['vars_saved']} variables and {report['constrs_saved']} constraints "
+            f"saved by {savings})"
+        )
+
+        # Display results
+        self.result = None
+        self.output_area.model().set_assignment(None)  # Clear existing results
+        self.export_button.setEnabled(False)
+        if assignment is not None:
+            self.result = (assignment, status, objective)
+            self.output_area.model().set_assignment(assignment)
+            self.export_button.setEnabled(True)
+            if status == "optimal":
+                found = "loaded from cache" if cached else "found"
+                self.progress_label.setText(f"Optimal solution {found}. Total cost: {objective:.2f}")
+            else:
+                gap = "-" if mip_gap is None else f"{mip_gap * 100:.2f}%"
+                self.progress_label.setText(f"Solve stopped early. Total cost: {objective:.2f}    Gap: {gap}")
+        elif not quiet:
+            self.progress_label.setText("")
+            if status == "infeasible":
+                QMessageBox.warning(self, "No Solution", "No feasible solution found.")
+            elif status == "unbounded":
+                QMessageBox.warning(self, "No Solution", "The model is unbounded. Check your constraints.")
+            elif status == "interrupted":
+                QMessageBox.warning(self, "No Solution", "The solve was cancelled before a solution was found.")
+            else:
+                QMessageBox.warning(self, "No Solution", f"Optimization failed. Solver status: {status}")
+
+    def export_results(self):
+        """Write the displayed assignment to a CSV or JSON file."""
+        if self.result is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Results", "schedule.csv", "CSV files (*.csv);;JSON files (*.json)"
+        )
+        if not path:
+            return
+        assignment, status, objective = self.result
+        try:
+            export_assignment(path, assignment, status=status, objective=objective)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Export Error", str(e))
+
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = StaffSchedulingApp()
+    window.show()
+    sys.exit(app.exec_())
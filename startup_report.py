@@ -0,0 +1,93 @@
+"""Startup time report for the applications.
+
+Usage:
+    python startup_report.py [--modules main staff_scheduling ...] [--top 10] [--target-ms 500]
+
+Each module is imported in a fresh interpreter with `-X importtime`, and the
+total import time and the slowest imports (cumulative time, including the
+modules they import) are printed. The time until the selector window is shown
+is measured by running `main.py --startup-time`, including interpreter startup.
+With --target-ms the exit status is 1 when the window takes longer than the
+target, so the report can guard cold start in CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_MODULES = ["main", "staff_scheduling", "advertising_budget_allocator"]
+
+
+def import_times(module):
+    """Import a module with -X importtime in a fresh interpreter.
+
+    Returns a list of (module name, self microseconds, cumulative microseconds,
+    nesting depth) in the order reported by Python.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def window_time(env=None):
+    """Wall-clock and in-process milliseconds until the selector window is shown."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "main.py", "--startup-time"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    shown = [line for line in completed.stdout.splitlines() if line.startswith("window shown after")]
+    if completed.returncode != 0 or not shown:
+        raise RuntimeError(f"main.py --startup-time failed:\n{completed.stderr.strip()}")
+    return wall_ms, float(shown[0].split()[3])
+
+
+def report_module(module, top):
+    entries = import_times(module)
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000
+    print(f"{module}: {total_ms:.1f} ms of imports ({len(entries)} modules)")
+    # Slowest imports below the top-level module, without repeating their submodules
+    slowest = sorted((entry for entry in entries if entry[3] == 1), key=lambda entry: -entry[2])[:top]
+    for name, _, cumulative_us, _ in slowest:
+        print(f"    {cumulative_us / 1000:>9.1f} ms  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="Modules to import.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports listed per module.")
+    parser.add_argument("--target-ms", type=float, default=None, help="Maximum time until the window is shown.")
+    parser.add_argument("--no-window", action="store_true", help="Skip measuring main.py (no display needed).")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        report_module(module, args.top)
+
+    if args.no_window:
+        return 0
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    wall_ms, shown_ms = window_time(env)
+    print(f"Selector window shown after {wall_ms:.1f} ms ({shown_ms:.1f} ms after main.py started running)")
+    if args.target_ms is not None and wall_ms > args.target_ms:
+        print(f"Startup exceeds the target of {args.target_ms:.0f} ms.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
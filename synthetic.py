@@ -0,0 +1,124 @@
+"""Seeded synthetic staff-scheduling instances and advertising catalogs for benchmarks.
+
+Requirements are derived from a planted assignment that respects availability
+and the max-shift limit, so every generated instance is feasible.
+"""
+import numpy as np
+
+COST_DISTRIBUTIONS = ("uniform", "normal", "lognormal")
+
+
+def generate_instance(
+    num_employees,
+    num_days,
+    num_shifts,
+    density=0.7,
+    cost_distribution="uniform",
+    tightness=0.8,
+    max_shifts=None,
+    num_classes=None,
+    seed=0,
+):
+    """Generate a feasible instance as a dict of arrays for StaffSchedulingModel(**instance).
+
+    density is the fraction of available (employee, day, shift) cells. tightness
+    is the fraction of each employee's max_shifts used by the planted assignment:
+    1.0 leaves no slack. max_shifts defaults to five shifts per seven days. With
+    num_classes, employees are drawn from that many profiles sharing their costs
+    and availability, as employees of the same contract type and skills would.
+    """
+    if not 0 < density <= 1:
+        raise ValueError(f"density must be in (0, 1], got {density}.")
+    if not 0 <= tightness <= 1:
+        raise ValueError(f"tightness must be in [0, 1], got {tightness}.")
+    if cost_distribution not in COST_DISTRIBUTIONS:
+        raise ValueError(f"cost_distribution must be one of {', '.join(COST_DISTRIBUTIONS)}.")
+    if num_classes is not None and num_classes < 1:
+        raise ValueError(f"num_classes must be at least 1, got {num_classes}.")
+
+    rng = np.random.default_rng(seed)
+    shape = (num_employees, num_days, num_shifts)
+    if max_shifts is None:
+        max_shifts = max(1, round(num_days * 5 / 7))
+    profile_shape = (num_employees if num_classes is None else num_classes, num_days, num_shifts)
+
+    if cost_distribution == "uniform":
+        costs = rng.uniform(50, 150, size=profile_shape)
+    elif cost_distribution == "normal":
+        costs = np.maximum(rng.normal(100, 20, size=profile_shape), 1)
+    else:
+        costs = rng.lognormal(np.log(100), 0.4, size=profile_shape)
+    costs = costs.round(2)
+
+    availability = rng.random(profile_shape) < density
+    if num_classes is not None:
+        profile = rng.integers(0, num_classes, size=num_employees)
+        costs, availability = costs[profile], availability[profile]
+
+    # Planted assignment: each employee works its first k available cells in a random order
+    shifts_worked = int(round(tightness * max_shifts))
+    keys = rng.random(shape).reshape(num_employees, -1)
+    keys[~availability.reshape(num_employees, -1)] = np.inf
+    order = np.argsort(keys, axis=1)[:, :shifts_worked]
+    planted = np.zeros((num_employees, num_days * num_shifts), dtype=bool)
+    np.put_along_axis(planted, order, True, axis=1)
+    planted &= availability.reshape(num_employees, -1)
+    requirements = planted.reshape(shape).sum(axis=0).astype(float)
+
+    return {
+        "costs": costs,
+        "availability": availability,
+        "requirements": requirements,
+        "max_shifts": np.float64(max_shifts),
+    }
+
+
+def generate_site_instance(num_sites, num_employees, num_days, num_shifts, seed=0, **options):
+    """Generate an instance of independent sites; returns (instance, sites).
+
+    Every site has num_employees employees and num_shifts shifts of its own,
+    generated by generate_instance with the other options. The shift axis holds
+    the shifts of all sites, site by site, and employees are only available for
+    the shifts of their site. sites holds the site label of every employee.
+    """
+    parts = [generate_instance(num_employees, num_days, num_shifts, seed=seed + k, **options) for k in range(num_sites)]
+    shape = (num_sites * num_employees, num_days, num_sites * num_shifts)
+    costs = np.zeros(shape)
+    availability = np.zeros(shape, dtype=bool)
+    requirements = np.zeros(shape[1:])
+    for k, part in enumerate(parts):
+        employees = slice(k * num_employees, (k + 1) * num_employees)
+        shifts = slice(k * num_shifts, (k + 1) * num_shifts)
+        costs[employees, :, shifts] = part["costs"]
+        availability[employees, :, shifts] = part["availability"]
+        requirements[:, shifts] = part["requirements"]
+    instance = {
+        "costs": costs,
+        "availability": availability,
+        "requirements": requirements,
+        "max_shifts": parts[0]["max_shifts"],
+    }
+    return instance, np.repeat([f"Site_{k}" for k in range(num_sites)], num_employees)
+
+
+def generate_catalog(num_channels, seed=0):
+    """Generate an advertising channel catalog as a dict for AdvertisingModel(**catalog).
+
+    Channels with a large reach per dollar tend to have low conversion rates, so
+    that meeting a high desired reach costs conversions.
+    """
+    rng = np.random.default_rng(seed)
+    costs = rng.uniform(50, 2000, size=num_channels).round(2)
+    reaches = (costs * rng.lognormal(np.log(15), 0.5, size=num_channels)).round()
+    reach_per_dollar = reaches / costs
+    conv_rates = (0.05 * rng.uniform(0.2, 1.0, size=num_channels) / (1 + reach_per_dollar / 15)).round(4)
+    min_ads = (rng.random(num_channels) < 0.1).astype(float)
+    max_ads = min_ads + rng.integers(1, 20, size=num_channels)
+    return {
+        "costs": costs,
+        "reaches": reaches,
+        "conv_rates": conv_rates,
+        "min_ads": min_ads,
+        "max_ads": max_ads,
+        "names": [f"Channel_{i}" for i in range(num_channels)],
+    }
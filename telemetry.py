@@ -0,0 +1,146 @@
+"""Per-phase timings and solver statistics of a solve.
+
+A Telemetry object collects, for one solve, the wall-clock time of each phase
+(parsing the inputs, building the model, solving, displaying the result, ...),
+model statistics (rows, columns and nonzeros before and after presolve), solver
+runtime attributes (Gurobi's Runtime, NodeCount, IterCount, MIPGap) and the
+captured solver log. Records are written as JSON lines so that runs can be
+aggregated, e.g. with pandas.read_json(path, lines=True).
+
+The applications append a record per solve to the file named by the
+SOLVER_TELEMETRY environment variable; batch_solve.py takes --telemetry FILE.
+"""
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Environment variable naming the JSON-lines file the applications append records to
+TELEMETRY_ENV = "SOLVER_TELEMETRY"
+
+PRESOLVED_PATTERN = re.compile(r"Presolved: (\d+) rows, (\d+) columns, (\d+) nonzeros")
+
+
+def presolved_size(log):
+    """(rows, columns, nonzeros) after presolve, parsed from a Gurobi log, or None if not logged."""
+    matches = PRESOLVED_PATTERN.findall(log)
+    if matches:
+        return tuple(int(value) for value in matches[-1])
+    if "All rows and columns removed" in log:
+        return 0, 0, 0
+    return None
+
+
+def problem_stats(problem):
+    """Size of a LinearProblem (see solver_backends)."""
+    return {"rows": problem.num_constrs, "columns": problem.num_vars, "nonzeros": int(problem.A.nnz)}
+
+
+def gurobi_stats(model, log=""):
+    """Model size (before and, when logged, after presolve) and runtime attributes of a solved Gurobi model."""
+    stats = {
+        "rows": model.NumConstrs,
+        "columns": model.NumVars,
+        "nonzeros": model.NumNZs,
+        "runtime": model.Runtime,
+        "iter_count": model.IterCount,
+        "bar_iter_count": model.BarIterCount,
+    }
+    presolved = presolved_size(log)
+    if presolved is not None:
+        stats["presolved_rows"], stats["presolved_columns"], stats["presolved_nonzeros"] = presolved
+    if model.IsMIP:
+        stats["node_count"] = model.NodeCount
+        if model.SolCount > 0:
+            stats["mip_gap"] = model.MIPGap
+    return stats
+
+
+def log_to_callback_only(model):
+    """Keep a Gurobi model's log (for MESSAGE callbacks) without printing it to the console."""
+    # Setting LogToConsole while output is on would itself print a line
+    model.Params.OutputFlag = 0
+    model.Params.LogToConsole = 0
+    model.Params.OutputFlag = 1
+
+
+class Telemetry:
+    """Timings, statistics and solver log of one solve.
+
+    app names the application and context holds extra fields of the record
+    (instance name, backend, ...).
+    """
+
+    def __init__(self, app, **context):
+        self.app = app
+        self.context = context
+        self.created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.phases = {}
+        self.stats = {}
+        self.status = None
+        self.log_lines = []
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block as the phase name; repeated phases add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_log(self, text):
+        self.log_lines.append(text)
+
+    @property
+    def log(self):
+        return "".join(self.log_lines)
+
+    def record_gurobi(self, model):
+        """Record the statistics of a solved Gurobi model, using the log captured so far."""
+        self.stats.update(gurobi_stats(model, self.log))
+
+    def record_result(self, result):
+        """Record the status, statistics and log of a solver backend result dict."""
+        self.status = result["status"]
+        self.stats.update(result.get("stats") or {})
+        if result.get("log") and not self.log_lines:
+            self.add_log(result["log"])
+
+    def to_dict(self):
+        return {
+            "time": self.created,
+            "app": self.app,
+            **self.context,
+            "status": self.status,
+            "phases": self.phases,
+            "stats": self.stats,
+            "log": self.log,
+        }
+
+    def format(self):
+        """Multi-line text for the diagnostics panels."""
+        lines = [f"Status: {self.status or '-'}", "", "Phases:"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<12} {seconds * 1000:>10.1f} ms")
+        lines.append(f"  {'total':<12} {sum(self.phases.values()) * 1000:>10.1f} ms")
+        if self.stats:
+            lines += ["", "Model and solver:"]
+            lines += [f"  {name:<20} {value:,.6g}" for name, value in self.stats.items()]
+        if self.log_lines:
+            lines += ["", "Solver log:", self.log.rstrip()]
+        return "\n".join(lines)
+
+    def write(self, path=None):
+        """Append the record as a JSON line to path (default: $SOLVER_TELEMETRY); no-op without a path."""
+        path = path or os.environ.get(TELEMETRY_ENV)
+        if not path:
+            return False
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+        return True
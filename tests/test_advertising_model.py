@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from advertising_model import AdvertisingModel, FrontierSolve, results_agree
+from solver_backends import HighsBackend
+from synthetic import generate_catalog
+
+
+def reach_range(catalog, budget):
+    """Reach of the best allocation without a reach target, and the most reach the budget buys."""
+    free = AdvertisingModel(**catalog).solve_with(HighsBackend(), budget, 0.0)
+    most = AdvertisingModel(**dict(catalog, conv_rates=np.ones_like(catalog["costs"])))
+    return catalog["reaches"] @ free["allocation"], most.solve_with(HighsBackend(), budget, 0.0)["objective"]
+
+
+@pytest.mark.parametrize("num_channels", [4, 50, 500])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("budget_share", [0.1, 0.4])
+@pytest.mark.parametrize("reach_share", [-0.5, 0.25, 0.5, 0.9, 1.1])
+def test_solve_fast_matches_the_lp(num_channels, seed, budget_share, reach_share):
+    """reach_share puts the desired reach below (< 0), inside (0 to 1) or above (> 1) the range of reach_range."""
+    catalog = generate_catalog(num_channels, seed=seed)
+    budget = budget_share * float(catalog["costs"] @ catalog["max_ads"])
+    free_reach, most_reach = reach_range(catalog, budget)
+    if reach_share > 1:
+        desired_reach = reach_share * most_reach
+    else:
+        desired_reach = free_reach + reach_share * (most_reach - free_reach)
+    allocation = AdvertisingModel(**catalog)
+
+    fast = allocation.solve_fast(budget, desired_reach)
+    reference = allocation.solve_with(HighsBackend(), budget, desired_reach)
+
+    assert fast is not None
+    assert results_agree(fast, reference), (fast["objective"], reference["objective"])
+    assert fast["status"] == ("infeasible" if reach_share > 1 else "optimal")
+    if fast["status"] == "optimal":
+        ads = fast["allocation"]
+        assert np.all(ads >= catalog["min_ads"] - 1e-9) and np.all(ads <= catalog["max_ads"] + 1e-9)
+        assert catalog["costs"] @ ads <= budget * (1 + 1e-9)
+        assert catalog["reaches"] @ ads >= desired_reach * (1 - 1e-9)
+
+
+def test_frontier_solve_disposes_of_the_model():
+    pytest.importorskip("gurobipy")
+    catalog = generate_catalog(4, seed=0)
+    budget = 0.4 * float(catalog["costs"] @ catalog["max_ads"])
+    high = float(catalog["costs"] @ catalog["max_ads"])
+
+    job = FrontierSolve(AdvertisingModel(**catalog), budget, 0.0, "Budget", 0.0, high)
+    job.optimize()
+    points = job.result["points"]
+    assert len(points) > 1 and np.all(np.diff(points[:, 0]) > 0) and points[-1, 0] <= high
+    assert job.allocation.model is None
+
+    cancelled = FrontierSolve(AdvertisingModel(**catalog), budget, 0.0, "Budget", 0.0, high)
+    cancelled.allocation.frontier = lambda *args, stop: cancelled.terminate()
+    cancelled.optimize()
+    assert cancelled.result is None
+    assert cancelled.allocation.model is None
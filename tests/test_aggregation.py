@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from aggregation import AggregatedSchedulingModel
+from scheduling_model import StaffSchedulingModel
+from solver_backends import HighsBackend
+from synthetic import generate_instance
+
+
+@pytest.mark.parametrize("size, num_classes", [((12, 7, 2), 2), ((40, 14, 3), 5), ((60, 7, 3), 60)])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("fraction", [0.0, 0.5])
+def test_disaggregated_assignment_is_feasible(size, num_classes, seed, fraction):
+    instance = generate_instance(*size, density=0.8, tightness=0.9, num_classes=num_classes, seed=seed)
+    # Fractional max shifts round down for every employee of a class
+    instance["max_shifts"] = instance["max_shifts"] + fraction
+    aggregated = AggregatedSchedulingModel(**instance)
+
+    result = aggregated.solve_with(HighsBackend())
+    reference = StaffSchedulingModel(**instance).solve_with(HighsBackend())
+
+    assert result["status"] == reference["status"] == "optimal"
+    assert result["objective"] == pytest.approx(reference["objective"], rel=1e-6)
+    assignment = aggregated.assignment_from(result["x"])
+    np.testing.assert_array_equal(assignment.sum(axis=0), instance["requirements"])
+    assert np.all(assignment.sum(axis=(1, 2)) <= np.floor(aggregated.max_shifts))
+    assert not np.any(assignment & ~aggregated.availability)
+    assert instance["costs"][assignment].sum() == pytest.approx(result["objective"])
+    np.testing.assert_array_equal(aggregated.start_from(assignment), np.rint(result["x"]))
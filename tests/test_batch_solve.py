@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from batch_solve import solve_instance
+from feasibility import precheck
+from instance_io import save_instance
+
+
+def infeasible_instance():
+    """Days 1 and 2 need three shifts from two employees who work one shift each; C only covers Day 3.
+
+    Every pre-check passes, so the infeasibility is only found by the solve.
+    """
+    availability = np.zeros((3, 3, 1))
+    availability[:2, :2] = 1
+    availability[2, 2] = 1
+    requirements = np.array([[2.0], [1.0], [0.0]])
+    return {
+        "costs": np.ones((3, 3, 1)), "availability": availability, "requirements": requirements,
+        "max_shifts": np.ones(3),
+    }
+
+
+@pytest.mark.parametrize("flow", [True, False])
+def test_infeasible_instance_with_highs(tmp_path, flow):
+    instance = infeasible_instance()
+    assert precheck(instance["availability"], instance["requirements"], instance["max_shifts"]) == []
+    path = tmp_path / "infeasible.npz"
+    save_instance(str(path), **instance)
+
+    row = solve_instance(str(path), str(tmp_path), threads=1, backend="highs", flow=flow)
+
+    assert row["status"] == "infeasible"
+    assert row["error"] is None
+    assert row["objective"] is None
+    assert row["diagnosis"].startswith("diagnosis unavailable")
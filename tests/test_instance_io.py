@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from instance_io import binary_instance_bytes, load_instance, read_binary_header, read_binary_instance, save_instance
+from synthetic import generate_instance
+
+
+def test_binary_instance_round_trip(tmp_path):
+    instance = generate_instance(12, 7, 3, seed=3)
+    instance["max_shifts"] = np.arange(12) % 4 + 2.0
+    path = tmp_path / "instance.ssi"
+    save_instance(str(path), **instance, metadata={"name": "round trip"})
+
+    loaded = load_instance(str(path))
+
+    # Costs are stored as float32
+    np.testing.assert_allclose(loaded["costs"], instance["costs"], rtol=1e-6)
+    np.testing.assert_array_equal(loaded["availability"], instance["availability"] != 0)
+    np.testing.assert_array_equal(loaded["requirements"], instance["requirements"])
+    np.testing.assert_array_equal(loaded["max_shifts"], instance["max_shifts"])
+
+
+@pytest.mark.parametrize("max_shifts", [-1.0, np.nan])
+def test_binary_instance_rejects_invalid_max_shifts(max_shifts):
+    instance = generate_instance(4, 3, 2, seed=3)
+    data = bytearray(binary_instance_bytes(**instance))
+    header, start = read_binary_header(bytes(data))
+    offset = start + header["arrays"]["max_shifts"]["offset"]
+    data[offset:offset + 4] = np.float32(max_shifts).tobytes()
+
+    with pytest.raises(ValueError, match="max shifts of employee 1"):
+        read_binary_instance(bytes(data))
+    with pytest.raises(ValueError, match="max shifts"):
+        binary_instance_bytes(**dict(instance, max_shifts=max_shifts))
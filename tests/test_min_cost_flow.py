@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from advertising_model import AdvertisingModel
+from aggregation import AggregatedSchedulingModel
+from min_cost_flow import FlowBackend, is_transportation
+from scheduling_model import StaffSchedulingModel
+from solver_backends import BINARY, HighsBackend, LinearProblem
+from synthetic import generate_catalog, generate_instance
+from work_rules import RuleSchedulingModel, WorkRules
+
+SIZES = [(8, 5, 2), (30, 7, 3), (60, 14, 3)]
+
+
+def check_assignment(assignment, instance):
+    np.testing.assert_array_equal(assignment.sum(axis=0), instance["requirements"])
+    assert np.all(assignment.sum(axis=(1, 2)) <= instance["max_shifts"])
+    assert not np.any(assignment & ~np.asarray(instance["availability"], dtype=bool))
+
+
+@pytest.mark.parametrize("model_class", [StaffSchedulingModel, AggregatedSchedulingModel])
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("seed", range(3))
+def test_flow_matches_highs(model_class, size, seed):
+    instance = generate_instance(*size, density=0.7, tightness=0.9, num_classes=size[0] // 4, seed=seed)
+    scheduler = model_class(**instance)
+    assert is_transportation(scheduler.to_problem())
+
+    flow = scheduler.solve_with(FlowBackend())
+    highs = scheduler.solve_with(HighsBackend())
+
+    assert flow["status"] == highs["status"] == "optimal"
+    assert flow["objective"] == pytest.approx(highs["objective"], rel=1e-9)
+    assignment = scheduler.assignment_from(flow["x"])
+    check_assignment(assignment, instance)
+    assert instance["costs"][assignment].sum() == pytest.approx(flow["objective"])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_flow_detects_infeasible_instances(seed):
+    instance = generate_instance(20, 7, 3, density=0.7, seed=seed)
+    # One more employee than are available for a cell
+    day, shift = seed % 7, seed % 3
+    instance["requirements"][day, shift] = instance["availability"][:, day, shift].sum() + 1
+    scheduler = StaffSchedulingModel(**instance)
+
+    flow = scheduler.solve_with(FlowBackend())
+    highs = scheduler.solve_with(HighsBackend())
+
+    assert flow["status"] == highs["status"] == "infeasible"
+    assert flow["x"] is None and flow["objective"] is None
+
+
+def test_other_problems_go_to_the_fallback():
+    instance = generate_instance(10, 7, 3, seed=0)
+    rules = WorkRules(one_shift_per_day=True)
+    problems = [
+        RuleSchedulingModel(**instance, rules=rules, lazy=False).to_problem(),
+        AdvertisingModel(**generate_catalog(20, seed=0)).to_problem(50_000, 500_000),
+        # Two variables in the same demand and capacity rows (parallel arcs)
+        LinearProblem([1.0, 2.0], sp.csr_matrix(np.ones((2, 2))), ["=", "<"], [1.0, 1.0], vtypes=BINARY),
+    ]
+    for problem in problems:
+        assert not is_transportation(problem)
+        result = FlowBackend(HighsBackend()).solve(problem)
+        assert result["backend"] == "highs"
+        with pytest.raises(ValueError):
+            FlowBackend().solve(problem)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from batch_solve import solve_instance
+from instance_io import save_instance
+from rolling_horizon import solve_rolling_horizon
+from scheduling_model import StaffSchedulingModel
+from solver_backends import HighsBackend
+from synthetic import generate_instance
+
+
+def tight_instance(seed):
+    """Every max-shift budget is used up, so greedy early windows starve later ones."""
+    return generate_instance(20, 21, 2, density=0.5, tightness=1.0, seed=seed)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_infeasible_window_falls_back_to_monolithic(seed):
+    instance = tight_instance(seed)
+
+    result = solve_rolling_horizon(**instance, window=7, step=7, backend=HighsBackend())
+
+    assert result["status"] == "optimal"
+    assert result["fallback"] == "monolithic"
+    assignment = result["assignment"]
+    np.testing.assert_array_equal(assignment.sum(axis=0), instance["requirements"])
+    assert np.all(assignment.sum(axis=(1, 2)) <= instance["max_shifts"])
+    assert not np.any(assignment & ~instance["availability"].astype(bool))
+    monolithic = StaffSchedulingModel(**instance).solve_with(HighsBackend())
+    assert result["objective"] == pytest.approx(monolithic["objective"])
+
+
+def test_batch_solve_reports_rolling_fallback(tmp_path):
+    path = tmp_path / "tight.npz"
+    save_instance(str(path), **tight_instance(0))
+
+    row = solve_instance(str(path), str(tmp_path), threads=1, rolling=(7, 7), backend="highs", flow=False)
+
+    assert row["status"] == "optimal"
+    assert "whole horizon" in row["diagnosis"]
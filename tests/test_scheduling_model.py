@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from scheduling_model import SchedulingSession, StaffSchedulingModel
+from solver_backends import HighsBackend
+from synthetic import generate_instance
+
+GRB = pytest.importorskip("gurobipy").GRB
+
+
+def cold_objective(instance):
+    result = StaffSchedulingModel(**instance).solve_with(HighsBackend())
+    assert result["status"] == "optimal"
+    return result["objective"]
+
+
+def solve_update(session, instance):
+    changes = session.update(**instance)
+    session.solve()
+    assert session.model.Status == GRB.OPTIMAL
+    return changes, session.model.ObjVal
+
+
+def test_session_update_matches_cold_rebuild():
+    rng = np.random.default_rng(5)
+    instance = generate_instance(12, 7, 2, tightness=0.5, seed=5)
+    session = SchedulingSession(StaffSchedulingModel(**instance))
+    session.solve()
+
+    # Edit costs and a requirement, and make an assigned cell unavailable
+    edited = dict(instance, costs=instance["costs"].copy(), availability=instance["availability"].copy())
+    edited["costs"][rng.random(edited["costs"].shape) < 0.2] += 30
+    edited["requirements"] = instance["requirements"].copy()
+    edited["requirements"][0, 0] += 1
+    cell = tuple(np.argwhere(session.scheduler.assignment())[0])
+    edited["availability"][cell] = 0
+    changes, objective = solve_update(session, edited)
+    assert not changes["rebuilt"]
+    assert objective == pytest.approx(cold_objective(edited), rel=1e-4)
+
+    # Making the cell available again only restores its bound
+    changes, objective = solve_update(session, instance)
+    assert changes["availability"] == 1
+    assert not changes["rebuilt"]
+    assert objective == pytest.approx(cold_objective(instance), rel=1e-4)
+
+
+def test_session_update_checks_shapes():
+    instance = generate_instance(4, 3, 2, seed=5)
+    session = SchedulingSession(StaffSchedulingModel(**instance))
+
+    with pytest.raises(ValueError, match=r"requirements must have shape \(3, 2\)"):
+        session.update(**dict(instance, requirements=np.ones((2, 3))))
+    with pytest.raises(ValueError, match=r"max_shifts must be a number or have shape \(4,\)"):
+        session.update(**dict(instance, max_shifts=np.ones(3)))
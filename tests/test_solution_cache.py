@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from solution_cache import SolutionCache, instance_key, row_digests
+from synthetic import generate_instance
+
+
+def store(cache, instance, params=None):
+    rows = row_digests(instance["costs"], instance["availability"], instance["max_shifts"])
+    key = instance_key(**instance, params=params)
+    assignment = np.zeros(instance["costs"].shape, dtype=bool)
+    cache.put(key, assignment, 1.0, "optimal", rows, instance["requirements"], params)
+    return key
+
+
+def edited(instance):
+    costs = instance["costs"].copy()
+    costs[0, 0, 0] += 1
+    return dict(instance, costs=costs)
+
+
+def test_nearest_matches_requirements_and_params(tmp_path):
+    cache = SolutionCache(str(tmp_path))
+    instance = generate_instance(20, 7, 3, seed=1)
+    store(cache, instance, {"backend": "highs"})
+    near = edited(instance)
+    rows = row_digests(near["costs"], near["availability"], near["max_shifts"])
+
+    entry, distance = cache.nearest(rows, near["requirements"], {"backend": "highs"})
+    assert distance == 1
+    assert entry["params"] == {"backend": "highs"}
+    assert cache.nearest(rows, near["requirements"], {"backend": "gurobi"}) is None
+    assert cache.nearest(rows, near["requirements"] + 1, {"backend": "highs"}) is None
+
+
+def test_eviction_removes_index_files(tmp_path):
+    cache = SolutionCache(str(tmp_path), max_bytes=0)
+    instance = generate_instance(20, 7, 3, seed=1)
+    key = store(cache, instance)
+
+    assert cache.get(key) is None
+    assert os.listdir(tmp_path) == []
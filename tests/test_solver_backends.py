@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from scheduling_model import StaffSchedulingModel
+from solver_backends import HighsBackend
+
+
+def unavailable_instance(requirements):
+    """Two employees, two days and one shift, with every cell unavailable (no variables)."""
+    return StaffSchedulingModel(np.ones((2, 2, 1)), np.zeros((2, 2, 1)), requirements, 1)
+
+
+def test_highs_without_variables_is_optimal():
+    scheduler = unavailable_instance(np.zeros((2, 1)))
+
+    result = scheduler.solve_with(HighsBackend())
+
+    assert result["status"] == "optimal"
+    assert result["objective"] == 0.0
+    assert not scheduler.assignment_from(result["x"]).any()
+
+
+@pytest.mark.parametrize("requirement", [1.0, -1.0])
+def test_highs_without_variables_is_infeasible(requirement):
+    result = unavailable_instance(np.full((2, 1), requirement)).solve_with(HighsBackend())
+
+    assert result["status"] == "infeasible"
+    assert result["x"] is None
+    assert result["objective"] is None
@@ -0,0 +1,29 @@
+import pytest
+
+from aggregation import AggregatedSchedulingModel
+from scheduling_model import StaffSchedulingModel
+from staff_scheduling import choose_solve_path
+from synthetic import generate_instance
+from work_rules import WorkRules
+
+RULES = WorkRules(one_shift_per_day=True)
+
+
+@pytest.mark.parametrize("backend, rules, flow, sub_rosters, path", [
+    ("gurobi", None, False, 1, "session"),
+    ("gurobi", None, False, 3, "decomposed"),
+    ("highs", RULES, True, 3, "decomposed"),
+    ("gurobi", RULES, True, 1, "model"),
+    ("highs", RULES, True, 1, "rules"),
+    ("gurobi", None, True, 1, "flow"),
+    ("highs", None, False, 1, "backend"),
+])
+def test_choose_solve_path(backend, rules, flow, sub_rosters, path):
+    scheduler = StaffSchedulingModel(**generate_instance(6, 3, 2, seed=0))
+    assert choose_solve_path(scheduler, backend, rules, flow, sub_rosters) == path
+
+
+def test_grouped_gurobi_solves_build_a_model():
+    scheduler = AggregatedSchedulingModel(**generate_instance(6, 3, 2, num_classes=2, seed=0))
+    assert choose_solve_path(scheduler, "gurobi") == "model"
+    assert choose_solve_path(scheduler, "highs") == "backend"
@@ -0,0 +1,406 @@
+"""Work rules for staff scheduling, added as constraints only when violated.
+
+WorkRules configures three rules per run:
+
+- one shift per day: an employee works at most one shift on any day;
+- rest pairs (a, b): an employee who works shift a on a day may not work
+  shift b on the next day, e.g. a night shift followed by a morning shift;
+- maximum consecutive days K: no employee works K + 1 days in a row.
+
+Written out in full, the rules add up to E*T rows per rule, nearly all of which
+an optimal roster satisfies anyway. RuleSchedulingModel therefore leaves them
+out of the model by default (lazy=True) and adds only the rule instances that
+an incumbent violates: through a Gurobi callback (cbLazy) on every new
+incumbent, or, with other backends, by solving again with the violated rows
+added until the solution obeys every rule. lazy=False enumerates every rule
+instance up front.
+
+Without the one-shift rule, a day with several shifts still counts once
+towards the consecutive days. The enumerated formulation then uses a binary
+worked-day variable per employee and day, while the lazy cuts pick one worked
+shift per day of the violating window: x[e, d, s_d] summed over the K + 1 days
+is at most K. Both are exact.
+
+Shifts and days are numbered from 0 here, and from 1 in constraint names shown
+to users (see feasibility).
+"""
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from scheduling_model import StaffSchedulingModel
+from solver_backends import BINARY, GurobiBackend, LinearProblem, solve_result
+from telemetry import log_to_callback_only
+
+
+class WorkRules:
+    """Work rules of one run: one_shift_per_day, rest_pairs of (shift, next-day shift) and max_consecutive_days.
+
+    An instance is false when it has no rule.
+    """
+
+    def __init__(self, one_shift_per_day=False, rest_pairs=(), max_consecutive_days=None):
+        self.one_shift_per_day = bool(one_shift_per_day)
+        self.rest_pairs = [(int(a), int(b)) for a, b in rest_pairs]
+        self.max_consecutive_days = None if max_consecutive_days is None else int(max_consecutive_days)
+        if self.max_consecutive_days is not None and self.max_consecutive_days < 1:
+            raise ValueError(f"The maximum of consecutive days must be at least 1, got {max_consecutive_days}.")
+
+    def __bool__(self):
+        return self.one_shift_per_day or bool(self.rest_pairs) or self.max_consecutive_days is not None
+
+    def __repr__(self):
+        return (f"WorkRules(one_shift_per_day={self.one_shift_per_day}, rest_pairs={self.rest_pairs}, "
+                f"max_consecutive_days={self.max_consecutive_days})")
+
+    def to_dict(self):
+        return {
+            "one_shift_per_day": self.one_shift_per_day,
+            "rest_pairs": [list(pair) for pair in self.rest_pairs],
+            "max_consecutive_days": self.max_consecutive_days,
+        }
+
+    def check(self, num_shifts):
+        """Raise ValueError if a rest pair names a shift outside 0..num_shifts - 1."""
+        for a, b in self.rest_pairs:
+            if not (0 <= a < num_shifts and 0 <= b < num_shifts):
+                raise ValueError(f"Rest pair {a + 1}>{b + 1} names a shift outside 1..{num_shifts}.")
+
+    def rows(self, availability, assignment=None):
+        """Rule constraints over the (E, T, S) cells, all of them or those an assignment violates.
+
+        Returns (rows, cells, rhs, names): every constraint is the sum of the
+        cells (flat (e, d, s) indices) with its row index <= its rhs. Without an
+        assignment, every rule instance that can bind is listed, except the
+        consecutive-days rule without the one-shift rule, which needs the
+        worked-day variables of RuleSchedulingModel.
+        """
+        availability = np.asarray(availability) != 0
+        num_employees, num_days, num_shifts = availability.shape
+        parts = []
+
+        if self.one_shift_per_day:
+            day_cells = availability.sum(axis=2)
+            days = day_cells >= 2 if assignment is None else assignment.sum(axis=2) >= 2
+            employees, day = np.nonzero(days)
+            cells = np.flatnonzero(availability & days[:, :, None])
+            parts.append((cells // num_shifts, cells, 1.0, [
+                f"OneShift_{e}_{d}" for e, d in zip(employees, day)
+            ]))
+
+        for a, b in self.rest_pairs:
+            both = availability[:, :-1, a] & availability[:, 1:, b]
+            if assignment is not None:
+                both &= assignment[:, :-1, a] & assignment[:, 1:, b]
+            employees, day = np.nonzero(both)
+            first = (employees * num_days + day) * num_shifts + a
+            second = (employees * num_days + day + 1) * num_shifts + b
+            keys = np.arange(employees.size)
+            parts.append((np.concatenate([keys, keys]), np.concatenate([first, second]), 1.0, [
+                f"Rest_{e}_{d}_{a}_{b}" for e, d in zip(employees, day)
+            ]))
+
+        limit = self.max_consecutive_days
+        if limit is not None and limit < num_days and (self.one_shift_per_day or assignment is not None):
+            worked = availability.any(axis=2) if assignment is None else assignment.any(axis=2)
+            counts = np.concatenate([np.zeros((num_employees, 1), dtype=int), np.cumsum(worked, axis=1)], axis=1)
+            employees, start = np.nonzero(counts[:, limit + 1:] - counts[:, :-limit - 1] == limit + 1)
+            keys = np.arange(employees.size)
+            rows, cells = [], []
+            for offset in range(limit + 1):
+                day = start + offset
+                if self.one_shift_per_day:
+                    # The window's available cells: with one shift per day, they sum to the days worked
+                    window, shift = np.nonzero(availability[employees, day])
+                else:
+                    window, shift = keys, np.argmax(assignment[employees, day], axis=1)
+                rows.append(window)
+                cells.append((employees[window] * num_days + day[window]) * num_shifts + shift)
+            parts.append((np.concatenate(rows), np.concatenate(cells), float(limit), [
+                f"MaxConsecutive_{e}_{d}" for e, d in zip(employees, start)
+            ]))
+
+        rows, cells, rhs, names = [], [], [], []
+        offset = 0
+        for row_keys, part_cells, bound, part_names in parts:
+            # Renumber each part's row keys to consecutive rows
+            unique, row_index = np.unique(row_keys, return_inverse=True)
+            rows.append(offset + row_index.ravel())
+            cells.append(part_cells)
+            rhs.append(np.full(unique.size, bound))
+            names += part_names
+            offset += unique.size
+        if not rows:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0), []
+        return np.concatenate(rows), np.concatenate(cells), np.concatenate(rhs), names
+
+    def violations(self, assignment, availability=None):
+        """Number of rule instances an (E, T, S) assignment violates."""
+        assignment = np.asarray(assignment) != 0
+        return len(self.rows(assignment if availability is None else availability, assignment)[3])
+
+
+class RuleSchedulingModel(StaffSchedulingModel):
+    """Staff-scheduling model with WorkRules.
+
+    Takes the inputs of StaffSchedulingModel, the rules and lazy. With
+    lazy=True, to_problem() and build() leave the rules out; solve() and
+    solve_with() add the violated ones as lazy constraints with Gurobi, and
+    solve_with() re-solves with them with other backends. With lazy=False,
+    to_problem() enumerates every rule instance, followed by the worked-day
+    variables when the consecutive-days rule needs them. self.cuts counts the
+    rule rows added during the last solve.
+    """
+
+    def __init__(self, costs, availability, requirements, max_shifts, rules=None, lazy=True):
+        super().__init__(costs, availability, requirements, max_shifts)
+        self.rules = rules if rules is not None else WorkRules()
+        self.rules.check(self.num_shifts)
+        self.lazy = lazy
+        self.cuts = 0
+        self.num_aux = 0
+        self.rule_callback = None
+
+    def enumerated(self):
+        """The same model with every rule instance enumerated (lazy=False)."""
+        return RuleSchedulingModel(self.costs, self.availability, self.requirements, self.max_shifts, self.rules,
+                                   lazy=False)
+
+    def rule_matrix(self, rows, cells, num_columns):
+        """Sparse rule rows over the model variables from the output of WorkRules.rows."""
+        position = np.full(self.costs.size, -1)
+        position[self.cells] = np.arange(self.cells.size)
+        num_rows = int(rows.max(initial=-1)) + 1
+        return sp.csr_matrix((np.ones(rows.size), (rows, position[cells])), shape=(num_rows, num_columns))
+
+    def to_problem(self):
+        """The LinearProblem of StaffSchedulingModel, with every rule row appended unless lazy."""
+        problem = super().to_problem()
+        if self.lazy or not self.rules:
+            return problem
+
+        rows, cells, rhs, names = self.rules.rows(self.availability)
+        A = self.rule_matrix(rows, cells, problem.num_vars)
+        num_aux = 0
+        limit = self.rules.max_consecutive_days
+        if limit is not None and limit < self.num_days and not self.rules.one_shift_per_day:
+            A, rhs, names, num_aux = self.worked_day_rows(A, rhs, names, limit)
+        self.num_aux = num_aux
+        if num_aux:
+            problem.A = sp.hstack([problem.A, sp.csr_matrix((problem.num_constrs, num_aux))], format="csr")
+        return LinearProblem(
+            np.concatenate([problem.c, np.zeros(num_aux)]),
+            sp.vstack([problem.A, A], format="csr"),
+            np.concatenate([problem.senses, np.full(A.shape[0], "<")]),
+            np.concatenate([problem.rhs, rhs]),
+            vtypes=BINARY,
+            constr_names=problem.constr_names + names,
+        )
+
+    def worked_day_rows(self, A, rhs, names, limit):
+        """Append worked-day variables w[e, d] and the rows of the consecutive-days rule over them.
+
+        WorkedDay_{e}_{d}: the shifts of day d sum to at most S * w[e, d].
+        MaxConsecutive_{e}_{d}: w over the limit + 1 days from day d sums to at most limit.
+        Returns the extended rows, rhs, names and the number of worked-day variables.
+        """
+        num_employees, num_days, num_shifts = self.costs.shape
+        num_vars = self.cells.size
+        days = np.flatnonzero(self.availability.any(axis=2).ravel())
+        column = np.full(num_employees * num_days, -1)
+        column[days] = num_vars + np.arange(days.size)
+
+        # WorkedDay rows: x of the day's available cells minus S * w
+        day_of_cell = self.cells // num_shifts
+        row_of_day = np.full(num_employees * num_days, -1)
+        row_of_day[days] = np.arange(days.size)
+        linking = sp.csr_matrix(
+            (np.concatenate([np.ones(num_vars), np.full(days.size, -float(num_shifts))]),
+             (np.concatenate([row_of_day[day_of_cell], np.arange(days.size)]),
+              np.concatenate([np.arange(num_vars), column[days]]))),
+            shape=(days.size, num_vars + days.size),
+        )
+
+        # MaxConsecutive rows: windows of limit + 1 days that can all be worked
+        available = self.availability.any(axis=2)
+        counts = np.concatenate([np.zeros((num_employees, 1), dtype=int), np.cumsum(available, axis=1)], axis=1)
+        employees, start = np.nonzero(counts[:, limit + 1:] - counts[:, :-limit - 1] == limit + 1)
+        offsets = np.arange(limit + 1)
+        window_days = (employees * num_days + start)[:, None] + offsets
+        windows = sp.csr_matrix(
+            (np.ones(window_days.size), (np.repeat(np.arange(employees.size), limit + 1), column[window_days.ravel()])),
+            shape=(employees.size, num_vars + days.size),
+        )
+
+        A = sp.vstack([sp.hstack([A, sp.csr_matrix((A.shape[0], days.size))]), linking, windows], format="csr")
+        rhs = np.concatenate([rhs, np.zeros(days.size), np.full(employees.size, float(limit))])
+        names = names + [f"WorkedDay_{d // num_days}_{d % num_days}" for d in days] + [
+            f"MaxConsecutive_{e}_{d}" for e, d in zip(employees, start)
+        ]
+        return A, rhs, names, days.size
+
+    def violated_rows(self, x):
+        """Rule rows over the model variables violated by a solution vector: (A, rhs, names)."""
+        assignment = self.assignment_from(x)
+        rows, cells, rhs, names = self.rules.rows(self.availability, assignment)
+        return self.rule_matrix(rows, cells, self.cells.size), rhs, names
+
+    def lazy_callback(self, x):
+        """Gurobi callback adding the rules violated by every new incumbent of the x MVar as lazy constraints."""
+        from gurobipy import GRB, LinExpr
+
+        variables = x.tolist()
+
+        def callback(model, where):
+            if where != GRB.Callback.MIPSOL:
+                return
+            A, rhs, _ = self.violated_rows(model.cbGetSolution(x))
+            for row in range(A.shape[0]):
+                columns = A.indices[A.indptr[row]:A.indptr[row + 1]]
+                model.cbLazy(LinExpr([1.0] * columns.size, [variables[k] for k in columns]) <= rhs[row])
+            self.cuts += A.shape[0]
+
+        return callback
+
+    def build(self):
+        model = super().build()
+        self.cuts = 0
+        self.rule_callback = None
+        if self.lazy and self.rules:
+            model.Params.LazyConstraints = 1
+            self.rule_callback = self.lazy_callback(self.x)
+        return model
+
+    def callback(self, model, where):
+        """Gurobi callback adding violated rules to the model built by build(), if lazy."""
+        if self.rule_callback is not None:
+            self.rule_callback(model, where)
+
+    def solve(self, callback=None):
+        """Optimize the Gurobi model, adding violated rules lazily, and return the Gurobi status."""
+        if self.model is None:
+            self.build()
+        if self.rule_callback is None:
+            return super().solve(callback)
+
+        def combined(model, where):
+            self.callback(model, where)
+            if callback is not None:
+                callback(model, where)
+
+        self.model.optimize(combined)
+        return self.model.Status
+
+    def solve_with(self, backend, time_limit=None, threads=None, start=None):
+        """Solve with a solver backend, adding violated rules lazily when lazy (see the class docstring).
+
+        A min-cost-flow backend (see min_cost_flow) hands the solve to its Gurobi
+        fallback when it has one. The result stats count the added rule rows as
+        "lazy_constraints", and the solves as "rule_rounds" without Gurobi.
+        """
+        self.cuts = 0
+        if not (self.lazy and self.rules):
+            return super().solve_with(backend, time_limit, threads, start)
+        gurobi = backend if isinstance(backend, GurobiBackend) else getattr(backend, "fallback", None)
+        if isinstance(gurobi, GurobiBackend):
+            return self.solve_lazily(gurobi, time_limit, threads, start)
+        return self.solve_in_rounds(backend, time_limit, threads, start)
+
+    def solve_lazily(self, backend, time_limit=None, threads=None, start=None):
+        """Solve with Gurobi and a lazy-constraint callback; the counterpart of GurobiBackend.solve."""
+        from gurobipy import GRB
+
+        start_time = time.perf_counter()
+        problem = self.to_problem()
+        if start is not None:
+            problem.start = self.start_from(start)
+        model, x, _ = backend.build_model(problem)
+        build_time = time.perf_counter() - start_time
+        log_to_callback_only(model)
+        model.Params.LazyConstraints = 1
+        if time_limit is not None:
+            model.Params.TimeLimit = time_limit
+        if threads is not None:
+            model.Params.Threads = threads
+        log = []
+        lazy = self.lazy_callback(x)
+
+        def callback(model, where):
+            if where == GRB.Callback.MESSAGE:
+                log.append(model.cbGet(GRB.Callback.MSG_STRING))
+            lazy(model, where)
+
+        model.optimize(callback)
+        result = backend.result(model, x, build_time, "".join(log))
+        result["stats"]["lazy_constraints"] = self.cuts
+        model.dispose()
+        return result
+
+    def solve_in_rounds(self, backend, time_limit=None, threads=None, start=None):
+        """Solve repeatedly, adding the rows violated by each solution, until no rule is violated."""
+        start_time = time.perf_counter()
+        problem = self.to_problem()
+        if start is not None:
+            problem.start = self.start_from(start)
+        build_time = time.perf_counter() - start_time
+        solve_time, rounds = 0.0, 0
+        while True:
+            remaining = None if time_limit is None else time_limit - (time.perf_counter() - start_time)
+            if remaining is not None and remaining <= 0:
+                result = solve_result(backend.name, "time_limit")
+                break
+            result = backend.solve(problem, time_limit=remaining, threads=threads)
+            build_time += result["build_time"]
+            solve_time += result["solve_time"]
+            rounds += 1
+            if result["x"] is None:
+                break
+            A, rhs, names = self.violated_rows(result["x"])
+            if not names:
+                break
+            if result["status"] != "optimal":
+                # Out of time with a solution that breaks a rule
+                result = solve_result(result["backend"], result["status"], stats=result["stats"])
+                break
+            self.cuts += len(names)
+            problem = LinearProblem(
+                problem.c, sp.vstack([problem.A, A], format="csr"),
+                np.concatenate([problem.senses, np.full(len(names), "<")]), np.concatenate([problem.rhs, rhs]),
+                vtypes=BINARY, constr_names=problem.constr_names + names, start=problem.start,
+            )
+        result.update(build_time=build_time, solve_time=solve_time)
+        result["stats"] = dict(result["stats"], lazy_constraints=self.cuts, rule_rounds=rounds)
+        return result
+
+    def start_from(self, assignment):
+        """MIP start over the model variables; worked-day variables are left to the solver."""
+        return np.concatenate([super().start_from(assignment), np.full(self.num_aux, np.nan)])
+
+    def assignment_from(self, x):
+        return super().assignment_from(np.asarray(x)[:self.cells.size])
+
+
+class RuleSolve:
+    """Runs scheduler.solve_with(backend) behind the optimize()/terminate() interface of SolveWorker.
+
+    Used for backends without lazy constraints, which solve a RuleSchedulingModel
+    in rounds. The result dict is stored in self.result; terminate() only has an
+    effect before the solve starts.
+    """
+
+    def __init__(self, scheduler, backend, **options):
+        self.scheduler = scheduler
+        self.backend = backend
+        self.options = options
+        self.result = None
+        self.terminated = False
+
+    def optimize(self, callback=None):
+        if self.terminated:
+            self.result = solve_result(self.backend.name, "interrupted")
+            return
+        self.result = self.scheduler.solve_with(self.backend, **self.options)
+
+    def terminate(self):
+        self.terminated = True